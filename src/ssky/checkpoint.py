@@ -0,0 +1,103 @@
+"""
+High-water marks of the feeds read with `ssky get --since-last`
+
+A mark is the newest feed item seen by a reader: its sort time (when it was
+indexed, or reposted) and the URI of the post or repost. The marks of all
+readers are kept in one small JSON file next to the session file.
+"""
+
+import json
+from datetime import datetime, timezone
+from ssky.util import write_json_atomically
+
+def is_pinned(feed_item) -> bool:
+    """Check whether a feed item is the pinned post heading an author feed"""
+    return getattr(feed_item.reason, 'py_type', None) == 'app.bsky.feed.defs#reasonPin'
+
+def feed_mark(feed_item) -> dict:
+    """Mark of a feed item: {"indexed_at", "uri"}, from the repost if it is one"""
+    reason = feed_item.reason
+    if getattr(reason, 'indexed_at', None) is not None and getattr(reason, 'uri', None) is not None:
+        return {"indexed_at": reason.indexed_at, "uri": reason.uri}
+    return {"indexed_at": feed_item.post.indexed_at, "uri": feed_item.post.uri}
+
+def read_since(fetch, mark: dict, limit: int, first_page: int = 20, page: int = 100) -> tuple:
+    """Read a feed from the newest item back to a mark.
+
+    Args:
+        fetch: Function (limit, cursor) -> feed response with `feed` and `cursor`
+        mark: Mark of the newest item of the last read, or None to read `limit` items
+        limit: Most items to read
+        first_page: Size of the first page, which holds everything new in the steady state
+        page: Size of the following pages
+
+    Returns:
+        (new feed items, newest mark, gap), where gap is True if the limit
+        was reached before the mark, so that items between were not read
+    """
+    items, newest, cursor = [], None, None
+    size = min(first_page if mark is not None else page, limit)
+    while True:
+        response = fetch(size, cursor)
+        for feed_item in response.feed:
+            item_mark = feed_mark(feed_item)
+            if is_pinned(feed_item):
+                # Pinned posts head the feed whatever their age
+                if mark is None or item_mark['indexed_at'] > mark['indexed_at']:
+                    items.append(feed_item)
+                continue
+            if mark is not None and (item_mark['uri'] == mark['uri'] or item_mark['indexed_at'] < mark['indexed_at']):
+                return items, newest or mark, False
+            if newest is None:
+                newest = item_mark
+            items.append(feed_item)
+            if len(items) >= limit:
+                return items, newest, mark is not None
+        cursor = response.cursor
+        if not cursor or not response.feed:
+            return items, newest or mark, False
+        size = min(page, limit - len(items))
+
+class CheckpointStore:
+    """Marks of the feeds read with --since-last, by reader name and feed"""
+
+    def __init__(self, path: str, lock):
+        """
+        Args:
+            path: Checkpoint file
+            lock: SessionFileLock guarding the checkpoint file
+        """
+        self.path = path
+        self.lock = lock
+
+    @staticmethod
+    def key(name: str, feed: str) -> str:
+        return f"{name}:{feed}"
+
+    def get(self, key: str) -> dict:
+        """Return the mark stored under a key, or None"""
+        mark = self.read().get(key)
+        if not isinstance(mark, dict) or not mark.get('indexed_at') or not mark.get('uri'):
+            return None
+        return mark
+
+    def put(self, key: str, mark: dict) -> None:
+        with self.lock.hold(self.path + '.lock'):
+            checkpoints = self.read()
+            checkpoints[key] = {
+                "indexed_at": mark['indexed_at'],
+                "uri": mark['uri'],
+                "updated_at": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+            }
+            self.write(checkpoints)
+
+    def read(self) -> dict:
+        try:
+            with open(self.path, 'r') as f:
+                checkpoints = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return checkpoints if isinstance(checkpoints, dict) else {}
+
+    def write(self, checkpoints: dict) -> None:
+        write_json_atomically(self.path, checkpoints, indent=2)
@@ -0,0 +1,145 @@
+"""
+Threads rebuilt from the posts at hand
+
+`--thread --thread-depth 0` on a feed shows the conversation each post belongs
+to without the replies below it: up to `--thread-parent-height` posts above
+each post. Feed items come with the post they reply to and the root of their
+thread, so most conversations are complete already. A missing parent that is
+the root, or the last post within the height, is fetched with getPosts, 25 at
+a time; when more posts are missing above it, its ancestors are fetched with
+one getPostThread call. Threads with the replies below the posts are fetched
+with getPostThread instead (see expand_threads).
+"""
+
+import atproto_client
+from atproto_client import models
+from ssky.result import AtProtocolSskyError
+from ssky.thread_data import ThreadData
+from ssky.thread_data_list import ThreadDataList, thread_concurrency, thread_root_uri
+from ssky.util import concurrent_calls
+
+# Most URIs app.bsky.feed.getPosts takes
+GET_POSTS_LIMIT = 25
+
+def parent_uri(post) -> str:
+    """URI of the post a post replies to, or None"""
+    reply = getattr(post.record, 'reply', None)
+    return reply.parent.uri if reply else None
+
+def missing_ancestors(items, posts: dict, parent_height: int) -> dict:
+    """
+    The first ancestor not at hand of each post, within the parent height.
+
+    Returns:
+        Dict of the URIs by the number of posts wanted above them; 0 for
+        roots and for ancestors at the parent height
+    """
+    missing = {}
+    for item in items:
+        uri = parent_uri(item.post)
+        height = 1
+        while uri is not None and uri in posts:
+            uri = parent_uri(posts[uri])
+            height += 1
+        if uri is None or height > parent_height:
+            continue
+        above = 0 if uri == thread_root_uri(item.post) else parent_height - height
+        missing[uri] = max(missing.get(uri, 0), above)
+    return missing
+
+def fetch_posts(client, uris: list, posts: dict, thread_data_list: ThreadDataList) -> None:
+    """Add the posts of the URIs to `posts`, 25 per request"""
+    for start in range(0, len(uris), GET_POSTS_LIMIT):
+        batch = uris[start:start + GET_POSTS_LIMIT]
+        try:
+            response = client.get_posts(batch)
+        except atproto_client.exceptions.AtProtocolError as e:
+            thread_data_list.add_warning(f"Could not get {len(batch)} parent post(s): {AtProtocolSskyError(e).message}")
+            continue
+        for post in response.posts:
+            posts[post.uri] = post
+
+def fetch_chains(client, chains: dict, posts: dict, unavailable: set, thread_data_list: ThreadDataList) -> None:
+    """Add the posts of the URIs and their ancestors to `posts`, one getPostThread per URI"""
+    uris = list(chains)
+
+    def fetch(uri):
+        return client.get_post_thread(uri, depth=0, parent_height=chains[uri])
+
+    with concurrent_calls(fetch, uris, thread_concurrency()) as futures:
+        for uri, future in zip(uris, futures):
+            try:
+                node = future.result().thread
+            except atproto_client.exceptions.AtProtocolError as e:
+                thread_data_list.add_warning(f"Could not get the parents of {uri}: {AtProtocolSskyError(e).message}")
+                continue
+            # The chain ends at the root, the parent height, or a deleted or blocked post
+            while isinstance(node, models.AppBskyFeedDefs.ThreadViewPost):
+                posts[node.post.uri] = node.post
+                node = node.parent
+            if node is not None:
+                unavailable.add(node.uri)
+
+def build_threads(client, post_data_list, parent_height=10) -> ThreadDataList:
+    """
+    Build the thread of each post from its ancestors, once per thread, in the order the posts come in.
+
+    Args:
+        client: SskyClient
+        post_data_list: PostDataList of the posts, with the posts they reply to in `related`
+        parent_height: Number of parent posts to show above each post
+
+    Returns:
+        ThreadDataList with one thread per root, from the top ancestor down to the posts.
+        Replies whose parent is deleted or blocked are shown under the root, if it is at hand.
+    """
+    items = post_data_list.items
+    posts = dict(post_data_list.related)
+    for item in items:
+        posts[item.post.uri] = item.post
+
+    thread_data_list = ThreadDataList()
+    unavailable = set()
+    missing = missing_ancestors(items, posts, parent_height)
+    fetch_posts(client, [uri for uri, above in missing.items() if above == 0], posts, thread_data_list)
+    chains = {uri: above for uri, above in missing.items() if above > 0}
+    if chains:
+        fetch_chains(client, chains, posts, unavailable, thread_data_list)
+    unavailable.update(uri for uri in missing if uri not in posts)
+
+    # The root of the thread each shown post is shown in
+    shown = {}
+    for item in items:
+        root_uri = thread_root_uri(item.post)
+        uri = item.post.uri
+        height = 0
+        while uri in posts and height <= parent_height:
+            shown.setdefault(uri, root_uri)
+            uri = parent_uri(posts[uri])
+            height += 1
+        if uri in unavailable and height <= parent_height and root_uri in posts:
+            # The parent is gone; the reply is shown under the root
+            shown.setdefault(root_uri, root_uri)
+
+    # Replies of each thread by the post they are shown under, None for the top
+    threads = {thread_root_uri(item.post): {} for item in items}
+    for uri, root_uri in shown.items():
+        parent = parent_uri(posts[uri])
+        if parent not in shown:
+            # The top of the chain: the root, the parent height, or a reply whose parent is gone
+            parent = root_uri if parent in unavailable and root_uri in shown else None
+        threads[root_uri].setdefault(parent, []).append(uri)
+
+    for children in threads.values():
+        thread_posts = []
+        pending = [(uri, 0) for uri in reversed(sorted_replies(children.get(None, []), posts))]
+        while pending:
+            uri, depth = pending.pop()
+            thread_posts.append((posts[uri], depth))
+            pending.extend((reply, depth + 1) for reply in reversed(sorted_replies(children.get(uri, []), posts)))
+        thread_data_list.append(ThreadData.from_posts(thread_posts))
+    return thread_data_list
+
+def sorted_replies(uris: list, posts: dict) -> list:
+    """Posts oldest first"""
+    return sorted(uris, key=lambda uri: getattr(posts[uri], 'indexed_at', None) or '')
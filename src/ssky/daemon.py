@@ -0,0 +1,241 @@
+"""
+Long-running ssky process serving the commands of other ssky processes
+
+`ssky daemon` keeps the login, the HTTP connections and the imported modules
+of one process, and `ssky` forwards its command line to it over a Unix socket
+when it is running. Each forwarded command then costs the round trip to the
+server instead of interpreter startup, imports and login.
+
+Protocol: the client sends one JSON line {"argv": [...], "cwd": ..., "stdin": ...,
+"env": {...}, "deadline_at": ...} and receives JSON lines {"stdout": text},
+{"stderr": text} and finally {"exit": code}. `env` holds the client's settings
+of FORWARDED_ENVIRONMENT, and `deadline_at` the wall clock time its --deadline
+ends at, which includes the time spent waiting for the daemon.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import time
+
+# Commands always run by the calling process: they change what the daemon
+# would be logged in as, or are the daemon itself
+LOCAL_SUBCOMMANDS = ('daemon', 'login')
+
+# Settings read while a command runs, which the daemon takes from the client.
+# The ones choosing the session (SSKY_USER, SSKY_CONFIG_PATH, ...) pick the
+# daemon to connect to instead.
+FORWARDED_ENVIRONMENT = (
+    'SSKY_DEADLINE', 'SSKY_RETRY_ATTEMPTS', 'SSKY_RETRY_MAX_DELAY', 'SSKY_RATE_LIMIT_MAX_WAIT',
+    'SSKY_THREAD_CONCURRENCY', 'SSKY_HYDRATE_CONCURRENCY'
+)
+
+# Seconds the client waits past its deadline for the daemon to report the deadline itself
+DEADLINE_GRACE = 1.0
+
+def socket_path() -> str:
+    """Socket of the daemon serving the session file in use (SSKY_DAEMON_SOCKET overrides it)"""
+    if 'SSKY_DAEMON_SOCKET' in os.environ:
+        return os.environ['SSKY_DAEMON_SOCKET']
+    # Same default as SskySession.config_path, without importing atproto
+    config_path = os.environ.get('SSKY_CONFIG_PATH') or os.path.expanduser('~/.ssky')
+    return config_path + '.sock'
+
+def forward(argv: list, subcommand: str, args) -> int:
+    """Run a command in the daemon and copy its output.
+
+    Returns:
+        The exit status of the command, or None if no daemon is running
+    """
+    if subcommand in LOCAL_SUBCOMMANDS or os.environ.get('SSKY_NO_DAEMON') == '1' or not hasattr(socket, 'AF_UNIX'):
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+    except OSError:
+        connection.close()
+        return None
+
+    deadline = getattr(args, 'deadline', None)
+    deadline_at = time.time() + deadline if deadline is not None else None
+    stdin = None
+    if subcommand == 'post' and getattr(args, 'message', None) is None and not sys.stdin.isatty():
+        stdin = sys.stdin.read()
+    elif subcommand == 'get' and getattr(args, 'target', None) == '-':
+        stdin = sys.stdin.read()
+    request = {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "stdin": stdin,
+        "env": {name: os.environ[name] for name in FORWARDED_ENVIRONMENT if name in os.environ},
+        "deadline_at": deadline_at
+    }
+    with connection, connection.makefile('rwb') as stream:
+        stream.write(json.dumps(request).encode('utf-8') + b'\n')
+        stream.flush()
+        while True:
+            if deadline_at is not None:
+                # The daemon runs one command at a time, so this may wait behind others
+                connection.settimeout(max(deadline_at - time.time(), 0) + DEADLINE_GRACE)
+            try:
+                line = stream.readline()
+            except socket.timeout:
+                return deadline_exceeded(deadline, args)
+            if not line:
+                break
+            frame = json.loads(line)
+            if 'stdout' in frame:
+                sys.stdout.write(frame['stdout'])
+            elif 'stderr' in frame:
+                sys.stderr.write(frame['stderr'])
+            elif 'exit' in frame:
+                sys.stdout.flush()
+                return frame['exit']
+    print('ssky daemon closed the connection', file=sys.stderr)
+    return 1
+
+def deadline_exceeded(deadline: float, args) -> int:
+    """Report a deadline that passed while waiting for the daemon, as execute reports errors"""
+    from ssky.result import DeadlineExceededError, ErrorResult
+    error = DeadlineExceededError(deadline, 'waiting for ssky daemon')
+    if getattr(args, 'format', None) in ('json', 'simple_json'):
+        print(ErrorResult(error.message, error.http_code).to_json())
+    else:
+        print(error.message, file=sys.stderr)
+    return 1
+
+@contextlib.contextmanager
+def client_environment(environment: dict):
+    """Run the block with the client's settings of FORWARDED_ENVIRONMENT (None: the daemon's own)"""
+    if environment is None:
+        yield
+        return
+    saved = {name: os.environ.get(name) for name in FORWARDED_ENVIRONMENT}
+    try:
+        for name in FORWARDED_ENVIRONMENT:
+            if name in environment:
+                os.environ[name] = str(environment[name])
+            else:
+                os.environ.pop(name, None)
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+class FrameWriter(io.TextIOBase):
+    """Text stream sending what is written to the client as frames of one kind"""
+
+    def __init__(self, stream, kind: str):
+        self.stream = stream
+        self.kind = kind
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self.stream.write(json.dumps({self.kind: text}).encode('utf-8') + b'\n')
+        return len(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+def handle(connection: socket.socket) -> None:
+    """Run one forwarded command"""
+    from ssky.main import execute, parse
+
+    with connection.makefile('rwb') as stream:
+        request = json.loads(stream.readline() or b'{}')
+        stdout, stderr = FrameWriter(stream, 'stdout'), FrameWriter(stream, 'stderr')
+        original_cwd, original_stdin = os.getcwd(), sys.stdin
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    os.chdir(request.get('cwd') or original_cwd)
+                    sys.stdin = io.StringIO(request.get('stdin') or '')
+                    with client_environment(request.get('env')):
+                        subcommand, args = parse(request.get('argv', []))
+                        if request.get('deadline_at') is not None:
+                            # What is left after waiting for the commands before this one
+                            args.deadline = max(request['deadline_at'] - time.time(), 0.001)
+                        status = 0 if execute(subcommand, args) is True else 1
+                except SystemExit as e:
+                    status = e.code if isinstance(e.code, int) else 1
+        finally:
+            os.chdir(original_cwd)
+            sys.stdin = original_stdin
+        stream.write(json.dumps({"exit": status}).encode('utf-8') + b'\n')
+        stream.flush()
+
+def serve(server: socket.socket) -> None:
+    """Serve forwarded commands one at a time until the server socket is closed"""
+    while True:
+        try:
+            connection, _ = server.accept()
+        except OSError:
+            return
+        with connection:
+            try:
+                handle(connection)
+            except (OSError, ValueError):
+                pass  # The client went away or sent garbage
+
+def listen(path: str) -> socket.socket:
+    """Create the server socket, readable and writable by the owner only"""
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            raise OSError(f'ssky daemon already running on {path}')
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)  # Left over by a daemon that did not stop cleanly
+        finally:
+            probe.close()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(previous_umask)
+    server.listen()
+    return server
+
+def daemon(**kwargs):
+    import atproto_client
+    from ssky.result import AtProtocolSskyError, SessionError, SuccessResult
+    from ssky.ssky_session import SskySession
+
+    # Log in now, so that the first forwarded command finds the session ready
+    try:
+        SskySession()
+    except atproto_client.exceptions.AtProtocolError as e:
+        raise AtProtocolSskyError(e) from e
+    if SskySession.status() != SskySession.Status.LOGGED_IN:
+        if SskySession.login_error is not None:
+            raise AtProtocolSskyError(SskySession.login_error) from SskySession.login_error
+        raise SessionError()
+
+    path = socket_path()
+    server = listen(path)
+    # Stop after the command being served, if any
+    signal.signal(signal.SIGTERM, lambda num, frame: server.close())
+    signal.signal(signal.SIGINT, lambda num, frame: server.close())
+    print(f'ssky daemon listening on {path}', file=sys.stderr)
+    sys.stderr.flush()
+    try:
+        serve(server)
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+    return SuccessResult(message='ssky daemon stopped')
@@ -0,0 +1,73 @@
+"""
+One time budget for all network operations of a command
+
+`ssky --deadline SECONDS` (or SSKY_DEADLINE) starts a deadline for the
+command. Login, XRPC requests, their retries and rate limit waits, link card
+fetches and the waits for posts to be indexed all take their timeouts from
+what is left of it, and fail with DeadlineExceededError once it has passed.
+The deadline is a context variable, so it follows the command into the worker
+threads the MCP server runs commands in.
+"""
+
+import contextlib
+import contextvars
+import time
+
+from ssky.result import DeadlineExceededError
+
+_current = contextvars.ContextVar('ssky_deadline', default=None)
+
+class Deadline:
+    """Point in time by which a command has to be done"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+@contextlib.contextmanager
+def deadline_scope(seconds: float = None):
+    """Run the block under a deadline, unless an earlier one is already running (None: no deadline)"""
+    current = _current.get()
+    if seconds is None or (current is not None and current.remaining() <= seconds):
+        yield current
+        return
+    token = _current.set(Deadline(seconds))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+def remaining() -> float:
+    """Seconds left of the current deadline, or None without one"""
+    current = _current.get()
+    return None if current is None else current.remaining()
+
+def check(doing: str) -> None:
+    """Fail if the current deadline has passed"""
+    current = _current.get()
+    if current is not None and current.remaining() <= 0:
+        raise DeadlineExceededError(current.seconds, doing)
+
+def timeout(default: float) -> float:
+    """Timeout of a network operation: `default`, cut short by the current deadline"""
+    current = _current.get()
+    if current is None:
+        return default
+    left = current.remaining()
+    if left <= 0:
+        raise DeadlineExceededError(current.seconds, 'starting a network request')
+    return left if default is None else min(default, left)
+
+def check_wait(seconds: float, doing: str) -> None:
+    """Fail right away if waiting this long would run past the current deadline"""
+    current = _current.get()
+    if current is not None and current.remaining() < seconds:
+        raise DeadlineExceededError(current.seconds, doing)
+
+def sleep(seconds: float, doing: str) -> None:
+    """Wait, failing right away if the wait would run past the current deadline"""
+    check_wait(seconds, doing)
+    time.sleep(seconds)
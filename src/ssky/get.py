@@ -1,15 +1,21 @@
+import os
 import atproto_client
-from ssky.ssky_session import expand_actor, ssky_client
+from ssky.checkpoint import CheckpointStore, read_since
+from ssky.conversation import GET_POSTS_LIMIT, build_threads
+from ssky.ssky_session import SskySession, expand_actor, ssky_client
 from ssky.post_data_list import PostDataList
-from ssky.thread_data import ThreadData
-from ssky.thread_data_list import ThreadDataList
+from ssky.post_data_stream import PAGE_LIMIT, PostDataStream
+from ssky.thread_data_list import expand_threads
 from ssky.result import (
     AtProtocolSskyError,
     SessionError,
     InvalidActorError,
     InvalidOptionCombinationError
 )
-from ssky.util import disjoin_uri_cid, is_joined_uri_cid
+from ssky.util import concurrent_calls, disjoin_uri_cid, is_joined_uri_cid, join_uri_cid
+
+# Requests of `ssky get -` running at the same time, unless SSKY_HYDRATE_CONCURRENCY says otherwise
+HYDRATE_CONCURRENCY = 4
 
 def get_posts(client, uri, cid) -> None:
     res = client.get_posts([uri])
@@ -19,21 +25,134 @@ def get_posts(client, uri, cid) -> None:
             post_data_list.append(post)
     return post_data_list
 
-def get_author_feed(client, user, limit=100) -> None:
-    res = client.get_author_feed(user, limit=limit)
+def hydrate_concurrency() -> int:
+    """Number of getPosts requests `ssky get -` runs at the same time (SSKY_HYDRATE_CONCURRENCY)"""
+    try:
+        return max(1, int(os.environ.get('SSKY_HYDRATE_CONCURRENCY', HYDRATE_CONCURRENCY)))
+    except ValueError:
+        return HYDRATE_CONCURRENCY
+
+def hydrate_posts(client, lines, concurrency=None) -> PostDataList:
+    """Get the posts of many URI[::CID] lines, 25 per request, several requests at a time.
+
+    Args:
+        client: SskyClient
+        lines: Lines of post URIs, each with or without its CID
+        concurrency: Requests running at the same time (default: hydrate_concurrency())
+
+    Returns:
+        PostDataList of the posts in the order of the lines, with warnings
+        listing the posts not found and the lines that are not post URIs
+    """
+    targets = []
+    skipped = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        uri, cid = disjoin_uri_cid(line) if is_joined_uri_cid(line) else (line, None)
+        if not uri.startswith('at://'):
+            skipped += 1
+            continue
+        targets.append((uri, cid))
+
+    uris = list(dict.fromkeys(uri for uri, _ in targets))
+    batches = [uris[start:start + GET_POSTS_LIMIT] for start in range(0, len(uris), GET_POSTS_LIMIT)]
+    posts = {}
+    failed = set()
+    post_data_list = PostDataList()
+    if batches:
+        with concurrent_calls(client.get_posts, batches, concurrency or hydrate_concurrency()) as futures:
+            for batch, future in zip(batches, futures):
+                try:
+                    for post in future.result().posts:
+                        posts[post.uri] = post
+                except atproto_client.exceptions.AtProtocolError as e:
+                    # Other errors (session, deadline) fail the whole command
+                    failed.update(batch)
+                    post_data_list.add_warning(f"Could not get {len(batch)} post(s) from {batch[0]}: {AtProtocolSskyError(e).message}")
+
+    not_found = []
+    for uri, cid in targets:
+        post = posts.get(uri)
+        if post is not None and (cid is None or post.cid == cid):
+            post_data_list.append(post)
+        elif uri not in failed:
+            not_found.append(uri if cid is None else join_uri_cid(uri, cid))
+    if not_found:
+        post_data_list.add_warning(f"{len(not_found)} post(s) not found: {', '.join(dict.fromkeys(not_found))}")
+    if skipped:
+        post_data_list.add_warning(f"Skipped {skipped} line(s) that are not post URIs")
+    return post_data_list
+
+def get_author_feed(client, user, limit=100, cursor=None) -> None:
+    res = client.get_author_feed(user, limit=limit, cursor=cursor)
     post_data_list = PostDataList()
     for feed_post in res.feed:
         post_data_list.append(feed_post.post)
+        post_data_list.add_related(feed_post.reply)
+    post_data_list.cursor = res.cursor
     return post_data_list
 
-def get_timeline(client, limit=100) -> None:
-    res = client.get_timeline(limit=limit)
+def get_timeline(client, limit=100, cursor=None) -> None:
+    res = client.get_timeline(limit=limit, cursor=cursor)
     post_data_list = PostDataList()
     for feed_post in res.feed:
         post_data_list.append(feed_post.post)
+        post_data_list.add_related(feed_post.reply)
+    post_data_list.cursor = res.cursor
     return post_data_list
 
-def get(target=None, limit=100, thread=False, thread_depth=10, thread_parent_height=0, format='', **kwargs):
+def get_feed(fetch, limit=None, cursor=None):
+    """Read a feed, following its cursor for more posts than one page holds.
+
+    Args:
+        fetch: get_timeline or get_author_feed with the client (and user) bound
+
+    Returns:
+        PostDataList of one page, or a PostDataStream reading the pages while they are printed
+    """
+    if limit is None or limit <= PAGE_LIMIT:
+        return fetch(limit=limit, cursor=cursor)
+
+    def fetch_page(page_limit, page_cursor):
+        # Pages after the first are read while the result is printed
+        try:
+            return fetch(limit=page_limit, cursor=page_cursor)
+        except atproto_client.exceptions.AtProtocolError as e:
+            raise AtProtocolSskyError(e) from e
+
+    return PostDataStream(fetch_page, limit, cursor=cursor)
+
+def get_since_last(fetch, name, feed, limit=None):
+    """Read the posts of a feed that are new since the last read by the same name.
+
+    Args:
+        fetch: Function (limit, cursor) -> feed response
+        name: Name of the reader (--since-last NAME)
+        feed: Feed the mark is kept for ("timeline:<viewer DID>" or "author:<actor>")
+        limit: Most posts to read (default: 100)
+
+    Returns:
+        PostDataList of the new posts, newest first, with a warning if there
+        were more new posts than the limit
+    """
+    limit = limit or 100
+    store = SskySession.checkpoint_store()
+    key = CheckpointStore.key(name, feed)
+    mark = store.get(key)
+    feed_items, newest, gap = read_since(fetch, mark, limit)
+    post_data_list = PostDataList()
+    for feed_item in feed_items:
+        post_data_list.append(feed_item.post)
+        post_data_list.add_related(feed_item.reply)
+    if gap:
+        post_data_list.add_warning(f'More than {limit} new posts since the last read; older new posts were skipped')
+    if newest is not None:
+        store.put(key, newest)
+    return post_data_list
+
+def get(target=None, limit=100, cursor=None, thread=False, thread_depth=10, thread_parent_height=0, format='', since_last=None, uris=None, **kwargs):
     try:
         current_session = ssky_client()
         if current_session is None:
@@ -43,10 +162,29 @@ def get(target=None, limit=100, thread=False, thread_depth=10, thread_parent_hei
         if thread and format in ('json', 'simple_json'):
             raise InvalidOptionCombinationError("--thread cannot be used with --json or --simple-json")
 
+        if since_last is not None and cursor is not None:
+            raise InvalidOptionCombinationError("--since-last cannot be used with --cursor")
+        if since_last is not None and target is not None and (target.startswith('at://') or target == '-'):
+            raise InvalidOptionCombinationError("--since-last needs a timeline or an author feed")
+
         # First, retrieve posts normally
-        if target is None:
+        if since_last is not None:
+            if target is None:
+                feed = f"timeline:{current_session.me.did}"
+                fetch = lambda page_limit, page_cursor: current_session.get_timeline(limit=page_limit, cursor=page_cursor)
+            else:
+                actor = target if target.startswith('did:') else expand_actor(target)
+                if not actor:
+                    raise InvalidActorError()
+                feed = f"author:{actor}"
+                fetch = lambda page_limit, page_cursor: current_session.get_author_feed(actor, limit=page_limit, cursor=page_cursor)
+            post_data_list = get_since_last(fetch, since_last, feed, limit=limit)
+        elif target is None:
             # Get timeline
-            post_data_list = get_timeline(current_session, limit=limit)
+            post_data_list = get_feed(lambda **page: get_timeline(current_session, **page), limit=limit, cursor=cursor)
+        elif target == '-':
+            # Post URIs read from stdin by main
+            post_data_list = hydrate_posts(current_session, uris or [])
         elif target.startswith('at://'):
             # AT URI - single post or post with CID
             if is_joined_uri_cid(target):
@@ -57,49 +195,23 @@ def get(target=None, limit=100, thread=False, thread_depth=10, thread_parent_hei
             post_data_list = get_posts(current_session, uri, cid)
         elif target.startswith('did:'):
             # DID - get author feed
-            post_data_list = get_author_feed(current_session, target, limit=limit)
+            post_data_list = get_feed(lambda **page: get_author_feed(current_session, target, **page), limit=limit, cursor=cursor)
         else:
             # Handle or other identifier - expand and get author feed
             actor = expand_actor(target)
             if not actor:
                 raise InvalidActorError()
-            post_data_list = get_author_feed(current_session, actor, limit=limit)
+            post_data_list = get_feed(lambda **page: get_author_feed(current_session, actor, **page), limit=limit, cursor=cursor)
 
         # If --thread is specified, expand each post into threads
         if thread:
-            thread_data_list = ThreadDataList()
-
-            # Group posts by their root thread URI
-            thread_groups = {}  # {root_uri: [posts]}
-            root_order = []  # Track order of root URIs for maintaining result order
-
-            for item in post_data_list.items:
-                # Determine the root URI of this post's thread
-                if hasattr(item.post.record, 'reply') and item.post.record.reply:
-                    root_uri = item.post.record.reply.root.uri
-                else:
-                    root_uri = item.post.uri  # This post is the root
-
-                # Add to group and track order
-                if root_uri not in thread_groups:
-                    thread_groups[root_uri] = []
-                    root_order.append(root_uri)
-                thread_groups[root_uri].append(item.post)
-
-            # Fetch each thread once using its root URI
-            for root_uri in reversed(root_order):  # Process oldest first
-                thread_response = current_session.get_post_thread(
-                    root_uri,
-                    depth=thread_depth,
-                    parent_height=thread_parent_height
-                )
-                thread_data = ThreadData(thread_response)
-                thread_data_list.append(thread_data)
-
-            # Reverse to show newest first (matching result order)
-            thread_data_list.threads.reverse()
-
-            return thread_data_list
+            if isinstance(post_data_list, PostDataStream):
+                # Posts are grouped by thread across pages
+                post_data_list = post_data_list.to_post_data_list()
+            if thread_depth == 0:
+                # Without the replies, the threads are built from the posts at hand
+                return build_threads(current_session, post_data_list, parent_height=thread_parent_height)
+            return expand_threads(current_session, post_data_list, depth=thread_depth, parent_height=thread_parent_height)
         else:
             return post_data_list
 
@@ -1,6 +1,6 @@
 import argparse
+import contextlib
 from importlib import import_module
-from importlib.metadata import version, PackageNotFoundError
 import io
 import logging
 from operator import attrgetter
@@ -11,19 +11,34 @@ from ssky.result import ErrorResult, SuccessResult, DryRunResult, SskyError
 
 def get_version():
     """Get the version of the ssky package."""
+    # importlib.metadata takes longer to import than the rest of this module
+    from importlib.metadata import version, PackageNotFoundError
     try:
         return version("ssky")
     except PackageNotFoundError:
         return "unknown"
 
-def parse():
+class VersionAction(argparse.Action):
+    """--version that looks the version up only when it is asked for."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help="show program's version number and exit"):
+        super().__init__(option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        print(get_version())
+        parser.exit()
+
+def parse(argv=None):
     class SortingHelpFormatter(argparse.HelpFormatter):
         def add_arguments(self, actions):
             actions = sorted(actions, key=attrgetter('option_strings'))
             super(SortingHelpFormatter, self).add_arguments(actions)
 
     parser = argparse.ArgumentParser(formatter_class=SortingHelpFormatter, description='Simple Bluesky Client')
-    parser.add_argument('--version', action='version', version=get_version())
+    parser.add_argument('--version', action=VersionAction)
+    parser.add_argument('--startup-report', action='store_true', help='Run the command and print where its start-up time went to stderr')
+    parser.add_argument('--account', type=str, default=None, metavar='NAME', help='Act as an account saved with "ssky --account NAME login" (handle or DID)')
+    parser.add_argument('--deadline', type=float, default=os.environ.get('SSKY_DEADLINE'), metavar='SECONDS', help='Give up when the command takes longer, network waits included (default: SSKY_DEADLINE)')
     sp = parser.add_subparsers(dest='subcommand', title='Subcommand', required=True)
 
     delimiter_options = argparse.ArgumentParser(add_help=False)
@@ -41,6 +56,7 @@ def parse():
 
     limit_options = argparse.ArgumentParser(add_help=False)
     limit_options.add_argument('-N', '--limit', type=int, metavar='NUM', help='Limit lines')
+    limit_options.add_argument('--cursor', type=str, default=None, metavar='CURSOR', help='Continue from the cursor returned with the previous page')
 
     delete_parser = sp.add_parser('delete', formatter_class=SortingHelpFormatter, parents=[delimiter_options, format_options], help='Delete post')
     delete_parser.add_argument('target', type=str, metavar='POST', help='URI(at://...)[::CID]')
@@ -49,12 +65,15 @@ def parse():
     follow_parser.add_argument('actor', type=str, metavar='NAME', help='Handle, DID, or "myself" to follow')
 
     get_parser = sp.add_parser('get', formatter_class=SortingHelpFormatter, parents=[delimiter_options, format_options, limit_options], help='Get posts')
-    get_parser.add_argument('target', nargs='?', type=str, default=None, metavar='PARAM', help='URI(at://...), DID(did:...), handle, "myself", or none as timeline')
+    get_parser.add_argument('target', nargs='?', type=str, default=None, metavar='PARAM', help='URI(at://...), DID(did:...), handle, "myself", "-" for URIs from stdin, or none as timeline')
     get_parser.add_argument('--thread', action='store_true', help='Retrieve full thread for each post')
     get_parser.add_argument('--thread-depth', type=int, default=10, metavar='NUM', help='Maximum depth of thread replies to retrieve (default: 10)')
     get_parser.add_argument('--thread-parent-height', type=int, default=10, metavar='NUM', help='Number of parent posts to retrieve (default: 10)')
+    get_parser.add_argument('--since-last', nargs='?', const='default', default=None, metavar='NAME', help='Only posts newer than the last read with the same NAME (give it as --since-last=NAME)')
 
 
+    sp.add_parser('daemon', formatter_class=SortingHelpFormatter, parents=[delimiter_options, format_options], help='Keep the login warm and run the commands of other ssky processes')
+
     login_parser = sp.add_parser('login', formatter_class=SortingHelpFormatter, parents=[delimiter_options, format_options], help='Login')
     login_parser.add_argument('credentials', nargs='?', type=str, default=None, help='User credentials (handle:password)')
 
@@ -87,6 +106,9 @@ def parse():
     search_parser.add_argument('--thread-depth', type=int, default=10, metavar='NUM', help='Maximum depth of thread replies to retrieve (default: 10)')
     search_parser.add_argument('--thread-parent-height', type=int, default=10, metavar='NUM', help='Number of parent posts to retrieve (default: 10)')
 
+    session_parser = sp.add_parser('session', formatter_class=SortingHelpFormatter, parents=[delimiter_options, format_options], help='Manage the saved session')
+    session_parser.add_argument('action', choices=['export'], help='export: print the session as a value for SSKY_SESSION')
+
     unfollow_parser = sp.add_parser('unfollow', formatter_class=SortingHelpFormatter, parents=[delimiter_options, format_options], help='Unfollow')
     unfollow_parser.add_argument('actor', type=str, metavar='NAME', help='Handle, DID, or "myself" to unfollow')
 
@@ -96,12 +118,36 @@ def parse():
     user_parser = sp.add_parser('user', formatter_class=SortingHelpFormatter, parents=[delimiter_options, format_options, limit_options], help='Search users')
     user_parser.add_argument('query', type=str, metavar='QUERY', help='Query string')
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     subcommand = args.subcommand
     del args.subcommand
+    del args.startup_report  # Handled by main() before parsing
 
     return subcommand, args
 
+def invoke(subcommand, args):
+    """Run a subcommand and return its result object without printing it."""
+    module = import_module(f'.{subcommand}', f'{__package__}')
+    func = getattr(module, f'{subcommand}')
+    kwargs = dict(vars(args))
+    kwargs.pop('account', None)
+    kwargs.pop('deadline', None)
+    from ssky.deadline import deadline_scope
+    from ssky.retry import recording_retries, retry_warning
+    with deadline_scope(getattr(args, 'deadline', None)), account_scope(args), recording_retries() as retries:
+        result = func(**kwargs)
+    if retries and hasattr(result, 'add_warning'):
+        result.add_warning(retry_warning(retries))
+    return result
+
+def account_scope(args):
+    """Context manager acting as the account selected with --account, if any."""
+    account = getattr(args, 'account', None)
+    if account is None:
+        return contextlib.nullcontext()
+    from ssky.ssky_session import SskySession
+    return SskySession.using(SskySession.account_context(account))
+
 def execute(subcommand, args) -> bool:
     try:
         if subcommand == 'post' and hasattr(args, 'message') and args.message is None:
@@ -109,24 +155,32 @@ def execute(subcommand, args) -> bool:
                 stdin_content = sys.stdin.read().strip()
                 if stdin_content:
                     args.message = stdin_content
+        if subcommand == 'get' and getattr(args, 'target', None) == '-':
+            # Post URIs to get, one per line
+            args.uris = sys.stdin.read().splitlines()
             
-        module = import_module(f'.{subcommand}', f'{__package__}')
-        func = getattr(module, f'{subcommand}')
-        result = func(**vars(args))
-
-        if result is None:
-            return False
-        
-        from ssky.post_data_list import PostDataList
-        from ssky.profile_list import ProfileList
-        
-        if hasattr(result, 'print'):
-            result.print(format=args.format, output=args.output, delimiter=args.delimiter)
-        else:
-            print(result)
+        # One deadline for the command and the printing of its result
+        from ssky.deadline import deadline_scope
+        with deadline_scope(getattr(args, 'deadline', None)):
+            result = invoke(subcommand, args)
+
+            if result is None:
+                return False
+
+            from ssky.post_data_list import PostDataList
+            from ssky.profile_list import ProfileList
+
+            # Results may fetch what they print (e.g. profiles) with the session
+            with account_scope(args):
+                if hasattr(result, 'print'):
+                    result.print(format=args.format, output=args.output, delimiter=args.delimiter)
+                else:
+                    print(result)
         return True
     except SskyError as e:
-        error_result = ErrorResult(e.message, e.http_code)
+        if getattr(e, 'printed', False):
+            return False  # Reported in the output streamed so far
+        error_result = ErrorResult(e.message, e.http_code, getattr(e, 'data', None))
         if args.format in ('json', 'simple_json'):
             print(error_result.to_json())
         else:
@@ -157,9 +211,34 @@ def setup():
         stream=sys.stderr
     )
 
+def startup_report_requested(argv: list) -> bool:
+    """Check for --startup-report among the options in front of the subcommand"""
+    values = False
+    for arg in argv:
+        if values:
+            values = False
+        elif arg == '--startup-report':
+            return True
+        elif arg in ('--account', '--deadline'):
+            values = True
+        elif not arg.startswith('-'):
+            return False
+    return False
+
 def main() -> int:
     setup()
+    argv = sys.argv[1:]
+    if startup_report_requested(argv):
+        # Checked before parsing, so that it works with --version and --help too
+        from ssky.startup_report import startup_report
+        sys.stdout.flush()
+        return startup_report([arg for arg in argv if arg != '--startup-report'])
     subcommand, args = parse()
+    # Run in `ssky daemon` if one is running
+    from ssky.daemon import forward
+    status = forward(sys.argv[1:], subcommand, args)
+    if status is not None:
+        return status
     status = execute(subcommand, args)
     return 0 if status is True else 1
 
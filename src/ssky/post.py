@@ -1,9 +1,10 @@
 import re
 import sys
-from atproto import DidInMemoryCache, IdResolver, models
 import atproto_client
-from bs4 import BeautifulSoup
-import requests
+from atproto_client import models
+from atproto_identity.cache.in_memory_cache import DidInMemoryCache
+from atproto_identity.resolver import IdResolver
+from ssky import deadline
 from ssky.ssky_session import ssky_client
 from ssky.post_data_list import PostDataList
 from ssky.result import (
@@ -12,10 +13,10 @@ from ssky.result import (
     SessionError,
     NotFoundError,
     TooManyImagesError,
-    InvalidOptionCombinationError
+    InvalidOptionCombinationError,
+    DeadlineExceededError
 )
-from ssky.util import disjoin_uri_cid, is_joined_uri_cid
-from time import sleep
+from ssky.util import disjoin_uri_cid, is_joined_uri_cid, join_uri_cid
 import logging
 import atproto_client.exceptions
 
@@ -27,7 +28,16 @@ logger = logging.getLogger(__name__)
 # re-issuing DNS/HTTP lookups.
 _did_cache = DidInMemoryCache()
 
+# Seconds to wait for a linked page or its thumbnail
+FETCH_TIMEOUT = 10.0
+
+# Seconds to wait for a new post to become available, unless a deadline says otherwise
+POST_WAIT_TIMEOUT = 60.0
+
 def get_card(links, warnings=None):
+    # Only posts with links need requests; imported here to keep startup fast
+    import requests
+
     if warnings is None:
         warnings = []
         
@@ -38,8 +48,9 @@ def get_card(links, warnings=None):
         uri = link['uri']
 
         res = None
+        fetch_timeout = deadline.timeout(FETCH_TIMEOUT)
         try:
-            res = requests.get(uri, headers=headers)
+            res = requests.get(uri, headers=headers, timeout=fetch_timeout)
         except Exception as e:
             error_message = str(e)
             warnings.append(f'Failed to fetch card: {error_message}')
@@ -51,7 +62,7 @@ def get_card(links, warnings=None):
 
                 res_no_user_agent = None
                 try:
-                    res_no_user_agent = requests.get(uri, headers=headers_no_user_agent)
+                    res_no_user_agent = requests.get(uri, headers=headers_no_user_agent, timeout=fetch_timeout)
                 except Exception as e:
                     pass
 
@@ -234,21 +245,24 @@ def get_mentions(message):
     if mentions:
         # Reuse a single resolver (with a shared cache) instead of constructing
         # one per mention.
-        resolver = IdResolver(cache=_did_cache)
+        resolver = IdResolver(timeout=deadline.timeout(None), cache=_did_cache)
         for key in mentions:
             name = mentions[key]['handle'][1:]
             mentions[key]['did'] = resolver.handle.resolve(name)
     return mentions
 
 def get_thumbnail(uri, warnings=None):
+    import requests
+
     headers = { 'Cache-Control': 'no-cache', 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.61 Safari/537.36' }
     
     if warnings is None:
         warnings = []
 
     res = None
+    fetch_timeout = deadline.timeout(FETCH_TIMEOUT)
     try:
-        res = requests.get(uri, headers=headers)
+        res = requests.get(uri, headers=headers, timeout=fetch_timeout)
     except Exception as e:
         error_message = str(e)
         warnings.append(f'Failed to fetch thumbnail: {error_message}')
@@ -260,7 +274,7 @@ def get_thumbnail(uri, warnings=None):
 
             res_no_user_agent = None
             try:
-                res_no_user_agent = requests.get(uri, headers=headers_no_user_agent)
+                res_no_user_agent = requests.get(uri, headers=headers_no_user_agent, timeout=fetch_timeout)
             except Exception as e:
                 pass
 
@@ -332,6 +346,18 @@ def get_post(uri_cid):
 
     return posts[0]
 
+def wait_for_post(uri, warnings):
+    """Wait for a new post to become available and return it (at most POST_WAIT_TIMEOUT seconds without a deadline)"""
+    capped = deadline.remaining() is None
+    doing = f'waiting for {uri} to become available' + (' (give --deadline to wait longer)' if capped else '')
+    with deadline.deadline_scope(POST_WAIT_TIMEOUT if capped else None):
+        post = get_post(uri)
+        while post is None:
+            warnings.append('Waiting for post to become available')
+            deadline.sleep(1, doing)
+            post = get_post(uri)
+    return post
+
 def get_root_strong_ref(post):
     slug = post.uri.split('/')[-1]
     did = post.author.did
@@ -591,7 +617,7 @@ def split_text_with_facets(text, links_dict, mentions_dict, tags_dict, max_chars
 
 def post_as_thread(parts_with_facets, images=None, image_alts=None, video=None,
                    video_alt=None, reply_to=None, quote=None, langs=None,
-                   allow_reply=None, no_quote=False, warnings=None):
+                   allow_reply=None, no_quote=False, warnings=None, posted=None):
     """
     Post multiple parts as a thread.
 
@@ -607,16 +633,19 @@ def post_as_thread(parts_with_facets, images=None, image_alts=None, video=None,
         allow_reply: Optional reply restriction (threadgate) for the root post
         no_quote: When True, disallow quote posts of the root post (postgate)
         warnings: Warning list to append to
+        posted: List to append the created posts to, kept when posting
+            stops partway
 
     Returns:
         PostDataList: All posted parts
     """
     if warnings is None:
         warnings = []
+    if posted is None:
+        posted = []
     langs = langs or None
 
     client = ssky_client()
-    posted = []
     root_ref = None
     parent_ref = None
 
@@ -695,7 +724,7 @@ def post_as_thread(parts_with_facets, images=None, image_alts=None, video=None,
                 root_ref = models.create_strong_ref(result)
                 parent_ref = root_ref
                 posted.append(result)
-                sleep(0.5)
+                deadline.sleep(0.5, 'posting a thread')
                 continue
             elif images:
                 # Handle images
@@ -711,7 +740,7 @@ def post_as_thread(parts_with_facets, images=None, image_alts=None, video=None,
                 root_ref = models.create_strong_ref(result)
                 parent_ref = root_ref
                 posted.append(result)
-                sleep(0.5)
+                deadline.sleep(0.5, 'posting a thread')
                 continue
 
             current_reply_to = reply_to
@@ -745,7 +774,7 @@ def post_as_thread(parts_with_facets, images=None, image_alts=None, video=None,
         parent_ref = models.create_strong_ref(result)
 
         posted.append(result)
-        sleep(0.5)
+        deadline.sleep(0.5, 'posting a thread')
 
     # Apply reply/quote controls to the root post
     if posted and (allow_reply is not None or no_quote):
@@ -754,12 +783,7 @@ def post_as_thread(parts_with_facets, images=None, image_alts=None, video=None,
     # Wait for all posts to be available
     result_posts = []
     for result in posted:
-        post = get_post(result.uri)
-        while post is None:
-            warnings.append('Waiting for post to become available')
-            sleep(1)
-            post = get_post(result.uri)
-        result_posts.append(post)
+        result_posts.append(wait_for_post(result.uri, warnings))
 
     # Create PostDataList
     post_list = PostDataList()
@@ -774,6 +798,7 @@ def post(message=None, image=None, dry=False, reply_to=None, quote=None, no_spli
          alt=None, lang=None, video=None, video_alt=None, allow_reply=None, no_quote=False,
          **kwargs):
     warnings = []  # Collect warnings during processing
+    posted = []  # Posts created so far, reported if the deadline passes
 
     try:
         current_session = ssky_client()
@@ -900,7 +925,8 @@ def post(message=None, image=None, dry=False, reply_to=None, quote=None, no_spli
                     langs=langs,
                     allow_reply=allow_reply,
                     no_quote=no_quote,
-                    warnings=warnings
+                    warnings=warnings,
+                    posted=posted
                 )
 
             # Get card info for links
@@ -1034,16 +1060,14 @@ def post(message=None, image=None, dry=False, reply_to=None, quote=None, no_spli
                 reply_to=reply_ref
             )
 
+        posted.append(result)
+
         # Apply reply/quote controls
         if allow_reply is not None or no_quote:
             apply_post_gates(current_session, result.uri, allow_reply=allow_reply, no_quote=no_quote)
 
         # Wait for post to be available and return it
-        post = get_post(result.uri)
-        while post is None:
-            warnings.append('Waiting for post to become available')
-            sleep(1)
-            post = get_post(result.uri)
+        post = wait_for_post(result.uri, warnings)
         
         # Create PostDataList and add warnings
         post_list = PostDataList().append(post)
@@ -1052,5 +1076,12 @@ def post(message=None, image=None, dry=False, reply_to=None, quote=None, no_spli
         
         return post_list
         
+    except DeadlineExceededError as e:
+        if not posted:
+            raise
+        raise e.with_partial_result(
+            f"posted {len(posted)} post(s)",
+            {"posted": [join_uri_cid(result.uri, result.cid) for result in posted]}
+        ) from e
     except atproto_client.exceptions.AtProtocolError as e:
         raise AtProtocolSskyError(e) from e
\ No newline at end of file
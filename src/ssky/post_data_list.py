@@ -211,7 +211,10 @@ class PostDataList:
 
     def __init__(self, default_delimiter: str = None) -> None:
         self.items = []
+        self.ids = set()  # IDs of the items, to skip duplicates quickly
         self.warnings = []  # Add warnings list
+        self.cursor = None  # Cursor of the next page, if any
+        self.related = {}  # Posts the items reply to that came along with them, by URI
         if default_delimiter is not None:
             self.default_delimiter = default_delimiter
 
@@ -237,7 +240,8 @@ class PostDataList:
 
     def append(self, post: models.AppBskyFeedDefs.PostView, profile: models.AppBskyActorDefs.ProfileViewDetailed = None, uri_cid: str = None) -> 'PostDataList':
         item = self.Item(post, profile=profile, uri_cid=uri_cid)
-        if item.id() not in [i.id() for i in self.items]:
+        if item.id() not in self.ids:
+            self.ids.add(item.id())
             self.items.append(item)
         return self
 
@@ -260,7 +264,7 @@ class PostDataList:
                 
                 # Include warnings in message for simple_json format
                 message = self.get_message()
-                print(create_success_response(data=posts_data, message=message))
+                print(create_success_response(data=posts_data, message=message, cursor=self.cursor))
             else:
                 # Output each item individually
                 for i, item in enumerate(self.items):
@@ -269,6 +273,15 @@ class PostDataList:
                         print('----------------')
                     print(item.printable(format, delimiter=delimiter))
 
+    def add_related(self, reply) -> None:
+        """Keep the parent and root posts of a feed item's reply reference for --thread"""
+        if reply is None:
+            return
+        for post in (reply.root, reply.parent):
+            # NotFoundPost and BlockedPost have no record
+            if post is not None and getattr(post, 'record', None) is not None:
+                self.related[post.uri] = post
+
     def add_warning(self, warning: str) -> None:
         """Add a warning message to the list."""
         self.warnings.append(warning)
@@ -290,5 +303,6 @@ class PostDataList:
         
         return create_success_response(
             data=posts_data,
-            message=self.get_message()
+            message=self.get_message(),
+            cursor=self.cursor
         )
\ No newline at end of file
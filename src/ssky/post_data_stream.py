@@ -0,0 +1,168 @@
+import contextlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from ssky.post_data_list import PostDataList
+from ssky.result import SskyError
+from ssky.retry import recording_retries, retry_warning
+from ssky.util import submit_in_context
+
+# Most posts the feed endpoints return per request
+PAGE_LIMIT = 100
+
+class PostDataStream:
+    """Posts of a feed longer than one page, read page by page as they are printed.
+
+    The first page is fetched right away. Printing renders and flushes each
+    page as it arrives while the next one is fetched in the background, and
+    keeps no more than these two pages, so memory stays the same however many
+    posts are read, apart from the IDs of the posts printed, which are kept to
+    skip duplicates (e.g. a post reposted twice).
+    """
+
+    def __init__(self, fetch, limit: int, cursor: str = None) -> None:
+        """
+        Args:
+            fetch: Function (limit, cursor) -> PostDataList of one page, with its cursor
+            limit: Number of posts to read
+            cursor: Cursor to start from
+        """
+        self.fetch = fetch
+        self.limit = limit
+        self.first_page = fetch(min(PAGE_LIMIT, limit), cursor)
+        self.cursor = cursor  # Cursor after the pages read so far
+        self.count = 0  # Posts read so far
+        self.warnings = []
+        self.post_data_list = None
+        self.ids = set()  # IDs of the posts read so far, to skip duplicates across pages
+
+    def pages(self):
+        """Yield the pages one by one, fetching the next page while the current one is used"""
+        page, self.first_page = self.first_page, None
+        if page is None:
+            raise RuntimeError('The posts of the stream have been read already')
+        remaining = self.limit
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while True:
+                page.items = [item for item in page.items if item.id() not in self.ids]
+                self.ids.update(item.id() for item in page.items)
+                # Only the posts kept count toward the limit
+                remaining -= len(page)
+                next_page = None
+                # A page of posts read already ends the stream, so a feed repeating itself can't loop
+                if page.cursor and remaining > 0 and len(page) > 0:
+                    next_page = submit_in_context(executor, self.fetch, min(PAGE_LIMIT, remaining), page.cursor)
+                self.cursor = page.cursor
+                self.count += len(page)
+                yield page
+                if next_page is None:
+                    return
+                page = next_page.result()
+
+    def to_post_data_list(self) -> PostDataList:
+        """Read all posts into one PostDataList"""
+        if self.post_data_list is None:
+            self.post_data_list = PostDataList()
+            for page in self.pages():
+                for item in page.items:
+                    self.post_data_list.append(item.post)
+                self.post_data_list.related.update(page.related)
+            self.post_data_list.cursor = self.cursor
+            self.post_data_list.warnings = self.warnings
+        return self.post_data_list
+
+    @property
+    def items(self) -> list:
+        return self.to_post_data_list().items
+
+    def __len__(self) -> int:
+        return len(self.to_post_data_list())
+
+    def add_warning(self, warning: str) -> None:
+        """Add a warning message to the stream."""
+        self.warnings.append(warning)
+        print(f"Warning: {warning}", file=sys.stderr)
+
+    def get_message(self) -> str:
+        """Get message including warnings if any."""
+        base_message = f"Posted {self.count} item(s)"
+        if self.warnings:
+            warning_text = "; ".join(self.warnings)
+            return f"{base_message} (Warnings: {warning_text})"
+        return base_message
+
+    def to_json(self) -> str:
+        """Convert to JSON format (reads all posts first)."""
+        return self.to_post_data_list().to_json()
+
+    def print(self, format: str, output: str = None, delimiter: str = None) -> None:
+        if self.post_data_list is not None:
+            self.post_data_list.print(format, output=output, delimiter=delimiter)
+            return
+        if format == 'simple_json' and not output:
+            self.print_simple_json()
+            return
+        printed = 0
+        with self.recording_late_retries():
+            for page in self.pages():
+                for item in page.items:
+                    if output:
+                        # Output each item to separate files
+                        with open(os.path.join(output, item.get_filename()), 'w') as f:
+                            f.write(item.printable(format, delimiter=delimiter))
+                            f.write('\n')
+                    else:
+                        # Add separator before second and subsequent items for long format
+                        if format == 'long' and printed > 0:
+                            print('----------------')
+                        print(item.printable(format, delimiter=delimiter))
+                    printed += 1
+                sys.stdout.flush()
+
+    @contextlib.contextmanager
+    def recording_late_retries(self):
+        """Add a warning for the retries of the pages read while printing
+
+        The command's own retry warning is added before printing starts.
+        """
+        with recording_retries() as retries:
+            try:
+                yield
+            finally:
+                if retries:
+                    self.add_warning(retry_warning(retries))
+
+    def print_simple_json(self) -> None:
+        """Print the posts as one JSON response while they are read.
+
+        The response has the usual keys, with status, message and cursor after
+        the data: if a later page fails, the response still ends as valid JSON,
+        with the error and the cursor to continue from.
+        """
+        timestamp = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        sys.stdout.write('{"timestamp":' + json.dumps(timestamp) + ',"data":[')
+        separator = ''
+        try:
+            with self.recording_late_retries():
+                for page in self.pages():
+                    for item in page.items:
+                        sys.stdout.write(separator + json.dumps(item.get_simple_data(), ensure_ascii=False, separators=(',', ':')))
+                        separator = ','
+                    sys.stdout.flush()
+        except SskyError as e:
+            message = f"{e.message} (after {self.count} item(s))"
+            if self.warnings:
+                message += f" (Warnings: {'; '.join(self.warnings)})"
+            self.print_simple_json_end({"status": "error", "http_code": e.http_code, "message": message, "cursor": self.cursor})
+            e.printed = True  # Already reported in the response
+            raise
+        end = {"status": "ok", "http_code": 200, "message": self.get_message()}
+        if self.cursor is not None:
+            end["cursor"] = self.cursor
+        self.print_simple_json_end(end)
+
+    def print_simple_json_end(self, end: dict) -> None:
+        sys.stdout.write('],' + json.dumps(end, ensure_ascii=False, separators=(',', ':'))[1:] + '\n')
+        sys.stdout.flush()
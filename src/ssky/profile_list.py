@@ -93,6 +93,7 @@ class ProfileList:
         self.actors = []
         self.items = None
         self.warnings = []  # Add warnings list
+        self.cursor = None  # Cursor of the next page, if any
         if default_delimiter is not None:
             self.default_delimiter = default_delimiter
 
@@ -148,7 +149,7 @@ class ProfileList:
                 
                 # Include warnings in message for simple_json format
                 message = self.get_message()
-                print(create_success_response(data=profiles_data, message=message))
+                print(create_success_response(data=profiles_data, message=message, cursor=self.cursor))
             else:
                 # Output each item individually
                 for i, item in enumerate(self.items):
@@ -179,5 +180,6 @@ class ProfileList:
         
         return create_success_response(
             data=profiles_data,
-            message=self.get_message()
+            message=self.get_message(),
+            cursor=self.cursor
         )
\ No newline at end of file
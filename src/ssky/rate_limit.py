@@ -0,0 +1,153 @@
+"""
+Client-side pacing by the rate limits the server announces
+
+Bluesky sends the state of the rate limit a request counted against with
+each response (`ratelimit-limit`, `ratelimit-remaining`, `ratelimit-reset`
+and `ratelimit-policy`, e.g. "3000;w=300"). RateLimitGovernor keeps a token
+bucket per policy in a small state file shared by all ssky processes using
+the same session file, so that they spend one budget together and slow down
+before the server starts answering 429.
+"""
+
+import json
+import math
+import os
+import time
+
+import atproto_client
+from atproto_client.models.common import XrpcError
+from atproto_client.models.utils import get_or_create
+from atproto_client.request import Response
+
+from ssky import deadline
+from ssky.util import write_json_atomically
+
+def parse_rate_limit(headers: dict, now: float = None) -> dict:
+    """Read the rate limit state of a response.
+
+    Args:
+        headers: Response headers with lowercase names
+
+    Returns:
+        {"policy", "limit", "window", "remaining", "reset"}, or None if the
+        response has no rate limit headers
+    """
+    now = time.time() if now is None else now
+    try:
+        limit = int(headers['ratelimit-limit'])
+        remaining = int(headers['ratelimit-remaining'])
+        reset = float(headers['ratelimit-reset'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    window = None
+    for parameter in headers.get('ratelimit-policy', '').split(';')[1:]:
+        name, _, value = parameter.strip().partition('=')
+        if name == 'w' and value.isdigit():
+            window = int(value)
+    if window is None:
+        window = max(1, int(reset - now))
+    if limit <= 0:
+        return None
+    return {
+        "policy": f"{limit};w={window}",
+        "limit": limit,
+        "window": window,
+        "remaining": max(0, remaining),
+        "reset": reset
+    }
+
+def rate_limited_error(message: str, wait: float) -> atproto_client.exceptions.RequestException:
+    """Error raised instead of waiting too long, shaped like a 429 from the server"""
+    content = get_or_create({"error": "RateLimitExceeded", "message": message}, XrpcError, strict=False)
+    headers = {"retry-after": str(math.ceil(wait))}
+    return atproto_client.exceptions.RequestException(Response(success=False, status_code=429, content=content, headers=headers))
+
+class RateLimitGovernor:
+    """Token buckets of the server's rate limits, shared through a state file.
+
+    Each bucket holds up to `limit` tokens and refills at limit/window tokens
+    per second. A request takes a token, waiting for one if the bucket is
+    empty. Every response lowers the bucket to the `remaining` the server
+    reports, and an exhausted limit empties it until `reset`. Requests wait
+    at most `max_wait` seconds; beyond that they fail with a 429 right away.
+
+    Endpoints are paced by the policy their last response reported, so
+    createSession with its own small limit doesn't hold up timeline reads.
+    """
+
+    def __init__(self, path: str, lock, max_wait: float = 60.0):
+        """
+        Args:
+            path: State file
+            lock: SessionFileLock guarding the state file
+            max_wait: Longest time in seconds a request waits for a token
+        """
+        self.path = path
+        self.lock = lock
+        self.max_wait = max_wait
+
+    def acquire(self, endpoint: str) -> float:
+        """Take a token for a request to an endpoint, waiting for it if needed.
+
+        Returns:
+            Seconds waited
+        """
+        if not os.path.exists(self.path):
+            return 0.0  # Nothing known about the limits yet
+        with self.lock.hold(self.path + '.lock'):
+            state = self.read_state()
+            bucket = state['buckets'].get(state['endpoints'].get(endpoint))
+            if bucket is None:
+                return 0.0
+            now = time.time()
+            rate = bucket['limit'] / bucket['window']
+            # `updated` lies in the future while the limit is exhausted
+            if now > bucket['updated']:
+                bucket['tokens'] = min(bucket['limit'], bucket['tokens'] + (now - bucket['updated']) * rate)
+                bucket['updated'] = now
+            wait = bucket['updated'] - now + max(0.0, 1 - bucket['tokens']) / rate
+            if wait > self.max_wait:
+                raise rate_limited_error(f"Rate limit of {endpoint} exhausted for {wait:.0f} more seconds", wait)
+            deadline.check_wait(wait, f'waiting for the rate limit of {endpoint}')
+            bucket['tokens'] -= 1
+            self.write_state(state)
+        if wait > 0:
+            time.sleep(wait)
+        return max(0.0, wait)
+
+    def record(self, endpoint: str, status_code: int, headers: dict) -> None:
+        """Update the bucket of an endpoint from the rate limit headers of its response"""
+        limit = parse_rate_limit(headers) if isinstance(headers, dict) else None
+        if limit is None:
+            return
+        with self.lock.hold(self.path + '.lock'):
+            state = self.read_state()
+            state['endpoints'][endpoint] = limit['policy']
+            now = time.time()
+            bucket = state['buckets'].get(limit['policy'])
+            if bucket is None:
+                bucket = {"limit": limit['limit'], "window": limit['window'], "tokens": float(limit['limit']), "updated": now}
+                state['buckets'][limit['policy']] = bucket
+            if status_code == 429 or limit['remaining'] == 0:
+                # Nothing left until the server resets the limit
+                bucket['tokens'] = 0.0
+                bucket['updated'] = max(now, limit['reset'])
+            elif bucket['updated'] <= now:
+                bucket['tokens'] = min(bucket['tokens'], float(limit['remaining']))
+            self.write_state(state)
+
+    def read_state(self) -> dict:
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+        if not isinstance(state, dict) or not isinstance(state.get('buckets'), dict) or not isinstance(state.get('endpoints'), dict):
+            state = {"buckets": {}, "endpoints": {}}
+        return state
+
+    def write_state(self, state: dict) -> None:
+        try:
+            write_json_atomically(self.path, state)
+        except OSError:
+            pass  # Pacing is best effort
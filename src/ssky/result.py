@@ -354,6 +354,22 @@ class InvalidOptionCombinationError(SskyError):
         super().__init__(message, 400)
 
 
+class DeadlineExceededError(SskyError):
+    """Deadline (--deadline) exceeded errors."""
+    def __init__(self, seconds: float, doing: str, data: Any = None):
+        super().__init__(f"Deadline of {seconds:g}s exceeded while {doing}", 408)
+        self.seconds = seconds
+        self.doing = doing
+        self.data = data
+
+    def with_partial_result(self, description: str, data: Any) -> 'DeadlineExceededError':
+        """Same error, telling what had been done when the deadline passed"""
+        error = DeadlineExceededError(self.seconds, self.doing, data)
+        error.message = f"{self.message}; partial result: {description}"
+        error.args = (error.message,)
+        return error
+
+
 # Error handling functions
 def get_http_status_from_exception(e) -> int:
     """Extract HTTP status code from exception.
@@ -0,0 +1,126 @@
+"""
+Retries of XRPC requests that failed transiently
+
+A request is retried only if repeating it can't do anything twice: queries,
+and the procedures writing or deleting a record under a known key. SskyClient
+gives records created without a key one of its own choosing (a TID) and
+repeats the write with putRecord, so a post whose response got lost on the
+way back is not posted again.
+"""
+
+import contextlib
+import contextvars
+import email.utils
+import logging
+import os
+import random
+import time
+
+import atproto_client
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth another attempt
+TRANSIENT_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+# Procedures that may be repeated as they are (blobs are content-addressed)
+IDEMPOTENT_PROCEDURES = ('com.atproto.repo.putRecord', 'com.atproto.repo.deleteRecord', 'com.atproto.repo.uploadBlob')
+
+BASE_DELAY = 0.5  # Seconds before the first retry, doubled for each further one
+
+TID_ALPHABET = '234567abcdefghijklmnopqrstuvwxyz'
+
+_recording = contextvars.ContextVar('ssky_retries', default=None)
+
+def tid(now: float = None) -> str:
+    """Create a record key from the current time, the way PDSes create them"""
+    microseconds = int((time.time() if now is None else now) * 1_000_000)
+    value = (microseconds & ((1 << 53) - 1)) << 10 | random.getrandbits(10)
+    return ''.join(TID_ALPHABET[(value >> shift) & 31] for shift in range(60, -1, -5))
+
+def is_transient(error: atproto_client.exceptions.AtProtocolError) -> bool:
+    """Check whether a failed request may succeed when sent again"""
+    if not isinstance(error, atproto_client.exceptions.RequestErrorBase):
+        return False
+    if error.response is None:
+        # No response at all: the connection failed or timed out
+        return isinstance(error, atproto_client.exceptions.NetworkError)
+    return getattr(error.response, 'status_code', None) in TRANSIENT_STATUS_CODES
+
+def retry_after(response, now: float = None) -> float:
+    """Seconds the server asked to wait before retrying, or None if it didn't say"""
+    headers = getattr(response, 'headers', None)
+    if not isinstance(headers, dict):
+        return None
+    now = time.time() if now is None else now
+    value = headers.get('retry-after')
+    if value is not None:
+        if value.strip().isdigit():
+            return float(value)
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - now)
+        except (TypeError, ValueError):
+            return None
+    if getattr(response, 'status_code', None) == 429 and 'ratelimit-reset' in headers:
+        try:
+            return max(0.0, float(headers['ratelimit-reset']) - now)
+        except ValueError:
+            return None
+    return None
+
+class RetryPolicy:
+    """How often and after how long failed requests are retried"""
+
+    def __init__(self, attempts: int = 3, max_delay: float = 30.0):
+        """
+        Args:
+            attempts: Attempts per request, including the first one (1 turns retries off)
+            max_delay: Longest wait before a retry; a server asking for longer is not retried
+        """
+        self.attempts = attempts
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_environment(cls) -> 'RetryPolicy':
+        """Policy set by SSKY_RETRY_ATTEMPTS and SSKY_RETRY_MAX_DELAY"""
+        return cls(
+            attempts=max(1, int(os.environ.get('SSKY_RETRY_ATTEMPTS', '3'))),
+            max_delay=float(os.environ.get('SSKY_RETRY_MAX_DELAY', '30'))
+        )
+
+    def delay(self, retry: int, error: atproto_client.exceptions.AtProtocolError) -> float:
+        """Seconds to wait before a retry (0 for the first one), or None to give up"""
+        if retry >= self.attempts - 1 or not is_transient(error):
+            return None
+        requested = retry_after(error.response)
+        if requested is not None:
+            return requested + random.uniform(0, BASE_DELAY) if requested <= self.max_delay else None
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_delay, BASE_DELAY * 2 ** retry))
+
+def note_retry(nsid: str, error: atproto_client.exceptions.AtProtocolError, retry: int, attempts: int, delay: float) -> None:
+    """Log a retry and count it for the command it is made for"""
+    status = getattr(error.response, 'status_code', None) if error.response is not None else None
+    reason = f'HTTP {status}' if status is not None else type(error).__name__
+    logger.warning(f'Retrying {nsid} after {reason} in {delay:.1f}s (retry {retry + 1} of {attempts - 1})')
+    retries = _recording.get()
+    if retries is not None:
+        retries.append(nsid)
+
+@contextlib.contextmanager
+def recording_retries():
+    """Collect the endpoints retried while the block runs, also by the worker threads it starts with its context"""
+    retries = []
+    token = _recording.set(retries)
+    try:
+        yield retries
+    finally:
+        _recording.reset(token)
+
+def retry_warning(retries: list) -> str:
+    """Summary of the retries of a command for its warnings"""
+    counts = {}
+    for nsid in retries:
+        counts[nsid] = counts.get(nsid, 0) + 1
+    details = ', '.join(f'{nsid} x{count}' for nsid, count in counts.items())
+    return f'Retried {len(retries)} request(s) after transient errors ({details})'
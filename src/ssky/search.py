@@ -1,11 +1,11 @@
 import datetime
 import re
-from atproto import models
+from atproto_client import models
 import atproto_client
 from ssky.ssky_session import expand_actor, ssky_client
+from ssky.conversation import build_threads
 from ssky.post_data_list import PostDataList
-from ssky.thread_data import ThreadData
-from ssky.thread_data_list import ThreadDataList
+from ssky.thread_data_list import expand_threads
 from ssky.result import (
     AtProtocolSskyError,
     SessionError,
@@ -29,7 +29,7 @@ def expand_datetime(dt: str) -> str:
     else:
         return None
 
-def search(q='*', author=None, since=None, until=None, limit=100, thread=False, thread_depth=10, thread_parent_height=0, format='', **kwargs):
+def search(q='*', author=None, since=None, until=None, limit=100, cursor=None, thread=False, thread_depth=10, thread_parent_height=0, format='', **kwargs):
     since = expand_datetime(since)
     until = expand_datetime(until)
 
@@ -45,6 +45,7 @@ def search(q='*', author=None, since=None, until=None, limit=100, thread=False,
         res = current_session.app.bsky.feed.search_posts(
             models.AppBskyFeedSearchPosts.Params(
                 author=expand_actor(author),
+                cursor=cursor,
                 limit=limit,
                 q=q,
                 since=since,
@@ -56,42 +57,14 @@ def search(q='*', author=None, since=None, until=None, limit=100, thread=False,
         if res.posts and len(res.posts) > 0:
             for post in res.posts:
                 post_data_list.append(post)
+        post_data_list.cursor = res.cursor
 
         # If --thread is specified, expand each post into threads
         if thread:
-            thread_data_list = ThreadDataList()
-
-            # Group posts by their root thread URI
-            thread_groups = {}  # {root_uri: [posts]}
-            root_order = []  # Track order of root URIs for maintaining result order
-
-            for item in post_data_list.items:
-                # Determine the root URI of this post's thread
-                if hasattr(item.post.record, 'reply') and item.post.record.reply:
-                    root_uri = item.post.record.reply.root.uri
-                else:
-                    root_uri = item.post.uri  # This post is the root
-
-                # Add to group and track order
-                if root_uri not in thread_groups:
-                    thread_groups[root_uri] = []
-                    root_order.append(root_uri)
-                thread_groups[root_uri].append(item.post)
-
-            # Fetch each thread once using its root URI
-            for root_uri in reversed(root_order):  # Process oldest first
-                thread_response = current_session.get_post_thread(
-                    root_uri,
-                    depth=thread_depth,
-                    parent_height=thread_parent_height
-                )
-                thread_data = ThreadData(thread_response)
-                thread_data_list.append(thread_data)
-
-            # Reverse to show newest first (matching search result order)
-            thread_data_list.threads.reverse()
-
-            return thread_data_list
+            if thread_depth == 0:
+                # Without the replies, the threads are built from the posts at hand
+                return build_threads(current_session, post_data_list, parent_height=thread_parent_height)
+            return expand_threads(current_session, post_data_list, depth=thread_depth, parent_height=thread_parent_height)
         else:
             return post_data_list
 
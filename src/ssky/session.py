@@ -0,0 +1,20 @@
+import atproto_client
+from ssky.ssky_session import SskySession
+from ssky.result import (
+    AtProtocolSskyError,
+    SuccessResult,
+    SessionError
+)
+
+def session(action='export', **kwargs) -> SuccessResult:
+    try:
+        SskySession()
+        if SskySession.status() != SskySession.Status.LOGGED_IN:
+            if SskySession.login_error is not None:
+                raise AtProtocolSskyError(SskySession.login_error) from SskySession.login_error
+            raise SessionError()
+
+        exported = SskySession.export_internal()
+        return SuccessResult(data={"session": exported}, message=exported)
+    except atproto_client.exceptions.AtProtocolError as e:
+        raise AtProtocolSskyError(e) from e
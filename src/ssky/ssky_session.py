@@ -1,95 +1,758 @@
+import base64
+import contextlib
+import contextvars
 import json
 import os
 import sys
-import atproto
+import threading
+import time
 import atproto_client
+import httpx
+from atproto_client.client.base import InvokeType
+from atproto_client.client.session import Session as AtSession, SessionEvent
+from atproto_client.models.utils import get_model_as_dict, get_or_create
 
-class SskySession:
+from ssky import deadline
+from ssky.util import write_json_atomically
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locking
+    fcntl = None
+
+def __getattr__(name):
+    # The atproto package re-exports atproto_client along with the firehose,
+    # identity and crypto packages ssky doesn't need; only load it on request
+    if name == 'atproto':
+        import atproto
+        return atproto
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Default timeout of httpx, which the atproto client keeps
+XRPC_TIMEOUT = 5.0
+
+class PooledRequest(atproto_client.request.Request):
+    """atproto Request sending through one HTTP connection pool shared by the process.
+
+    Headers, including the Authorization header, stay with each request
+    object, so clients logged in as different users can share the pool.
+    """
+
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        atproto_client.request.RequestBase.__init__(self)
+        with PooledRequest._pool_lock:
+            if PooledRequest._pool is None:
+                PooledRequest._pool = httpx.Client(follow_redirects=True)
+        self._client = PooledRequest._pool
+
+    def close(self) -> None:
+        pass  # Other clients still use the pool
+
+class SessionFileLock:
+    """Advisory lock serializing session file updates between processes.
+
+    Reentrant within the process: threads take turns, and a thread already
+    holding the lock can take it again. A process that can't get the lock
+    within `timeout` seconds carries on without it rather than failing.
+    """
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    @contextlib.contextmanager
+    def hold(self, path: str):
+        with self._lock:
+            self._depth += 1
+            try:
+                if self._depth == 1:
+                    self._fd = self._acquire(path)
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and self._fd is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                    os.close(self._fd)
+                    self._fd = None
+
+    def _acquire(self, path: str):
+        if fcntl is None:
+            return None
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError:
+            return None
+        wait = self.timeout
+        left = deadline.remaining()
+        if left is not None:
+            wait = max(0.0, min(wait, left))  # Not past the deadline of the command
+        give_up = time.monotonic() + wait
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                if time.monotonic() >= give_up:
+                    os.close(fd)
+                    return None
+                time.sleep(0.05)
+
+class SskyClient(atproto_client.Client):
+    """atproto Client that refreshes its tokens and retries once when the server rejects the access token.
+
+    Sessions restored from the session file are not checked with the server,
+    so a revoked or expired access token first shows up on a real request.
+    If the refresh token is rejected as well, the client logs in again with
+    `credentials` ((handle, password)), if it has them.
+
+    A `persistent` client (a login saved in the session file, as the
+    top-level session or as the named `account`) refreshes while holding
+    the session file lock and writes the new tokens back before letting go.
+    Processes that were waiting for the lock find the new tokens in the file
+    and use them instead of refreshing again, which would invalidate the
+    refresh token the first process just got.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.credentials = None
+        self.persistent = False
+        self.account = None
+        # atproto only accepts plain functions as callbacks, not bound methods
+        self.on_session_change(lambda event, session: self.session_changed(event, session))
+
+    def session_changed(self, event, session) -> None:
+        # Imports come from the session file
+        if event == SessionEvent.IMPORT:
+            return
+        SskySession.count_login('password' if event == SessionEvent.CREATE else 'refresh')
+        # SskySession saves first logins itself, once the profile is known
+        if self.persistent and (event == SessionEvent.REFRESH or self.me is not None):
+            SskySession.persist_client_internal(self, self.me, account=self.account)
+
+    def _refresh_and_set_session(self):
+        if not self.persistent:
+            return super()._refresh_and_set_session()
+        with SskySession.config_lock():
+            if SskySession.adopt_saved_tokens_internal(self):
+                return None
+            return super()._refresh_and_set_session()
+
+    def _invoke(self, invoke_type, **kwargs):
+        try:
+            return self.retried_invoke(invoke_type, **kwargs)
+        except (atproto_client.exceptions.UnauthorizedError, atproto_client.exceptions.BadRequestError) as e:
+            if kwargs.get('ignore_session_check') or self._session is None or not is_token_rejected(e):
+                raise
+        self.recover_session()
+        return self.retried_invoke(invoke_type, **kwargs)
+
+    def retried_invoke(self, invoke_type, **kwargs):
+        """Send a request, retrying transient failures if that can't repeat its effect"""
+        from atproto_client import models
+        from ssky.retry import IDEMPOTENT_PROCEDURES, RetryPolicy, note_retry, tid
+
+        policy = RetryPolicy.from_environment()
+        nsid = str(kwargs.get('url', '')).rsplit('/', 1)[-1]
+        retry_kwargs = kwargs
+        if invoke_type is InvokeType.QUERY or nsid in IDEMPOTENT_PROCEDURES:
+            pass
+        elif isinstance(kwargs.get('data'), models.ComAtprotoRepoCreateRecord.Data):
+            # Pick the record key, so that a retry can write the same record again
+            data = kwargs['data']
+            rkey = data.rkey or tid()
+            kwargs = dict(kwargs, data=data.model_copy(update={'rkey': rkey}))
+            retry_kwargs = dict(kwargs, url=kwargs['url'][:-len(nsid)] + 'com.atproto.repo.putRecord', data=models.ComAtprotoRepoPutRecord.Data(
+                repo=data.repo,
+                collection=data.collection,
+                rkey=rkey,
+                record=data.record,
+                swap_commit=data.swap_commit,
+                validate_=data.validate_
+            ))
+        else:
+            return self.paced_invoke(invoke_type, **kwargs)
+
+        retry = 0
+        while True:
+            try:
+                return self.paced_invoke(invoke_type, **(kwargs if retry == 0 else retry_kwargs))
+            except atproto_client.exceptions.RequestErrorBase as e:
+                delay = policy.delay(retry, e)
+                if delay is None:
+                    raise
+                note_retry(nsid, e, retry, policy.attempts, delay)
+            deadline.sleep(delay, f'waiting to retry {nsid}')
+            retry += 1
+
+    def paced_invoke(self, invoke_type, **kwargs):
+        """Send a request within the rate limits shared by the ssky processes of the host"""
+        governor = SskySession.rate_limit_governor()
+        if governor is None:
+            return self.timed_invoke(invoke_type, **kwargs)
+        endpoint = str(kwargs.get('url', '')).rsplit('/', 1)[-1]
+        governor.acquire(endpoint)
+        try:
+            response = self.timed_invoke(invoke_type, **kwargs)
+        except atproto_client.exceptions.RequestErrorBase as e:
+            governor.record(endpoint, getattr(e.response, 'status_code', None), getattr(e.response, 'headers', None))
+            raise
+        governor.record(endpoint, getattr(response, 'status_code', None), getattr(response, 'headers', None))
+        return response
+
+    def timed_invoke(self, invoke_type, **kwargs):
+        """Send a request within what is left of the command's deadline"""
+        if deadline.remaining() is None:
+            return super()._invoke(invoke_type, **kwargs)
+        endpoint = str(kwargs.get('url', '')).rsplit('/', 1)[-1]
+        deadline.check(f'sending {endpoint}')
+        # httpx waits at most this long for each phase of the request
+        kwargs['timeout'] = deadline.timeout(XRPC_TIMEOUT)
+        try:
+            return super()._invoke(invoke_type, **kwargs)
+        except atproto_client.exceptions.InvokeTimeoutError:
+            deadline.check(f'waiting for {endpoint}')
+            raise
+
+    def recover_session(self) -> None:
+        with self._refresh_lock:
+            try:
+                self._refresh_and_set_session()
+            except atproto_client.exceptions.AtProtocolError:
+                if self.credentials is None:
+                    raise
+                self._get_and_set_session(*self.credentials)
+
+def is_token_rejected(error: atproto_client.exceptions.AtProtocolError) -> bool:
+    """Check whether an XRPC error means that the access token is no longer accepted"""
+    if isinstance(error, atproto_client.exceptions.UnauthorizedError):
+        return True
+    content = getattr(error.response, 'content', None) if error.response is not None else None
+    return getattr(content, 'error', None) in ('ExpiredToken', 'InvalidToken')
+
+class SskySessionType(type):
+    """Resolves SskySession.session, login_error and lock to the context in use.
+
+    Outside SskySession.using(), they belong to the process-wide context.
+    """
+
+    def current_context(cls) -> 'SskySession.Context':
+        context = cls._current_context.get()
+        return context if context is not None else cls._process_context
+
+    @property
+    def session(cls):
+        return cls.current_context().session
+
+    @session.setter
+    def session(cls, value):
+        cls.current_context().session = value
+
+    @property
+    def login_error(cls):
+        return cls.current_context().login_error
+
+    @login_error.setter
+    def login_error(cls, value):
+        cls.current_context().login_error = value
+
+    @property
+    def lock(cls) -> threading.RLock:
+        return cls.current_context().lock
+
+class SskySession(metaclass=SskySessionType):
 
     class Session:
         def __init__(self, client=None, profile=None):
             self.client = client
             self.profile = profile
 
+    class Context:
+        """Login state of one user of the process.
+
+        The process-wide context logs in with the session file or SSKY_USER.
+        An account context logs in with the session saved in the session file
+        for that account (handle or DID), see SskySession.account_context().
+        A client context (e.g. one client of a shared MCP server) logs in with
+        its own credentials, never touches the session file and sends its
+        requests through the shared connection pool.
+        """
+
+        def __init__(self, handle=None, password=None, account=None):
+            self.handle = handle
+            self.password = password
+            self.account = account
+            self.session = None
+            # Holds the last AtProtocolError that caused a login failure, so
+            # callers can surface the real reason instead of a generic message.
+            self.login_error = None
+            # Serializes logins when sessions are requested from several
+            # threads (e.g. concurrent in-process MCP tool calls)
+            self.lock = threading.RLock()
+
+        def is_client(self) -> bool:
+            return self.handle is not None
+
     if 'SSKY_CONFIG_PATH' in os.environ:
         config_path = os.environ['SSKY_CONFIG_PATH']
     else:
         config_path = os.path.expanduser('~/.ssky')
 
-    session = None
-
     login_failed = Session()
 
-    # Holds the last AtProtocolError that caused a login failure, so callers
-    # can surface the real reason instead of a generic message.
-    login_error = None
+    _process_context = Context()
+
+    # Logins of this process by kind:
+    #   restore  - session file used without contacting the server
+    #   session  - session file checked with the server
+    #   refresh  - tokens refreshed
+    #   password - handle and password sent to createSession, which Bluesky
+    #              rate-limits heavily
+    login_counts = {'restore': 0, 'session': 0, 'refresh': 0, 'password': 0}
+
+    # Counts of the process-wide login not yet added to the totals in the
+    # session file, which sum up all processes sharing the file
+    _unsaved_counts = {}
+
+    _counts_lock = threading.Lock()
+
+    _config_lock = SessionFileLock()
+
+    # Rate limit governors by state file; see rate_limit_governor()
+    _rate_limit_governors = {}
+
+    _rate_limit_lock = SessionFileLock(timeout=1.0)
+
+    _checkpoint_lock = SessionFileLock()
+
+    # Account contexts by the name they were requested with
+    _account_contexts = {}
+
+    _accounts_lock = threading.Lock()
+
+    _current_context = contextvars.ContextVar('ssky_session_context', default=None)
 
     class Status:
         NOT_LOGGED_IN = 0,
         LOGGED_IN = 1,
         LOGIN_FAILED = 2
 
+    # Long-running callers refresh the access token this many seconds before
+    # it expires. atproto itself only refreshes lazily, 15 minutes before
+    # expiry, in front of whatever request happens to come next.
+    refresh_margin = 20 * 60
+
+    # Server to log in to (default: https://bsky.social). Sessions restored
+    # from the session file keep the server they were created on.
+    pds_url = os.environ.get('SSKY_PDS_URL')
+
+    # A session restored from the session file is used without asking the
+    # server while its access token is valid for at least this many more
+    # seconds. Closer to expiry, the login refreshes the tokens first.
+    restore_margin = 5 * 60
+
+    @classmethod
+    @contextlib.contextmanager
+    def using(cls, context: Context):
+        """Use a client context for the sessions of this thread or task.
+
+        Worker threads started with asyncio.to_thread inherit it.
+        """
+        token = cls._current_context.set(context)
+        try:
+            yield context
+        finally:
+            cls._current_context.reset(token)
+
+    @classmethod
+    def account_context(cls, account: str) -> Context:
+        """Return the context of a saved account (handle or DID).
+
+        The same context is returned for the same name, so its login is kept
+        for the lifetime of the process. Contexts of several accounts can be
+        logged in at the same time.
+        """
+        with cls._accounts_lock:
+            context = cls._account_contexts.get(account)
+            if context is None:
+                context = cls.Context(account=account)
+                cls._account_contexts[account] = context
+            return context
+
+    @classmethod
+    def count_login(cls, kind: str) -> None:
+        with cls._counts_lock:
+            cls.login_counts[kind] += 1
+            if not cls.current_context().is_client() and kind != 'restore':
+                cls._unsaved_counts[kind] = cls._unsaved_counts.get(kind, 0) + 1
+
+    @classmethod
+    def read_config_internal(cls) -> dict:
+        """Read the session file, or return None if there is none or it is invalid"""
+        if not os.path.isfile(cls.config_path):
+            return None
+        try:
+            with open(cls.config_path, 'r') as f:
+                persistent_config = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return persistent_config if isinstance(persistent_config, dict) else None
+
+    @staticmethod
+    def saved_identity_internal(session_string: str) -> tuple:
+        """Return (handle, DID) of a saved session string, or (None, None)"""
+        if not isinstance(session_string, str):
+            return None, None
+        try:
+            saved_session = AtSession.decode(session_string)
+        except (ValueError, TypeError, atproto_client.exceptions.AtProtocolError):
+            return None, None
+        return saved_session.handle, saved_session.did
+
+    @classmethod
+    def find_account_internal(cls, persistent_config: dict, account: str) -> dict:
+        """Return the saved session of an account in the session file.
+
+        The top-level session is the default account. Other accounts are kept
+        under "accounts" by DID.
+
+        Args:
+            persistent_config: Contents of the session file, or None
+            account: Handle or DID, or None for the top-level session
+
+        Returns:
+            A dict with "session_string" and "profile", or None if the account
+            has no saved session
+        """
+        if persistent_config is None or account is None:
+            return persistent_config
+        accounts = persistent_config.get('accounts')
+        entries = [persistent_config] + (list(accounts.values()) if isinstance(accounts, dict) else [])
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get('session_string'):
+                if account in cls.saved_identity_internal(entry['session_string']):
+                    return entry
+        return None
+
+    @classmethod
+    def saved_accounts(cls) -> dict:
+        """Return the handles of the accounts saved in the session file, by DID"""
+        persistent_config = cls.read_config_internal() or {}
+        accounts = persistent_config.get('accounts')
+        entries = [persistent_config] + (list(accounts.values()) if isinstance(accounts, dict) else [])
+        saved = {}
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get('session_string'):
+                handle, did = cls.saved_identity_internal(entry['session_string'])
+                if did is not None:
+                    saved.setdefault(did, handle)
+        return saved
+
+    @staticmethod
+    def exported_session_internal() -> dict:
+        """Read the session exported to SSKY_SESSION.
+
+        Returns:
+            A dict with "session_string" and, if exported with it, "profile",
+            or None if SSKY_SESSION is not set or invalid
+        """
+        value = os.environ.get('SSKY_SESSION', '').strip()
+        if not value:
+            return None
+        if ':::' in value:
+            # A bare session string
+            return {'session_string': value}
+        try:
+            exported_config = json.loads(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)))
+        except ValueError:
+            return None
+        if not isinstance(exported_config, dict) or not exported_config.get('session_string'):
+            return None
+        return exported_config
+
+    @classmethod
+    def export_internal(cls) -> str:
+        """Encode the current session and profile into one value for SSKY_SESSION"""
+        if cls.status() != cls.Status.LOGGED_IN:
+            raise atproto_client.exceptions.LoginRequiredError('Login first')
+        exported_config = {
+            'session_string': cls.session.client.export_session_string()
+        }
+        if isinstance(cls.session.profile, atproto_client.models.base.ModelBase):
+            exported_config['profile'] = get_model_as_dict(cls.session.profile)
+        encoded = base64.urlsafe_b64encode(json.dumps(exported_config, separators=(',', ':')).encode('utf-8'))
+        return encoded.rstrip(b'=').decode('ascii')
+
+    @classmethod
+    def session_file_login_internal(cls, persistent_config: dict) -> bool:
+        """Log in with the session saved in the session file. Returns True on success."""
+        restored = cls.restore_internal(persistent_config)
+        if restored is not None:
+            # The token is checked by the first real request
+            cls.session = restored
+            cls.count_login('restore')
+            return True
+        try:
+            cls.session = cls.at_login_internal(session_string=persistent_config.get('session_string'))
+        except atproto_client.exceptions.AtProtocolError:
+            return False
+        cls.count_login('session')
+        # Save refreshed tokens and the profile for the next restore
+        cls.persist_internal()
+        return True
+
+    @classmethod
+    def create_client(cls) -> SskyClient:
+        context = cls.current_context()
+        if context.is_client():
+            return SskyClient(base_url=cls.pds_url, request=PooledRequest())
+        if context.account is not None:
+            client = SskyClient(base_url=cls.pds_url, request=PooledRequest())
+        else:
+            client = SskyClient(base_url=cls.pds_url)
+        client.persistent = True
+        client.account = context.account
+        return client
+
+    @classmethod
+    def config_lock(cls):
+        """Hold the advisory lock of the session file (a context manager)"""
+        return cls._config_lock.hold(cls.config_path + '.lock')
+
+    @classmethod
+    def rate_limit_governor(cls):
+        """Return the RateLimitGovernor of the session file in use, or None if pacing is off.
+
+        The rate limit state is kept next to the session file, so the
+        processes sharing a session file share their budget as well.
+        SSKY_RATE_LIMIT_MAX_WAIT limits how long a request waits for its
+        turn (default: 60 seconds; 0 turns pacing off).
+        """
+        max_wait = float(os.environ.get('SSKY_RATE_LIMIT_MAX_WAIT', '60'))
+        if max_wait <= 0:
+            return None
+        path = cls.config_path + '.ratelimit'
+        governor = cls._rate_limit_governors.get(path)
+        if governor is None or governor.max_wait != max_wait:
+            from ssky.rate_limit import RateLimitGovernor
+            governor = RateLimitGovernor(path, cls._rate_limit_lock, max_wait=max_wait)
+            cls._rate_limit_governors[path] = governor
+        return governor
+
+    @classmethod
+    def checkpoint_store(cls):
+        """Return the CheckpointStore of `ssky get --since-last`, kept next to the session file in use"""
+        from ssky.checkpoint import CheckpointStore
+        return CheckpointStore(cls.config_path + '.checkpoints', cls._checkpoint_lock)
+
+    @classmethod
+    def adopt_saved_tokens_internal(cls, client: SskyClient) -> bool:
+        """Switch a client to the tokens in the session file if another process has refreshed them.
+
+        Returns:
+            True if the client now uses the saved tokens, False if it has to
+            refresh them itself
+        """
+        if client._session is None:
+            return False
+        persistent_config = cls.read_config_internal()
+        if client.account is not None:
+            persistent_config = cls.find_account_internal(persistent_config, client._session.did)
+        session_string = (persistent_config or {}).get('session_string')
+        if not session_string or session_string == client.export_session_string():
+            return False
+        try:
+            saved_session = AtSession.decode(session_string)
+            expires_at = saved_session.access_jwt_payload.exp
+        except (ValueError, atproto_client.exceptions.AtProtocolError):
+            return False
+        if saved_session.did != client._session.did or expires_at is None or expires_at - time.time() < cls.refresh_margin:
+            return False
+        client._import_session_string(session_string)
+        return True
+
     @classmethod
     def at_login_internal(cls, handle=None, password=None, session_string=None) -> Session:
-        client = atproto.Client()
+        client = cls.create_client()
         profile = client.login(login=handle, password=password, session_string=session_string)
         return cls.Session(client, profile)
 
+    @classmethod
+    def restore_internal(cls, persistent_config: dict) -> Session:
+        """Restore the session saved in the session file without contacting the server.
+
+        Returns:
+            The session, or None if the file has no saved profile or the
+            access token is about to expire
+        """
+        session_string = persistent_config.get('session_string')
+        profile_data = persistent_config.get('profile')
+        if not session_string or not isinstance(profile_data, dict):
+            return None
+        try:
+            expires_at = AtSession.decode(session_string).access_jwt_payload.exp
+            profile = get_or_create(profile_data, atproto_client.models.AppBskyActorDefs.ProfileViewDetailed)
+        except (ValueError, atproto_client.exceptions.AtProtocolError):
+            return None
+        if expires_at is None or expires_at - time.time() < cls.restore_margin:
+            return None
+        client = cls.create_client()
+        client._import_session_string(session_string)
+        client.me = profile
+        return cls.Session(client, profile)
+
     @classmethod
     def login_internal(cls, handle=None, password=None) -> None:
-        if SskySession.session is None:
-            var_user = os.environ.get('SSKY_USER')
-            
-            # Try session file first (most efficient)
-            session_login_succeeded = False
-            if os.path.exists(cls.config_path) and os.path.isfile(cls.config_path):
-                try:
-                    with open(cls.config_path, 'r') as f:
-                        persistent_config = json.load(f)
-                        session_string = persistent_config.get('session_string')
-                    try:
-                        cls.session = cls.at_login_internal(session_string=session_string)
-                        session_login_succeeded = True
-                    except atproto_client.exceptions.AtProtocolError:
-                        pass  # Will try fallback credentials
-                except (json.JSONDecodeError, KeyError):
-                    pass  # Invalid session file, will try fallback credentials
-            
-            # If session login failed or no session file exists, try other credentials
-            if not session_login_succeeded:
-                # Try command line arguments (explicit specification)
-                if handle is not None and password is not None:
+        with cls.lock:
+            context = cls.current_context()
+            if context.is_client():
+                if cls.session is None:
                     try:
-                        cls.session = cls.at_login_internal(handle=handle, password=password)
-                        # Auto-persist session after successful login
-                        cls.persist_internal()
+                        cls.session = cls.at_login_internal(handle=context.handle, password=context.password)
                     except atproto_client.exceptions.AtProtocolError as e:
                         cls.session = cls.login_failed
                         cls.login_error = e
-                        # Don't re-raise, let the caller handle the failed session state
-                # Try environment variable (fallback)
-                elif var_user is not None:
-                    try:
-                        handle, password = var_user.split(':', 1)
-                        cls.session = cls.at_login_internal(handle=handle, password=password)
-                        # Auto-persist session after successful login
-                        cls.persist_internal()
-                    except atproto_client.exceptions.AtProtocolError as e:
+            elif SskySession.session is None:
+                var_user = os.environ.get('SSKY_USER')
+                if context.account is not None and var_user is not None and var_user.split(':', 1)[0] != context.account:
+                    # SSKY_USER belongs to another account
+                    var_user = None
+            
+                # Try session file first (most efficient)
+                session_login_succeeded = False
+                persistent_config = cls.find_account_internal(cls.read_config_internal(), context.account)
+                if persistent_config is not None and persistent_config.get('session_string'):
+                    session_login_succeeded = cls.session_file_login_internal(persistent_config)
+                    if not session_login_succeeded:
+                        # Another process may have refreshed (and so invalidated)
+                        # the tokens since we read them; try its new ones
+                        # before falling back to a password login
+                        latest_config = cls.find_account_internal(cls.read_config_internal(), context.account)
+                        if latest_config is not None and latest_config.get('session_string') not in (None, persistent_config.get('session_string')):
+                            session_login_succeeded = cls.session_file_login_internal(latest_config)
+                if not session_login_succeeded and context.account is None:
+                    # Session exported with "ssky session export", e.g. into
+                    # a container that has no session file yet
+                    exported_config = cls.exported_session_internal()
+                    if exported_config is not None:
+                        session_login_succeeded = cls.session_file_login_internal(exported_config)
+                if session_login_succeeded:
+                    # Log in again if the saved session is rejected for good
+                    if handle is not None and password is not None:
+                        cls.session.client.credentials = (handle, password)
+                    elif var_user is not None and ':' in var_user:
+                        cls.session.client.credentials = tuple(var_user.split(':', 1))
+            
+                # If session login failed or no session file exists, try other credentials
+                if not session_login_succeeded:
+                    # Try command line arguments (explicit specification)
+                    if handle is not None and password is not None:
+                        try:
+                            cls.session = cls.at_login_internal(handle=handle, password=password)
+                            # Auto-persist session after successful login
+                            cls.persist_internal()
+                        except atproto_client.exceptions.AtProtocolError as e:
+                            cls.session = cls.login_failed
+                            cls.login_error = e
+                            # Don't re-raise, let the caller handle the failed session state
+                    # Try environment variable (fallback)
+                    elif var_user is not None:
+                        try:
+                            handle, password = var_user.split(':', 1)
+                            cls.session = cls.at_login_internal(handle=handle, password=password)
+                            # Auto-persist session after successful login
+                            cls.persist_internal()
+                        except atproto_client.exceptions.AtProtocolError as e:
+                            cls.session = cls.login_failed
+                            cls.login_error = e
+                            # Don't re-raise, let the caller handle the failed session state
+                    elif context.account is not None:
                         cls.session = cls.login_failed
-                        cls.login_error = e
-                        # Don't re-raise, let the caller handle the failed session state
-                else:
-                    cls.session = cls.login_failed
-                    raise atproto_client.exceptions.LoginRequiredError('No credentials found. Please set SSKY_USER or run ssky login handle:password')
+                        raise atproto_client.exceptions.LoginRequiredError(f'No saved session for account {context.account}. Please run ssky --account {context.account} login handle:password')
+                    else:
+                        cls.session = cls.login_failed
+                        raise atproto_client.exceptions.LoginRequiredError('No credentials found. Please set SSKY_USER or run ssky login handle:password')
 
     @classmethod
     def persist_internal(cls) -> None:
+        if cls.current_context().is_client():
+            return  # The session file belongs to the process-wide login
         if cls.session is not None and cls.session is not cls.login_failed:
-            session_string = cls.session.client.export_session_string()
-            with open(cls.config_path, 'w') as f:
-                json.dump({
-                    'session_string': session_string
-                }, f)
+            cls.persist_client_internal(cls.session.client, cls.session.profile, account=cls.current_context().account)
+
+    @classmethod
+    def persist_client_internal(cls, client, profile=None, account=None) -> None:
+        """Write the tokens of a client to the session file.
+
+        Without a profile, the saved profile of the same account is kept.
+        The tokens of a named account replace the top-level session if it is
+        the same account, and are saved under "accounts" by DID otherwise.
+        """
+        session_string = client.export_session_string()
+        did = getattr(getattr(client, '_session', None), 'did', None)
+        with cls.config_lock(), cls._counts_lock:
+            previous_config = cls.read_config_internal() or {}
+            accounts = previous_config.get('accounts') if isinstance(previous_config.get('accounts'), dict) else {}
+            top_level_did = cls.saved_identity_internal(previous_config.get('session_string'))[1]
+            if account is None or did is None or did == top_level_did:
+                persistent_config = cls.account_entry_internal(previous_config, session_string, profile, did)
+            else:
+                persistent_config = {key: previous_config[key] for key in ('session_string', 'profile') if key in previous_config}
+                accounts[did] = cls.account_entry_internal(accounts.get(did) or {}, session_string, profile, did)
+            if accounts:
+                persistent_config['accounts'] = accounts
+            logins = previous_config.get('logins') if isinstance(previous_config.get('logins'), dict) else {}
+            for kind, count in cls._unsaved_counts.items():
+                logins[kind] = logins.get(kind, 0) + count
+            persistent_config['logins'] = logins
+            cls.write_config_internal(persistent_config)
+            cls._unsaved_counts = {}
+
+    @staticmethod
+    def account_entry_internal(previous_entry: dict, session_string: str, profile, did: str) -> dict:
+        entry = {
+            'session_string': session_string
+        }
+        if isinstance(profile, atproto_client.models.base.ModelBase):
+            entry['profile'] = get_model_as_dict(profile)
+        elif isinstance(previous_entry.get('profile'), dict) and previous_entry['profile'].get('did') == did:
+            entry['profile'] = previous_entry['profile']
+        return entry
+
+    @classmethod
+    def write_config_internal(cls, persistent_config: dict) -> None:
+        """Replace the session file atomically, so that other processes never read a partial file"""
+        write_json_atomically(cls.config_path, persistent_config)
+
+    @classmethod
+    def access_token_expires_in(cls) -> float:
+        """Seconds until the current access token expires, or None if unknown"""
+        if cls.status() != cls.Status.LOGGED_IN:
+            return None
+        at_session = cls.session.client._session
+        if at_session is None or not at_session.access_jwt:
+            return None
+        expires_at = at_session.access_jwt_payload.exp
+        if expires_at is None:
+            return None
+        return expires_at - time.time()
+
+    @classmethod
+    def refresh_internal(cls) -> None:
+        """Refresh the access token now and persist the new tokens"""
+        if cls.status() != cls.Status.LOGGED_IN:
+            raise atproto_client.exceptions.LoginRequiredError('Login first')
+        client = cls.session.client
+        with client._refresh_lock:
+            client._refresh_and_set_session()
+        if not isinstance(client, SskyClient):
+            # SskyClient saves refreshed tokens itself
+            cls.persist_internal()
 
     @classmethod
     def status(cls) -> int:
@@ -116,7 +779,7 @@ class SskySession:
         else:
             SskySession.persist_internal()
 
-    def client(self) -> atproto.Client:
+    def client(self) -> atproto_client.Client:
         if SskySession.status() == SskySession.Status.NOT_LOGGED_IN:
             raise atproto_client.exceptions.LoginRequiredError('Login first')
         elif SskySession.status() == SskySession.Status.LOGIN_FAILED:
@@ -132,7 +795,11 @@ class SskySession:
         else:
             return SskySession.session.profile
 
-def ssky_client(login_handle=None, login_password=None) -> atproto.Client:
+def ssky_client(login_handle=None, login_password=None, account=None) -> atproto_client.Client:
+    """Return the client of the current login, or of a saved account (handle or DID)"""
+    if account is not None:
+        with SskySession.using(SskySession.account_context(account)):
+            return SskySession(handle=login_handle, password=login_password).client()
     return SskySession(handle=login_handle, password=login_password).client()
 
 def ssky_profile(login_handle=None, login_password=None) -> atproto_client.models.AppBskyActorDefs.ProfileViewDetailed:
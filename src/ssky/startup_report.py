@@ -0,0 +1,116 @@
+"""
+Start-up time report for ssky commands
+
+`ssky --startup-report <command>` runs the command in a fresh interpreter with
+`-X importtime`, passes its output through and then prints where the start-up
+time went to stderr.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Packages only some commands need: bs4 and requests for link cards of posts,
+# the atproto model tree for anything talking to Bluesky
+WATCHED_PACKAGES = ('atproto', 'atproto_client', 'atproto_identity', 'bs4', 'requests', 'httpx', 'pydantic')
+
+# "import time:       123 |       4567 |     package.module", nested imports indented by two spaces
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+def parse_importtime(stderr: str) -> list:
+    """Parse `python -X importtime` output.
+
+    Returns:
+        (name, cumulative_us, via, top) tuples, where `top` is the top-level
+        import (e.g. ssky_mcp.server) that caused the import, and `via` the
+        module that `top` imported directly on the way
+    """
+    entries = []
+    nested = []  # Imports below depth 1 waiting for their depth 1 parent
+    direct = []  # Depth 1 imports (and their nested imports) waiting for their top-level parent
+    # Nested imports are printed before the module importing them
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative_us, indent, name = match.groups()
+        depth = len(indent) // 2
+        if depth == 0:
+            entries.extend(entry + (name,) for entry in direct)
+            entries.append((name, int(cumulative_us), name, name))
+            direct = []
+        elif depth == 1:
+            direct.extend((entry[0], entry[1], name) for entry in nested)
+            direct.append((name, int(cumulative_us), name))
+            nested = []
+        else:
+            nested.append((name, int(cumulative_us)))
+    return entries
+
+def collect(argv: list, python: str = sys.executable) -> dict:
+    """Run `ssky <argv>` in a fresh interpreter and collect its import times.
+
+    The output of the command goes to this process's stdout, and its stderr
+    without the import time lines to this process's stderr.
+    """
+    env = dict(os.environ)
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [src_dir, env.get('PYTHONPATH')]))
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [python, '-X', 'importtime', '-c', 'import sys; from ssky.main import main; sys.exit(main())', *argv],
+        stdout=sys.stdout,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    stderr_lines = completed.stderr.splitlines()
+    other_lines = [line for line in stderr_lines if not line.startswith('import time:')]
+    if other_lines:
+        print('\n'.join(other_lines), file=sys.stderr)
+    return {
+        "returncode": completed.returncode,
+        "wall_ms": wall_ms,
+        "imports": parse_importtime(completed.stderr)
+    }
+
+def format_report(result: dict, top: int = 10) -> str:
+    """Format collected start-up data as a human-readable report"""
+    imports = result['imports']
+    top_level = [entry for entry in imports if entry[0] == entry[3]]
+    import_ms = sum(entry[1] for entry in top_level) / 1000
+    lines = [
+        'ssky startup',
+        f"  wall clock              {result['wall_ms']:9.1f} ms (exit status {result['returncode']})",
+        f"  imports                 {import_ms:9.1f} ms",
+        '',
+        'Slowest imports:'
+    ]
+    for name, cumulative_us, _, _ in sorted(top_level, key=lambda entry: -entry[1])[:top]:
+        lines.append(f"  {name:<30} {cumulative_us / 1000:9.1f} ms")
+
+    lines.append('')
+    loaded = {entry[0]: entry for entry in imports if entry[0] in WATCHED_PACKAGES}
+    lines.append('Watched packages:')
+    for package in WATCHED_PACKAGES:
+        if package in loaded:
+            name, cumulative_us, via, top_name = loaded[package]
+            if top_name == name:
+                origin = ''
+            elif via == name:
+                origin = f' (imported by {top_name})'
+            else:
+                origin = f' (imported by {top_name} > {via})'
+            lines.append(f"  {package:<30} {cumulative_us / 1000:9.1f} ms{origin}")
+        else:
+            lines.append(f"  {package:<30}   not loaded")
+    return '\n'.join(lines)
+
+def startup_report(argv: list) -> int:
+    """Run `ssky <argv>` and print its start-up report to stderr"""
+    result = collect(argv)
+    print(format_report(result), file=sys.stderr)
+    return result['returncode']
@@ -1,6 +1,6 @@
 import os
 import sys
-from atproto import models
+from atproto_client import models
 
 
 class ThreadData:
@@ -8,15 +8,28 @@ class ThreadData:
     Represents a single thread with its posts.
     """
 
-    def __init__(self, thread_view):
+    def __init__(self, thread_view=None):
         """
         Initialize thread from AT Protocol thread view.
 
         Args:
-            thread_view: models.AppBskyFeedGetPostThread.Response
+            thread_view: models.AppBskyFeedGetPostThread.Response, or None for an empty thread
         """
         self.posts = []  # List of (post, depth) tuples
-        self._flatten(thread_view.thread, depth=0)
+        if thread_view is not None:
+            self._flatten(thread_view.thread, depth=0)
+
+    @classmethod
+    def from_posts(cls, posts):
+        """
+        Create a thread from posts already in thread order.
+
+        Args:
+            posts: List of (post, depth) tuples, the root first
+        """
+        thread_data = cls()
+        thread_data.posts = list(posts)
+        return thread_data
 
     def _flatten(self, thread_node, depth=0):
         """
@@ -1,6 +1,12 @@
 import os
 import sys
+import atproto_client
+from ssky.result import AtProtocolSskyError
 from ssky.thread_data import ThreadData
+from ssky.util import concurrent_calls
+
+# Threads fetched at the same time by --thread, unless SSKY_THREAD_CONCURRENCY says otherwise
+THREAD_CONCURRENCY = 8
 
 
 class ThreadDataList:
@@ -11,6 +17,7 @@ class ThreadDataList:
     def __init__(self):
         """Initialize empty thread list."""
         self.threads = []  # List of ThreadData objects
+        self.warnings = []
 
     def append(self, thread_data):
         """
@@ -22,6 +29,11 @@ class ThreadDataList:
         if isinstance(thread_data, ThreadData):
             self.threads.append(thread_data)
 
+    def add_warning(self, warning: str) -> None:
+        """Add a warning message to the list."""
+        self.warnings.append(warning)
+        print(f"Warning: {warning}", file=sys.stderr)
+
     def print(self, format='', output=None, delimiter=' '):
         """
         Print all threads in specified format.
@@ -61,3 +73,54 @@ class ThreadDataList:
         # Each thread is saved to its own file
         for thread in self.threads:
             thread.print(format=format, output=output_dir, delimiter=delimiter)
+
+
+def thread_root_uri(post) -> str:
+    """URI of the root post of the thread a post belongs to"""
+    if hasattr(post.record, 'reply') and post.record.reply:
+        return post.record.reply.root.uri
+    return post.uri  # This post is the root
+
+
+def thread_concurrency() -> int:
+    """Number of threads --thread fetches at the same time (SSKY_THREAD_CONCURRENCY)"""
+    try:
+        return max(1, int(os.environ.get('SSKY_THREAD_CONCURRENCY', THREAD_CONCURRENCY)))
+    except ValueError:
+        return THREAD_CONCURRENCY
+
+
+def expand_threads(client, post_data_list, depth=10, parent_height=0, concurrency=None) -> ThreadDataList:
+    """
+    Fetch the thread of each post, once per thread, in the order the posts come in.
+
+    The threads are fetched by a pool of workers. A thread that can't be fetched
+    is left out with a warning instead of failing the others.
+
+    Args:
+        client: SskyClient
+        post_data_list: PostDataList of the posts to expand
+        depth: Maximum depth of thread replies to retrieve
+        parent_height: Number of parent posts to retrieve
+        concurrency: Threads fetched at the same time (default: thread_concurrency())
+
+    Returns:
+        ThreadDataList with the threads in the order of their first post
+    """
+    root_uris = list(dict.fromkeys(thread_root_uri(item.post) for item in post_data_list.items))
+
+    thread_data_list = ThreadDataList()
+    if not root_uris:
+        return thread_data_list
+
+    def fetch(root_uri):
+        return client.get_post_thread(root_uri, depth=depth, parent_height=parent_height)
+
+    with concurrent_calls(fetch, root_uris, concurrency or thread_concurrency()) as futures:
+        for root_uri, future in zip(root_uris, futures):
+            try:
+                thread_data_list.append(ThreadData(future.result()))
+            except atproto_client.exceptions.AtProtocolError as e:
+                # Other errors (session, deadline) fail the whole command
+                thread_data_list.add_warning(f"Could not get thread {root_uri}: {AtProtocolSskyError(e).message}")
+    return thread_data_list
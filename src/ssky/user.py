@@ -1,4 +1,4 @@
-from atproto import models
+from atproto_client import models
 import atproto_client
 from ssky.profile_list import ProfileList
 from ssky.ssky_session import ssky_client
@@ -7,7 +7,7 @@ from ssky.result import (
     SessionError
 )
 
-def user(query, limit=25, **kwargs) -> ProfileList:
+def user(query, limit=25, cursor=None, **kwargs) -> ProfileList:
     try:
         current_session = ssky_client()
         if current_session is None:
@@ -15,6 +15,7 @@ def user(query, limit=25, **kwargs) -> ProfileList:
         
         response = current_session.app.bsky.actor.search_actors(
             models.AppBskyActorSearchActors.Params(
+                cursor=cursor,
                 limit=limit,
                 q=query
             )
@@ -24,6 +25,7 @@ def user(query, limit=25, **kwargs) -> ProfileList:
         if response.actors:
             for actor in response.actors:
                 result.append(actor.did)
+        result.cursor = response.cursor
         
         return result
     except atproto_client.exceptions.AtProtocolError as e:
@@ -1,5 +1,10 @@
+import contextlib
+import contextvars
 import json
+import os
 import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any, Optional
  
@@ -12,6 +17,42 @@ def summarize(source, length_max=0):
             summary = ''.join(summary[:length_max - 2]) + '..'
         return summary
 
+def write_json_atomically(path: str, data: Any, indent: int = None) -> None:
+    """Replace a JSON file atomically, so that other processes never read a partial file.
+
+    The file is readable and writable by the owner only. Errors are raised
+    after the temporary file is removed.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}-')  # Mode 0600
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+def submit_in_context(executor, function, *args):
+    """Submit a call that runs as the same account and under the same deadline as the caller"""
+    return executor.submit(contextvars.copy_context().run, function, *args)
+
+@contextlib.contextmanager
+def concurrent_calls(function, items: list, workers: int):
+    """Call a function on each item in a pool of workers.
+
+    Yields the futures of the calls in the order of the items. If the caller
+    fails, the calls not started yet are cancelled before the error is raised.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as executor:
+        futures = [submit_in_context(executor, function, item) for item in items]
+        try:
+            yield futures
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
 def join_uri_cid(uri, cid) -> str:
     return '::'.join([uri, cid])
 
@@ -27,7 +68,8 @@ def create_json_response(
     http_code: int,
     message: str,
     data: Any = None,
-    timestamp: Optional[str] = None
+    timestamp: Optional[str] = None,
+    cursor: Optional[str] = None
 ) -> str:
     """Create a consistent JSON response format.
     
@@ -37,6 +79,7 @@ def create_json_response(
         message: Human-readable message
         data: Response data (can be None)
         timestamp: ISO timestamp (auto-generated if None)
+        cursor: Cursor of the next page (omitted from the response if None)
     
     Returns:
         JSON string with consistent format
@@ -51,10 +94,12 @@ def create_json_response(
         "timestamp": timestamp,
         "data": data
     }
+    if cursor is not None:
+        response["cursor"] = cursor
     
     return json.dumps(response, ensure_ascii=False, separators=(',', ':'))
 
-def create_success_response(data: Any = None, message: str = "Success", http_code: int = 200, warnings: Optional[list] = None) -> str:
+def create_success_response(data: Any = None, message: str = "Success", http_code: int = 200, warnings: Optional[list] = None, cursor: Optional[str] = None) -> str:
     """Create a success JSON response.
     
     Args:
@@ -62,6 +107,7 @@ def create_success_response(data: Any = None, message: str = "Success", http_cod
         message: Success message
         http_code: HTTP status code (default: 200)
         warnings: List of warning messages to include in the response
+        cursor: Cursor of the next page, if there is one
     
     Returns:
         JSON string with success format
@@ -75,7 +121,8 @@ def create_success_response(data: Any = None, message: str = "Success", http_cod
         status="ok",
         http_code=http_code,
         message=message,
-        data=data
+        data=data,
+        cursor=cursor
     )
 
 def create_error_response(
@@ -0,0 +1,175 @@
+"""
+Batch execution for the ssky MCP server
+"""
+
+import asyncio
+import json
+import os
+import time
+
+# getProfiles and getPosts accept up to 25 actors or URIs per call
+BULK_CHUNK_SIZE = 25
+
+def chunked(items: list, size: int = BULK_CHUNK_SIZE) -> list:
+    """Split a list into lists of at most `size` items"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def is_rate_limited(response) -> bool:
+    """Check whether a tool response is a 429 error"""
+    if not isinstance(response, str):
+        return False
+    try:
+        parsed = json.loads(response)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(parsed, dict) and parsed.get('http_code') == 429
+
+def fetch_profiles(actors: list) -> dict:
+    """Fetch up to 25 profiles with a single getProfiles call.
+
+    Args:
+        actors: Handles, DIDs or "myself"
+
+    Returns:
+        {actor: response JSON}, each response being the same as
+        `ssky profile <actor> --simple-json`
+    """
+    import atproto_client
+    from ssky.profile_list import ProfileList
+    from ssky.result import AtProtocolSskyError, ErrorResult, InvalidActorError, SessionError
+    from ssky.ssky_session import expand_actor, ssky_client
+
+    try:
+        current_session = ssky_client()
+        if current_session is None:
+            raise SessionError()
+
+        expanded = {}
+        for actor in actors:
+            expanded[actor] = expand_actor(actor)
+            if expanded[actor] is None:
+                raise InvalidActorError()
+
+        profiles = current_session.get_profiles(list(set(expanded.values()))).profiles
+    except atproto_client.exceptions.AtProtocolError as e:
+        raise AtProtocolSskyError(e) from e
+
+    found = {}
+    for profile in profiles:
+        found[profile.did] = profile
+        found[profile.handle.lower()] = profile
+
+    responses = {}
+    for actor, name in expanded.items():
+        profile = found.get(name) or found.get(name.lower())
+        if profile is None:
+            responses[actor] = ErrorResult("Profile not found", 404).to_json()
+        else:
+            profile_list = ProfileList().append(profile.did)
+            profile_list.items = [ProfileList.Item(profile)]
+            responses[actor] = profile_list.to_json()
+    return responses
+
+def fetch_posts(targets: list) -> dict:
+    """Fetch up to 25 posts with a single getPosts call.
+
+    Args:
+        targets: AT URIs, optionally joined with a CID as "uri::cid"
+
+    Returns:
+        {target: response JSON}, each response being the same as
+        `ssky get <target> --simple-json`
+    """
+    import atproto_client
+    from ssky.post_data_list import PostDataList
+    from ssky.result import AtProtocolSskyError, SessionError
+    from ssky.ssky_session import ssky_client
+    from ssky.util import disjoin_uri_cid, is_joined_uri_cid
+
+    try:
+        current_session = ssky_client()
+        if current_session is None:
+            raise SessionError()
+
+        uri_cids = {}
+        for target in targets:
+            uri_cids[target] = disjoin_uri_cid(target) if is_joined_uri_cid(target) else (target, None)
+
+        posts = current_session.get_posts(list({uri for uri, cid in uri_cids.values()})).posts
+    except atproto_client.exceptions.AtProtocolError as e:
+        raise AtProtocolSskyError(e) from e
+
+    responses = {}
+    for target, (uri, cid) in uri_cids.items():
+        post_data_list = PostDataList()
+        for post in posts:
+            if post.uri == uri and (cid is None or post.cid == cid):
+                post_data_list.append(post)
+        responses[target] = post_data_list.to_json()
+    return responses
+
+class BatchScheduler:
+    """Runs batch jobs concurrently while staying under the upstream rate limit.
+
+    Job starts are spaced to at most `rate` per second. When a job comes back
+    with a 429, every job pauses for an exponentially growing backoff and the
+    rate-limited job is retried if it may run again: a write that got a 429
+    may have done part of its work (the first posts of a thread), so its
+    result is returned as it is.
+    """
+
+    def __init__(self, concurrency: int = 5, rate: float = 10, max_retries: int = 3, backoff: float = 1):
+        """
+        Args:
+            concurrency: Maximum number of jobs running at the same time
+            rate: Maximum number of job starts per second (0 disables pacing)
+            max_retries: Retries of a rate-limited job before its 429 is returned
+            backoff: Seconds to pause after the first 429, doubled on each retry
+        """
+        self.concurrency = max(concurrency, 1)
+        self.rate = rate
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._next_start = 0.0
+        self._paused_until = 0.0
+
+    @classmethod
+    def from_environment(cls) -> 'BatchScheduler':
+        """Create a scheduler configured by SSKY_MCP_BATCH_CONCURRENCY and SSKY_MCP_BATCH_RATE"""
+        return cls(
+            concurrency=int(os.environ.get('SSKY_MCP_BATCH_CONCURRENCY', '5')),
+            rate=float(os.environ.get('SSKY_MCP_BATCH_RATE', '10'))
+        )
+
+    async def run(self, jobs: list, retryable: list = None) -> list:
+        """Run zero-argument coroutine functions and return their results in order
+
+        Args:
+            jobs: Zero-argument coroutine functions
+            retryable: Whether each job may be run again after a 429 (default: all)
+        """
+        if retryable is None:
+            retryable = [True] * len(jobs)
+        slots = asyncio.Semaphore(self.concurrency)
+        pacing = asyncio.Lock()
+
+        async def run_job(job, may_retry):
+            async with slots:
+                for attempt in range(self.max_retries + 1):
+                    await self._wait_for_start(pacing)
+                    result = await job()
+                    if not is_rate_limited(result):
+                        return result
+                    self._paused_until = max(self._paused_until, time.monotonic() + self.backoff * (2 ** attempt))
+                    if not may_retry or attempt == self.max_retries:
+                        return result
+
+        return await asyncio.gather(*[run_job(job, may_retry) for job, may_retry in zip(jobs, retryable)])
+
+    async def _wait_for_start(self, pacing: asyncio.Lock) -> None:
+        async with pacing:
+            delay = max(self._next_start, self._paused_until) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.rate > 0:
+                self._next_start = time.monotonic() + 1 / self.rate
@@ -0,0 +1,187 @@
+"""
+Read-through response cache for the ssky MCP server
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+
+# Seconds a cached response stays valid, by tool. Profiles change rarely;
+# timelines and search results go stale quickly.
+PROFILE_TTL = float(os.environ.get('SSKY_MCP_CACHE_TTL_PROFILE', '300'))
+TIMELINE_TTL = float(os.environ.get('SSKY_MCP_CACHE_TTL_TIMELINE', '30'))
+
+CACHE_TTLS = {
+    'ssky_profile': PROFILE_TTL,
+    'ssky_user': PROFILE_TTL,
+    'ssky_get': TIMELINE_TTL,
+    'ssky_search': TIMELINE_TTL
+}
+
+# Cached tools whose responses a write tool can change
+INVALIDATED_BY = {
+    'ssky_post': ('ssky_get', 'ssky_search'),
+    'ssky_delete': ('ssky_get', 'ssky_search'),
+    'ssky_repost': ('ssky_get', 'ssky_search'),
+    'ssky_unrepost': ('ssky_get', 'ssky_search'),
+    'ssky_follow': ('ssky_get', 'ssky_profile', 'ssky_user'),
+    'ssky_unfollow': ('ssky_get', 'ssky_profile', 'ssky_user')
+}
+
+class FetchCancelled(Exception):
+    """The call fetching a response for coalesced calls was cancelled"""
+
+class ResponseCache:
+    """TTL-bounded LRU cache of MCP tool responses keyed by normalized arguments.
+
+    Concurrent calls with the same key share one upstream fetch (single-flight).
+    Only successful responses are stored.
+    """
+
+    def __init__(self, max_entries: int = 256, ttls: dict = None):
+        """
+        Args:
+            max_entries: Maximum number of cached responses (0 disables caching)
+            ttls: Seconds a response stays valid, by tool name. Tools without
+                a TTL are never cached.
+        """
+        self.max_entries = max_entries
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self._entries = OrderedDict()  # {key: (expires_at, response)}
+        self._in_flight = {}  # {key: asyncio.Future}
+        self._generations = {}  # {tool_name: int}, bumped on invalidation
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_environment(cls) -> 'ResponseCache':
+        """Create a cache sized by SSKY_MCP_CACHE_SIZE (default: 256, 0 disables)"""
+        return cls(max_entries=int(os.environ.get('SSKY_MCP_CACHE_SIZE', '256')))
+
+    @staticmethod
+    def make_key(tool_name: str, params: dict) -> tuple:
+        """Build a cache key from a tool name and its arguments.
+
+        Empty arguments are dropped and string values are stripped, so calls
+        that differ only in omitted defaults or whitespace share an entry.
+        """
+        normalized = []
+        for name, value in sorted(params.items()):
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == '':
+                continue
+            normalized.append((name, value))
+        return (tool_name, tuple(normalized))
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        return self.max_entries > 0 and self.ttls.get(tool_name, 0) > 0
+
+    async def get_or_fetch(self, tool_name: str, params: dict, fetch) -> str:
+        """Return the cached response for the call, or fetch and cache it.
+
+        Args:
+            tool_name: MCP tool name
+            params: Tool arguments
+            fetch: Zero-argument coroutine function producing the response
+
+        Returns:
+            Response JSON string
+        """
+        if not self.is_cacheable(tool_name):
+            return await fetch()
+
+        key = self.make_key(tool_name, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return response
+            del self._entries[key]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(in_flight)
+            except FetchCancelled:
+                # The call fetching for us was cancelled, not this one: fetch again
+                return await self.get_or_fetch(tool_name, params, fetch)
+
+        self.misses += 1
+        generation = self._generations.get(tool_name, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await fetch()
+        except asyncio.CancelledError:
+            future.set_exception(FetchCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        future.set_result(response)
+        # Don't store a response that a write invalidated while it was in flight
+        if generation == self._generations.get(tool_name, 0) and self._is_success(response):
+            self._store(key, response, self.ttls[tool_name])
+        return response
+
+    def invalidate(self, *tool_names: str) -> None:
+        """Drop all cached responses of the given tools"""
+        for tool_name in tool_names:
+            self._generations[tool_name] = self._generations.get(tool_name, 0) + 1
+        for key in [key for key in self._entries if key[0] in tool_names]:
+            del self._entries[key]
+        self.invalidations += 1
+
+    def invalidate_after(self, tool_name: str) -> None:
+        """Drop cached responses that a call to the given write tool may have changed"""
+        if tool_name in INVALIDATED_BY:
+            self.invalidate(*INVALIDATED_BY[tool_name])
+
+    def clear(self) -> None:
+        """Drop all cached responses"""
+        self.invalidate(*{key[0] for key in self._entries})
+
+    def stats(self) -> dict:
+        """Return cache counters"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups > 0 else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "ttls": self.ttls
+        }
+
+    def _store(self, key: tuple, response: str, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @staticmethod
+    def _is_success(response: str) -> bool:
+        try:
+            parsed = json.loads(response)
+        except (json.JSONDecodeError, TypeError):
+            return False
+        return isinstance(parsed, dict) and parsed.get('status') == 'ok'
@@ -0,0 +1,91 @@
+"""
+Per-client credentials for the shared ssky MCP server
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Header an HTTP client sends its Bluesky credentials in, as "handle:app-password"
+# (the same format as SSKY_USER). "Authorization: Basic" works as well.
+CLIENT_USER_HEADER = 'x-ssky-user'
+
+def parse_credentials(headers: dict) -> str:
+    """Return the "handle:password" credentials in HTTP request headers, or None.
+
+    Args:
+        headers: Request headers with lowercase names
+    """
+    credentials = headers.get(CLIENT_USER_HEADER, '').strip()
+    if not credentials:
+        scheme, _, value = headers.get('authorization', '').strip().partition(' ')
+        if scheme.lower() == 'basic' and value:
+            try:
+                credentials = base64.b64decode(value.strip(), validate=True).decode('utf-8')
+            except (binascii.Error, UnicodeDecodeError):
+                return None
+    handle, separator, password = credentials.partition(':')
+    if not separator or not handle or not password:
+        return None
+    return credentials
+
+def client_key(credentials: str) -> str:
+    """Identify a client by its credentials without keeping the password readable"""
+    return hashlib.sha256(credentials.encode('utf-8')).hexdigest()[:32]
+
+class ClientContexts:
+    """Login contexts of the clients of a shared server, by credentials.
+
+    Each client logs in on its own, and stays logged in until it is among the
+    least recently used once there are more than max_clients clients.
+    """
+
+    def __init__(self, max_clients: int = 100):
+        self.max_clients = max_clients
+        self._contexts = OrderedDict()  # {client key: SskySession.Context}
+        self._session_dir = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> 'ClientContexts':
+        """Create a registry sized by SSKY_MCP_MAX_CLIENTS (default: 100)"""
+        return cls(max_clients=int(os.environ.get('SSKY_MCP_MAX_CLIENTS', '100')))
+
+    def get(self, credentials: str):
+        """Return the SskySession.Context of a client, creating it on first use"""
+        from ssky.ssky_session import SskySession
+
+        key = client_key(credentials)
+        with self._lock:
+            context = self._contexts.get(key)
+            if context is None:
+                handle, password = credentials.split(':', 1)
+                context = SskySession.Context(handle=handle, password=password)
+                self._contexts[key] = context
+                while len(self._contexts) > self.max_clients:
+                    self._contexts.popitem(last=False)
+            else:
+                self._contexts.move_to_end(key)
+            return context
+
+    def subprocess_environment(self, credentials: str) -> dict:
+        """Environment for a ssky child process running as a client.
+
+        Each client gets its own session file in a private directory, so
+        clients never pick up the server's or each other's login.
+        """
+        with self._lock:
+            if self._session_dir is None:
+                self._session_dir = tempfile.mkdtemp(prefix='ssky-mcp-clients-')
+        env = dict(os.environ)
+        env.pop('SSKY_SESSION', None)  # The server's own session
+        env['SSKY_USER'] = credentials
+        env['SSKY_CONFIG_PATH'] = os.path.join(self._session_dir, client_key(credentials))
+        return env
+
+    def __len__(self) -> int:
+        return len(self._contexts)
@@ -0,0 +1,111 @@
+"""
+Startup import-time report for the ssky MCP server
+
+Usage: python -m ssky_mcp.import_report [--check] [--budget-ms MS]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from ssky.startup_report import parse_importtime
+
+# Packages ssky must not import before the first tool call (fastmcp imports
+# requests itself, which only counts if ssky is what imported it)
+DEFERRED_PACKAGES = ('atproto', 'atproto_client', 'bs4', 'requests')
+
+# Time from interpreter start-up to answering tools/list that the server aims for
+DEFAULT_BUDGET_MS = 150
+
+# Run in a fresh interpreter so that nothing is imported yet
+STARTUP_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+import ssky_mcp.server
+imported = time.perf_counter()
+import asyncio
+tools = asyncio.run(ssky_mcp.server.mcp.get_tools())
+listed = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "list_ms": (listed - imported) * 1000,
+    "tools": len(tools),
+    "modules": sorted(sys.modules)
+}))
+'''
+
+def collect(python: str = sys.executable) -> dict:
+    """Start a fresh interpreter, import the server and list its tools"""
+    env = dict(os.environ)
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [src_dir, env.get('PYTHONPATH')]))
+    env['PYTHONWARNINGS'] = 'ignore'
+    completed = subprocess.run(
+        [python, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        env=env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing the server failed:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['imports'] = parse_importtime(completed.stderr)
+    return result
+
+def format_report(result: dict, budget_ms: float = DEFAULT_BUDGET_MS, top: int = 10) -> str:
+    """Format collected startup data as a human-readable report"""
+    ready_ms = result['import_ms'] + result['list_ms']
+    lines = [
+        'ssky MCP server startup',
+        f"  import ssky_mcp.server  {result['import_ms']:9.1f} ms",
+        f"  list tools              {result['list_ms']:9.1f} ms ({result['tools']} tools)",
+        f"  ready                   {ready_ms:9.1f} ms (budget: {budget_ms:.0f} ms)",
+        '',
+        'Slowest imports of the server:'
+    ]
+    direct = [entry for entry in result['imports'] if entry[3] == 'ssky_mcp.server' and entry[0] == entry[2] != entry[3]]
+    for name, cumulative_us, _, _ in sorted(direct, key=lambda entry: -entry[1])[:top]:
+        lines.append(f"  {name:<30} {cumulative_us / 1000:9.1f} ms")
+
+    lines.append('')
+    loaded = loaded_deferred_packages(result)
+    if loaded:
+        lines.append('Deferred packages loaded at startup:')
+        importers = {entry[0]: entry[2] for entry in result['imports']}
+        for package in loaded:
+            lines.append(f"  {package:<30} imported via {importers.get(package, 'unknown')}")
+    else:
+        lines.append(f"Not imported by ssky before the first tool call: {', '.join(DEFERRED_PACKAGES)}")
+    return '\n'.join(lines)
+
+def is_ssky_module(name: str) -> bool:
+    return name.split('.')[0] in ('ssky', 'ssky_mcp')
+
+def loaded_deferred_packages(result: dict) -> list:
+    """Deferred packages loaded at startup, except those another package imported on its own"""
+    by_others = set()
+    for name, _, via, top in result['imports']:
+        importer = via if via != name else top
+        if importer != name and not is_ssky_module(importer):
+            by_others.add(name)
+    return [package for package in DEFERRED_PACKAGES if package in result['modules'] and package not in by_others]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Report where the ssky MCP server spends its start-up time')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help=f'Start-up time budget (default: {DEFAULT_BUDGET_MS})')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 if a deferred package is imported at startup or the budget is exceeded')
+    parser.add_argument('--top', type=int, default=10, help='Number of imports to show (default: 10)')
+    args = parser.parse_args(argv)
+
+    result = collect()
+    print(format_report(result, budget_ms=args.budget_ms, top=args.top))
+    if args.check:
+        over_budget = result['import_ms'] + result['list_ms'] > args.budget_ms
+        return 1 if over_budget or loaded_deferred_packages(result) else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Load testing for the ssky MCP server
+"""
@@ -0,0 +1,240 @@
+"""
+Load generator for the ssky MCP server
+
+Starts a fake XRPC server and an ssky MCP server pointed at it, drives the MCP
+server with concurrent simulated agents over stdio and/or HTTP, and reports
+throughput, latency percentiles and error rate per tool.
+
+Usage: python -m ssky_mcp.loadtest [--transport stdio|http|both] [--agents N] [--calls N]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from ssky_mcp.loadtest.fake_xrpc import HANDLE, PASSWORD, FakeXrpcServer
+
+def profile_batch(n: int) -> dict:
+    return {"operations": [{"tool": "ssky_profile", "args": {"handle": f"user{(n + i) % 100}.test"}} for i in range(10)]}
+
+# (weight, tool name, arguments for a random key) of the calls agents make
+WORKLOAD = (
+    (3, 'ssky_get', lambda n: {"limit": 20}),
+    (2, 'ssky_get', lambda n: {"param": f"user{n}.test", "limit": 20}),
+    (3, 'ssky_search', lambda n: {"query": f"topic{n}", "limit": 25}),
+    (3, 'ssky_profile', lambda n: {"handle": f"user{n}.test"}),
+    (2, 'ssky_user', lambda n: {"query": f"name{n}", "limit": 10}),
+    (1, 'ssky_batch', profile_batch)
+)
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+class Recorder:
+    """Collects the latency and outcome of every call"""
+
+    def __init__(self):
+        self.samples = {}  # {tool_name: [(seconds, ok)]}
+
+    def record(self, tool_name: str, seconds: float, ok: bool) -> None:
+        self.samples.setdefault(tool_name, []).append((seconds, ok))
+
+    def summary(self, elapsed: float) -> dict:
+        tools = {}
+        everything = []
+        for tool_name, samples in sorted(self.samples.items()):
+            tools[tool_name] = self._summarize(samples, elapsed)
+            everything.extend(samples)
+        return {"elapsed": elapsed, "tools": tools, "total": self._summarize(everything, elapsed)}
+
+    @staticmethod
+    def _summarize(samples: list, elapsed: float) -> dict:
+        latencies = sorted(seconds for seconds, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            "calls": len(samples),
+            "errors": errors,
+            "error_rate": errors / len(samples) if samples else 0.0,
+            "throughput": len(samples) / elapsed if elapsed > 0 else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000
+        }
+
+def is_ok(result) -> bool:
+    """Check whether an MCP tool result carries an ssky "ok" response"""
+    if result.is_error or not result.content:
+        return False
+    try:
+        return json.loads(result.content[0].text).get('status') == 'ok'
+    except (ValueError, AttributeError):
+        return False
+
+async def run_agent(client, recorder: Recorder, calls: int, deadline: float, keyspace: int, rng: random.Random) -> None:
+    weights = [weight for weight, _, _ in WORKLOAD]
+    done = 0
+    while done < calls and time.monotonic() < deadline:
+        _, tool_name, make_args = rng.choices(WORKLOAD, weights=weights)[0]
+        args = make_args(rng.randrange(keyspace))
+        started = time.perf_counter()
+        try:
+            result = await client.call_tool(tool_name, args, raise_on_error=False)
+            ok = is_ok(result)
+        except Exception:
+            ok = False
+        recorder.record(tool_name, time.perf_counter() - started, ok)
+        done += 1
+
+def server_environment(pds_url: str, options) -> dict:
+    env = dict(os.environ)
+    src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [src_dir, env.get('PYTHONPATH')]))
+    env['PYTHONWARNINGS'] = 'ignore'
+    env['SSKY_PDS_URL'] = pds_url
+    env['SSKY_USER'] = f"{HANDLE}:{PASSWORD}"
+    env['SSKY_CONFIG_PATH'] = os.path.join(tempfile.mkdtemp(prefix='ssky-loadtest-'), 'session')
+    if options.no_cache:
+        env['SSKY_MCP_CACHE_SIZE'] = '0'
+    return env
+
+def server_arguments(options) -> list:
+    return ['-m', 'ssky_mcp.server'] + (['--subprocess'] if options.subprocess else [])
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+async def drive(clients: list, options) -> dict:
+    """Warm up, then run the agents and return the summary"""
+    # The first call logs in; keep it out of the numbers
+    await clients[0].call_tool('ssky_profile', {"handle": HANDLE}, raise_on_error=False)
+
+    recorder = Recorder()
+    rng = random.Random(options.seed)
+    deadline = time.monotonic() + options.duration if options.duration > 0 else float('inf')
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        run_agent(clients[i % len(clients)], recorder, options.calls, deadline, options.keyspace, random.Random(rng.random()))
+        for i in range(options.agents)
+    ])
+    summary = recorder.summary(time.perf_counter() - started)
+
+    stats = await clients[0].call_tool('ssky_stats', {}, raise_on_error=False)
+    try:
+        summary["cache"] = json.loads(stats.content[0].text)["data"]["cache"]
+    except (ValueError, KeyError, IndexError, AttributeError):
+        pass
+    return summary
+
+async def run_stdio(pds_url: str, options) -> dict:
+    """All agents share one stdio connection, like tools of one agent host"""
+    from fastmcp import Client
+    from fastmcp.client.transports import StdioTransport
+
+    with open(os.devnull, 'w') as server_log:
+        transport = StdioTransport(sys.executable, server_arguments(options), env=server_environment(pds_url, options), log_file=server_log)
+        async with Client(transport, timeout=options.timeout) as client:
+            return await drive([client], options)
+
+async def run_http(pds_url: str, options) -> dict:
+    """Each agent has its own HTTP session with one shared server"""
+    from contextlib import AsyncExitStack
+    from fastmcp import Client
+
+    port = free_port()
+    env = server_environment(pds_url, options)
+    env.update({'SSKY_MCP_TRANSPORT': 'http', 'SSKY_MCP_HOST': '127.0.0.1', 'SSKY_MCP_PORT': str(port)})
+    process = subprocess.Popen([sys.executable] + server_arguments(options), env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_http(f"http://127.0.0.1:{port}/metrics", process)
+        async with AsyncExitStack() as stack:
+            clients = [
+                await stack.enter_async_context(Client(f"http://127.0.0.1:{port}/mcp", timeout=options.timeout))
+                for _ in range(options.agents)
+            ]
+            return await drive(clients, options)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def wait_for_http(url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"MCP server exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"MCP server did not come up at {url}")
+
+def format_summary(transport: str, summary: dict, options) -> str:
+    total = summary["total"]
+    lines = [
+        f"transport={transport} agents={options.agents} calls={total['calls']} "
+        f"elapsed={summary['elapsed']:.2f}s throughput={total['throughput']:.1f} calls/s",
+        f"{'tool':<14} {'calls':>6} {'errors':>6} {'err%':>6} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for tool_name, row in list(summary["tools"].items()) + [("TOTAL", total)]:
+        lines.append(
+            f"{tool_name:<14} {row['calls']:>6} {row['errors']:>6} {row['error_rate'] * 100:>6.1f} {row['throughput']:>8.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+    if "cache" in summary:
+        lines.append(f"cache: hit ratio {summary['cache']['hit_ratio']:.2f}, {summary['cache']['entries']} entries")
+    return '\n'.join(lines)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load test the ssky MCP server against a local fake XRPC server')
+    parser.add_argument('--transport', choices=['stdio', 'http', 'both'], default='both', help='MCP transport to test (default: both)')
+    parser.add_argument('--agents', type=int, default=10, help='Number of concurrent simulated agents (default: 10)')
+    parser.add_argument('--calls', type=int, default=20, help='Tool calls per agent (default: 20)')
+    parser.add_argument('--duration', type=float, default=0, help='Stop after this many seconds (default: no limit)')
+    parser.add_argument('--keyspace', type=int, default=50, help='Number of distinct handles/queries, which controls cache hits (default: 50)')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Fake XRPC response latency in ms (default: 50)')
+    parser.add_argument('--jitter-ms', type=float, default=20, help='Random extra fake XRPC latency in ms (default: 20)')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of fake XRPC requests failing with HTTP 500 (default: 0)')
+    parser.add_argument('--timeout', type=float, default=120, help='Client-side timeout per tool call in seconds (default: 120)')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the MCP server response cache')
+    parser.add_argument('--subprocess', action='store_true', help='Run the MCP server in subprocess mode (needs ssky on PATH)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the workload (default: 0)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    options = parser.parse_args(argv)
+
+    transports = ['stdio', 'http'] if options.transport == 'both' else [options.transport]
+    runners = {'stdio': run_stdio, 'http': run_http}
+    results = {}
+    with FakeXrpcServer(latency=options.latency_ms / 1000, jitter=options.jitter_ms / 1000, error_rate=options.error_rate) as fake:
+        for transport in transports:
+            results[transport] = asyncio.run(runners[transport](fake.url, options))
+            if not options.json:
+                print(format_summary(transport, results[transport], options))
+                print()
+        upstream_requests = dict(fake.requests)
+
+    if options.json:
+        print(json.dumps({"results": results, "upstream_requests": upstream_requests}, indent=2))
+    else:
+        print(f"upstream requests: {sum(upstream_requests.values())} ({', '.join(f'{nsid}={count}' for nsid, count in sorted(upstream_requests.items()))})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Local stand-in for the Bluesky PDS/AppView XRPC endpoints used by ssky
+
+Serves synthetic accounts and posts with a configurable response latency, so
+that the MCP server can be load-tested without touching the network.
+
+Usage: python -m ssky_mcp.loadtest.fake_xrpc [--port PORT] [--latency-ms MS]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HANDLE = 'loadtest.test'
+PASSWORD = 'loadtest'
+
+def create_jwt(did: str, lifetime: int) -> str:
+    """Create an unsigned JWT; atproto only decodes the payload"""
+    def encode(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+    header = encode(json.dumps({"alg": "none", "typ": "JWT"}).encode())
+    payload = encode(json.dumps({"sub": did, "exp": int(time.time()) + lifetime, "scope": "com.atproto.access"}).encode())
+    return f"{header}.{payload}.{encode(b'fake')}"
+
+def subject_of(authorization: str) -> str:
+    """Return the DID a "Bearer <JWT>" header was issued to, or None"""
+    try:
+        payload = (authorization or '').split(' ', 1)[1].split('.')[1]
+        return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))['sub']
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None
+
+# Handles of the DIDs handed out so far, so that a DID resolves back to its handle
+_handles = {}
+
+def did_for(actor: str) -> str:
+    if actor.startswith('did:'):
+        return actor
+    did = 'did:plc:' + hashlib.sha1(actor.lower().encode()).hexdigest()[:24]
+    _handles[did] = actor.lower()
+    return did
+
+def handle_for(actor: str) -> str:
+    if actor.startswith('did:'):
+        return _handles.get(actor, f"user-{actor[-8:]}.test")
+    return actor.lower()
+
+def cid_for(value: str) -> str:
+    return 'bafyrei' + hashlib.sha1(value.encode()).hexdigest()
+
+def profile_view(actor: str) -> dict:
+    handle = handle_for(actor)
+    return {
+        "did": did_for(actor),
+        "handle": handle,
+        "displayName": handle.split('.')[0].title(),
+        "description": f"Synthetic account {handle}",
+        "followersCount": 100,
+        "followsCount": 50,
+        "postsCount": 1000,
+        "createdAt": "2024-01-01T00:00:00.000Z",
+        "indexedAt": "2024-01-01T00:00:00.000Z"
+    }
+
+def post_view(uri: str, text: str = None) -> dict:
+    did = uri.split('/')[2]
+    return {
+        "uri": uri,
+        "cid": cid_for(uri),
+        "author": {"did": did, "handle": handle_for(did), "displayName": "Synthetic"},
+        "record": {
+            "$type": "app.bsky.feed.post",
+            "text": text or f"Synthetic post {uri.rsplit('/', 1)[-1]}",
+            "createdAt": "2024-01-01T00:00:00.000Z"
+        },
+        "replyCount": 1,
+        "repostCount": 2,
+        "likeCount": 3,
+        "indexedAt": "2024-01-01T00:00:00.000Z"
+    }
+
+def page(params: dict, make_item, total: int = 1000) -> tuple:
+    """Return (items, next cursor) for a paged listing of `total` synthetic items"""
+    limit = min(int(params.get('limit', ['50'])[0]), 100)
+    offset = int(params.get('cursor', ['0'])[0] or 0)
+    items = [make_item(i) for i in range(offset, min(offset + limit, total))]
+    next_offset = offset + len(items)
+    return items, str(next_offset) if next_offset < total else None
+
+class FakeXrpcServer:
+    """Threaded HTTP server answering the XRPC calls ssky makes"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, token_lifetime: int = 3600, feed_size: int = 1000):
+        """
+        Args:
+            host: Address to listen on
+            port: Port to listen on (0 picks a free port)
+            latency: Seconds to wait before answering each request
+            jitter: Maximum random seconds added to the latency
+            error_rate: Fraction of requests (other than login) answered with HTTP 500
+            token_lifetime: Lifetime of issued access tokens in seconds
+            feed_size: Number of posts in the timeline and in each author feed
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_lifetime = token_lifetime
+        self.feed_size = feed_size
+        self.requests = {}  # {nsid: count}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeXrpcServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-xrpc", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'FakeXrpcServer':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def handle(self, method: str, nsid: str, params: dict, body: dict, authorization: str = None) -> tuple:
+        """Answer one XRPC call. Returns (HTTP status, JSON body).
+
+        Any handle can log in with PASSWORD (HANDLE if none is given).
+        """
+        with self._lock:
+            self.requests[nsid] = self.requests.get(nsid, 0) + 1
+
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if nsid in ('com.atproto.server.createSession', 'com.atproto.server.refreshSession'):
+            if nsid == 'com.atproto.server.createSession' and body.get('password') != PASSWORD:
+                return 401, {"error": "AuthenticationRequired", "message": "Invalid identifier or password"}
+            if nsid == 'com.atproto.server.createSession':
+                handle = handle_for(body.get('identifier') or HANDLE)
+            else:
+                handle = handle_for(subject_of(authorization) or HANDLE)
+            did = did_for(handle)
+            return 200, {
+                "did": did,
+                "handle": handle,
+                "accessJwt": create_jwt(did, self.token_lifetime),
+                "refreshJwt": create_jwt(did, 90 * 24 * 3600),
+                "active": True
+            }
+
+        if self.error_rate > 0 and random.random() < self.error_rate:
+            return 500, {"error": "InternalServerError", "message": "Injected failure"}
+
+        if nsid == 'app.bsky.actor.getProfile':
+            return 200, profile_view(params['actor'][0])
+        if nsid == 'app.bsky.actor.getProfiles':
+            return 200, {"profiles": [profile_view(actor) for actor in params.get('actors', [])[:25]]}
+        if nsid == 'app.bsky.actor.searchActors':
+            query = params.get('q', [''])[0]
+            actors, cursor = page(params, lambda i: profile_view(f"{query}{i}.test"))
+            return 200, {"actors": actors, "cursor": cursor}
+        if nsid in ('app.bsky.feed.getTimeline', 'app.bsky.feed.getAuthorFeed'):
+            did = did_for(params.get('actor', [HANDLE])[0])
+            feed, cursor = page(params, lambda i: {"post": post_view(f"at://{did}/app.bsky.feed.post/{i:08d}")}, total=self.feed_size)
+            return 200, {"feed": feed, "cursor": cursor}
+        if nsid == 'app.bsky.feed.getPosts':
+            return 200, {"posts": [post_view(uri) for uri in params.get('uris', [])[:25]]}
+        if nsid == 'app.bsky.feed.searchPosts':
+            query = params.get('q', [''])[0]
+            posts, cursor = page(params, lambda i: post_view(f"at://{did_for(f'author{i % 50}.test')}/app.bsky.feed.post/{i:08d}", text=f"{query} {i}"))
+            return 200, {"posts": posts, "cursor": cursor, "hitsTotal": 1000}
+        if nsid == 'com.atproto.identity.resolveHandle':
+            return 200, {"did": did_for(params['handle'][0])}
+        if nsid in ('com.atproto.repo.createRecord', 'com.atproto.repo.putRecord'):
+            rkey = body.get('rkey') or hashlib.sha1(f"{time.time()}{random.random()}".encode()).hexdigest()[:13]
+            uri = f"at://{body.get('repo', did_for(HANDLE))}/{body.get('collection')}/{rkey}"
+            return 200, {"uri": uri, "cid": cid_for(uri)}
+        if nsid == 'com.atproto.repo.deleteRecord':
+            return 200, {}
+        return 501, {"error": "MethodNotImplemented", "message": f"{nsid} is not implemented by the fake server"}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def _dispatch(self, method):
+                url = urlparse(self.path)
+                nsid = url.path.rsplit('/', 1)[-1]
+                body = {}
+                length = int(self.headers.get('Content-Length') or 0)
+                if length > 0:
+                    raw = self.rfile.read(length)
+                    try:
+                        body = json.loads(raw)
+                    except ValueError:
+                        body = {}
+                status, payload = server.handle(method, nsid, parse_qs(url.query), body, self.headers.get('Authorization'))
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Run a local fake Bluesky XRPC server')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=2583, help='Port to listen on (default: 2583)')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Response latency in ms (default: 50)')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra latency in ms (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests failing with HTTP 500 (default: 0)')
+    parser.add_argument('--feed-size', type=int, default=1000, help='Posts in the timeline and in each author feed (default: 1000)')
+    args = parser.parse_args(argv)
+
+    server = FakeXrpcServer(args.host, args.port, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, error_rate=args.error_rate, feed_size=args.feed_size)
+    print(f"Fake XRPC server on {server.url} (log in as {HANDLE}:{PASSWORD}, SSKY_PDS_URL={server.url})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+if __name__ == '__main__':
+    main()
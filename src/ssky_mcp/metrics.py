@@ -0,0 +1,145 @@
+"""
+Tool call metrics for the ssky MCP server
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Phases of a tool call:
+#   spawn     - starting the ssky child process (subprocess mode)
+#   login     - logging in before the first call (in-process mode)
+#   xrpc      - the ssky function call, which is dominated by upstream XRPC requests
+#   serialize - turning the result into the JSON response
+#   total     - the whole call, including waiting for a concurrency slot
+PHASES = ('spawn', 'login', 'xrpc', 'serialize', 'total')
+
+class Histogram:
+    """Cumulative latency histogram with fixed buckets"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count > 0 else 0.0,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)}
+        }
+
+class Metrics:
+    """Per-tool call counters, error counters by HTTP code and phase latency histograms.
+
+    Thread-safe, since in-process tool calls run in worker threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}  # {tool_name: int}
+        self.errors = {}  # {(tool_name, http_code): int}
+        self.latencies = {}  # {(tool_name, phase): Histogram}
+
+    def observe(self, tool_name: str, phase: str, seconds: float) -> None:
+        """Record the duration of a phase of a tool call"""
+        with self._lock:
+            key = (tool_name, phase)
+            if key not in self.latencies:
+                self.latencies[key] = Histogram()
+            self.latencies[key].observe(seconds)
+
+    @contextmanager
+    def time(self, tool_name: str, phase: str):
+        """Context manager recording the duration of its body as a phase of a tool call"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(tool_name, phase, time.perf_counter() - started)
+
+    def record_call(self, tool_name: str, response) -> None:
+        """Count a finished tool call and, if its response is an error, the error's HTTP code"""
+        http_code = None
+        if isinstance(response, str):
+            try:
+                parsed = json.loads(response)
+                if isinstance(parsed, dict) and parsed.get('status') == 'error':
+                    http_code = parsed.get('http_code', 500)
+            except json.JSONDecodeError:
+                pass
+        with self._lock:
+            self.calls[tool_name] = self.calls.get(tool_name, 0) + 1
+            if http_code is not None:
+                key = (tool_name, http_code)
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        """Return all metrics by tool, for the ssky_stats tool"""
+        with self._lock:
+            tools = {}
+            for tool_name, count in self.calls.items():
+                tools.setdefault(tool_name, {})["calls"] = count
+            for (tool_name, http_code), count in self.errors.items():
+                tools.setdefault(tool_name, {}).setdefault("errors", {})[str(http_code)] = count
+            for (tool_name, phase), histogram in self.latencies.items():
+                tools.setdefault(tool_name, {}).setdefault("latency", {})[phase] = histogram.snapshot()
+            return tools
+
+    def to_openmetrics(self, cache_stats: dict = None, login_counts: dict = None) -> str:
+        """Render all metrics in the OpenMetrics text format.
+
+        Args:
+            cache_stats: ResponseCache.stats() to include, if any
+            login_counts: SskySession.login_counts to include, if any
+        """
+        lines = []
+        with self._lock:
+            lines.append('# TYPE ssky_mcp_tool_calls counter')
+            lines.append('# HELP ssky_mcp_tool_calls Finished tool calls.')
+            for tool_name, count in sorted(self.calls.items()):
+                lines.append(f'ssky_mcp_tool_calls_total{{tool="{tool_name}"}} {count}')
+
+            lines.append('# TYPE ssky_mcp_tool_errors counter')
+            lines.append('# HELP ssky_mcp_tool_errors Tool calls that returned an error, by HTTP code.')
+            for (tool_name, http_code), count in sorted(self.errors.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+                lines.append(f'ssky_mcp_tool_errors_total{{tool="{tool_name}",http_code="{http_code}"}} {count}')
+
+            lines.append('# TYPE ssky_mcp_phase_duration_seconds histogram')
+            lines.append('# HELP ssky_mcp_phase_duration_seconds Duration of tool call phases.')
+            for (tool_name, phase), histogram in sorted(self.latencies.items()):
+                labels = f'tool="{tool_name}",phase="{phase}"'
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'ssky_mcp_phase_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'ssky_mcp_phase_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'ssky_mcp_phase_duration_seconds_count{{{labels}}} {histogram.count}')
+                lines.append(f'ssky_mcp_phase_duration_seconds_sum{{{labels}}} {histogram.sum}')
+
+        if cache_stats is not None:
+            for name in ('hits', 'misses', 'coalesced', 'evictions', 'invalidations'):
+                lines.append(f'# TYPE ssky_mcp_cache_{name} counter')
+                lines.append(f'ssky_mcp_cache_{name}_total {cache_stats[name]}')
+            lines.append('# TYPE ssky_mcp_cache_entries gauge')
+            lines.append(f'ssky_mcp_cache_entries {cache_stats["entries"]}')
+
+        if login_counts is not None:
+            lines.append('# TYPE ssky_mcp_logins counter')
+            lines.append('# HELP ssky_mcp_logins Logins by kind (restore, session, refresh, password).')
+            for kind, count in login_counts.items():
+                lines.append(f'ssky_mcp_logins_total{{kind="{kind}"}} {count}')
+
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
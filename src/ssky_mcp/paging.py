@@ -0,0 +1,83 @@
+"""
+Cursor-based paging of MCP read tool responses
+"""
+
+import base64
+import json
+
+def encode_cursor(tool_name: str, cursor: str = None, skip: int = 0) -> str:
+    """Build the opaque cursor token returned to MCP clients.
+
+    Args:
+        tool_name: MCP tool name the token is valid for
+        cursor: Upstream cursor of the page to fetch (None for the first page)
+        skip: Number of items at the start of that page already returned
+    """
+    payload = json.dumps({"t": tool_name, "c": cursor, "s": skip}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(tool_name: str, token: str) -> tuple:
+    """Decode a cursor token into (upstream cursor, skip).
+
+    Raises:
+        ValueError: If the token is malformed or belongs to another tool
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        cursor, skip = payload["c"], int(payload["s"])
+        if payload["t"] != tool_name or skip < 0 or not (cursor is None or isinstance(cursor, str)):
+            raise ValueError
+        return cursor, skip
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        raise ValueError(f"Invalid cursor for {tool_name}") from None
+
+def parse_fields(fields: str) -> list:
+    """Parse a comma-separated field list, e.g. "uri,text,author" """
+    return [field.strip() for field in fields.split(',') if field.strip()] if fields else []
+
+def _dump(response: dict) -> str:
+    return json.dumps(response, ensure_ascii=False, separators=(',', ':'))
+
+def page_response(tool_name: str, response: str, cursor: str = None, skip: int = 0, fields: list = None, max_bytes: int = 0) -> str:
+    """Cut a read tool response down to the page the client asked for.
+
+    Items already returned from this upstream page are skipped, items are
+    reduced to the requested fields, and items that would make the response
+    larger than max_bytes are left for the next page. The "cursor" of the
+    result is a token for the next page, or null on the last page.
+
+    Args:
+        tool_name: MCP tool name
+        response: Response JSON of the upstream page
+        cursor: Upstream cursor the page was fetched with
+        skip: Number of items at the start of the page to leave out
+        fields: Item fields to keep (all fields if empty)
+        max_bytes: Maximum response size in bytes (0 for no limit). At least
+            one item is always returned so paging makes progress.
+    """
+    try:
+        parsed = json.loads(response)
+    except json.JSONDecodeError:
+        return response
+    if not isinstance(parsed, dict) or parsed.get('status') != 'ok' or not isinstance(parsed.get('data'), list):
+        return response
+
+    items = parsed['data'][skip:]
+    if fields:
+        items = [{field: item[field] for field in fields if field in item} if isinstance(item, dict) else item for item in items]
+
+    next_cursor = parsed.get('cursor')
+    parsed['data'] = items
+    parsed['cursor'] = encode_cursor(tool_name, next_cursor) if next_cursor else None
+    if max_bytes <= 0 or len(_dump(parsed).encode('utf-8')) <= max_bytes:
+        return _dump(parsed)
+
+    message = parsed.get('message', '')
+    for count in range(len(items) - 1, 0, -1):
+        parsed['data'] = items[:count]
+        parsed['cursor'] = encode_cursor(tool_name, cursor, skip + count)
+        parsed['message'] = f"{message} (truncated to {count} of {len(items)} item(s) to fit max_bytes)"
+        if len(_dump(parsed).encode('utf-8')) <= max_bytes:
+            break
+    return _dump(parsed)
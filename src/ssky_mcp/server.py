@@ -3,15 +3,23 @@
 Official MCP SDK implementation for ssky (Simple Bluesky Client)
 """
 
+import asyncio
 import json
 import logging
+import os
 import subprocess
 import sys
-from importlib.metadata import version, PackageNotFoundError
+from contextlib import contextmanager
 from fastmcp import FastMCP
+from fastmcp.server.dependencies import get_http_headers
 
 # Import ssky utilities (now we can import directly!)
 from ssky.util import create_success_response, create_error_response
+from ssky_mcp.batch import BatchScheduler, chunked, fetch_posts, fetch_profiles
+from ssky_mcp.cache import ResponseCache
+from ssky_mcp.clients import ClientContexts, client_key, parse_credentials
+from ssky_mcp.metrics import Metrics
+from ssky_mcp.paging import decode_cursor, page_response, parse_fields
 
 # Set logging level to WARNING and above for stderr output
 logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
@@ -33,14 +41,14 @@ mcp = FastMCP("ssky")
 # Set the MCP server version (same as ssky package)
 def get_mcp_server_version():
     """Get the MCP server version (uses ssky package version)"""
+    # importlib.metadata is slow to import; only main() needs the version
+    from importlib.metadata import version, PackageNotFoundError
     try:
         return version("ssky")
     except PackageNotFoundError:
         logger.warning("Could not find ssky package version, using fallback")
         return "unknown"
 
-mcp._mcp_server.version = get_mcp_server_version()
-
 def format_success_response(data: str) -> str:
     """Format success response for MCP (expects JSON data)"""
     
@@ -61,12 +69,307 @@ def format_success_response(data: str) -> str:
         # Empty response case
         return create_success_response(data=None)
 
+# Tools call the ssky functions in-process by default, which keeps the login
+# session and its HTTP connection alive between calls. Set SSKY_MCP_SUBPROCESS=1
+# (or pass --subprocess) to spawn the ssky CLI for every call instead, which
+# isolates each call in its own process.
+use_subprocess = os.environ.get('SSKY_MCP_SUBPROCESS', '').lower() in ('1', 'true', 'yes')
+
+# Tools are async: up to SSKY_MCP_MAX_CONCURRENCY calls run at the same time
+# (in worker threads or child processes) and each call is abandoned after its
+# timeout. SSKY_MCP_TIMEOUT changes the default timeout for all tools, and
+# SSKY_MCP_TIMEOUT_<TOOL> (e.g. SSKY_MCP_TIMEOUT_SSKY_POST) for a single tool.
+MAX_CONCURRENCY = int(os.environ.get('SSKY_MCP_MAX_CONCURRENCY', '10'))
+
+DEFAULT_TIMEOUT = float(os.environ.get('SSKY_MCP_TIMEOUT', '30'))
+
+# Posting may upload media and waits for the post to be indexed
+TOOL_TIMEOUTS = {
+    'ssky_post': 120
+}
+
+_concurrency_limit = asyncio.Semaphore(MAX_CONCURRENCY)
+
+# Call counts, error counts and phase latencies, reported by ssky_stats and /metrics
+metrics = Metrics()
+
+def get_tool_timeout(tool_name: str) -> float:
+    """Get the timeout in seconds for a tool"""
+    env_value = os.environ.get(f'SSKY_MCP_TIMEOUT_{tool_name.upper()}')
+    if env_value:
+        return float(env_value)
+    return max(TOOL_TIMEOUTS.get(tool_name, 0), DEFAULT_TIMEOUT)
+
+def get_tool_deadline(timeout: float) -> float:
+    """Deadline of the command run by a tool call with a timeout.
+
+    The command gives up by itself shortly before the call is abandoned, so
+    that it reports what it got done and doesn't run on in the background.
+    """
+    return max(timeout - 1.0, timeout / 2)
+
+def serialize_result(result) -> str:
+    """Serialize a ssky result object the same way `ssky --simple-json` prints it"""
+    if hasattr(result, 'to_simple_json'):
+        return result.to_simple_json()
+    elif hasattr(result, 'to_json'):
+        return result.to_json()
+    else:
+        return str(result)
+
+async def run_subprocess(tool_name: str, args: list, default_output: str = None, env: dict = None) -> str:
+    """Run a ssky subcommand in a child `ssky` process and format its output"""
+    command = ["ssky"] + args
+    try:
+        with metrics.time(tool_name, 'spawn'):
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env
+            )
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            # Timed out or cancelled by the client: don't leave the child running
+            if process.returncode is None:
+                process.kill()
+            raise
+        stdout = stdout.decode('utf-8', errors='replace')
+        stderr = stderr.decode('utf-8', errors='replace')
+
+        if process.returncode == 0:
+            output = stdout.strip()
+            if not output and default_output:
+                output = default_output
+            return format_success_response(output)
+        else:
+            # ssky prints JSON errors to stdout with --simple-json, other errors to stderr
+            error_msg = stdout.strip() or stderr.strip()
+            logger.error(f"{tool_name} failed with return code {process.returncode}: {error_msg}")
+            # Try to parse error as JSON first
+            try:
+                error_json = json.loads(error_msg)
+                if isinstance(error_json, dict) and 'status' in error_json:
+                    # Already in new format
+                    return error_msg
+            except json.JSONDecodeError:
+                pass
+            return create_error_response(message=error_msg, http_code=process.returncode if process.returncode != 0 else 500)
+
+    except Exception as e:
+        logger.error(f"{tool_name} unexpected error: {str(e)}")
+        return create_error_response(message=str(e), http_code=500)
+
+def run_in_process(tool_name: str, args: list, default_output: str = None) -> str:
+    """Run a ssky subcommand by calling its function directly and serialize the result"""
+    import atproto_client
+    from ssky.main import parse, invoke
+    from ssky.result import ErrorResult, SskyError
+    from ssky.ssky_session import SskySession
+
+    try:
+        subcommand, parsed_args = parse(args)
+    except SystemExit:
+        logger.error(f"{tool_name} received invalid arguments: {' '.join(args)}")
+        return create_error_response(message=f"Invalid arguments: {' '.join(args)}", http_code=400)
+
+    if SskySession.status() == SskySession.Status.NOT_LOGGED_IN:
+        # Log in up front so that the login shows up as its own phase
+        with metrics.time(tool_name, 'login'):
+            try:
+                SskySession()
+            except atproto_client.exceptions.AtProtocolError:
+                # Let the subcommand run into the same error and report it
+                SskySession.clear()
+
+    try:
+        with metrics.time(tool_name, 'xrpc'):
+            result = invoke(subcommand, parsed_args)
+        if result is None:
+            return create_error_response(message=f"{subcommand} returned no result", http_code=500)
+
+        with metrics.time(tool_name, 'serialize'):
+            if parsed_args.output:
+                # Same as the CLI: results go to files and nothing is returned inline
+                result.print(format=parsed_args.format, output=parsed_args.output, delimiter=parsed_args.delimiter)
+                output = ''
+            else:
+                output = serialize_result(result)
+        if not output and default_output:
+            output = default_output
+        return format_success_response(output)
+    except SskyError as e:
+        logger.error(f"{tool_name} failed: {e.message}")
+        return ErrorResult(e.message, e.http_code, getattr(e, 'data', None)).to_json()
+    except Exception as e:
+        logger.error(f"{tool_name} unexpected error: {str(e)}")
+        return create_error_response(message=str(e), http_code=500)
+    finally:
+        # Don't let one failed login poison every later call in this process
+        if SskySession.status() == SskySession.Status.LOGIN_FAILED:
+            SskySession.clear()
+
+# Responses of read tools, shared by all calls with the same arguments
+response_cache = ResponseCache.from_environment()
+
+# Keeps the in-process login warm. main() creates it, and it starts with the
+# first tool call so that atproto is not imported before the client has
+# listed the tools (set SSKY_MCP_EAGER_LOGIN=1 to log in at startup instead).
+session_keeper = None
+
+# Logins of HTTP clients that send their own credentials (X-Ssky-User or
+# Authorization: Basic). Clients without credentials use the server's login.
+client_contexts = ClientContexts.from_environment()
+
+def get_client_credentials() -> str:
+    """Return the credentials the current HTTP client sent, or None (also for stdio)"""
+    return parse_credentials(get_http_headers(include_all=True))
+
+@contextmanager
+def client_session(credentials: str = None):
+    """Run the ssky calls in this block (and the worker threads it starts) as the client"""
+    if credentials is None:
+        yield
+        return
+    from ssky.ssky_session import SskySession
+    with SskySession.using(client_contexts.get(credentials)):
+        yield
+
+async def run_ssky(tool_name: str, args: list, default_output: str = None) -> str:
+    """Run a ssky subcommand (args without the leading "ssky") and return the MCP response"""
+    from ssky.deadline import deadline_scope
+
+    timeout = get_tool_timeout(tool_name)
+    deadline = get_tool_deadline(timeout)
+    response = None
+    credentials = get_client_credentials()
+    if session_keeper is not None and not use_subprocess and credentials is None:
+        session_keeper.start()
+    with metrics.time(tool_name, 'total'):
+        async with _concurrency_limit:
+            try:
+                if use_subprocess:
+                    env = client_contexts.subprocess_environment(credentials) if credentials is not None else dict(os.environ)
+                    env['SSKY_DEADLINE'] = str(deadline)
+                    response = await asyncio.wait_for(
+                        run_subprocess(tool_name, args, default_output=default_output, env=env),
+                        timeout=timeout
+                    )
+                else:
+                    # The ssky functions block on network I/O, so run them in a worker thread
+                    with client_session(credentials), deadline_scope(deadline):
+                        response = await asyncio.wait_for(
+                            asyncio.to_thread(run_in_process, tool_name, args, default_output=default_output),
+                            timeout=timeout
+                        )
+            except asyncio.TimeoutError:
+                logger.error(f"{tool_name} timed out after {timeout} seconds: {' '.join(args)}")
+                response = create_error_response(message="Command timed out", http_code=408)
+            finally:
+                # A write may have happened even if the call failed or timed out
+                response_cache.invalidate_after(tool_name)
+    metrics.record_call(tool_name, response)
+    return response
+
+async def run_ssky_cached(tool_name: str, args: list, params: dict) -> str:
+    """Run a read tool through the response cache.
+
+    Args:
+        tool_name: MCP tool name
+        args: ssky arguments (without the leading "ssky")
+        params: Tool arguments that affect the response, used as the cache key
+    """
+    if params.get('output_dir'):
+        # Writing files is a side effect the cache can't replay
+        return await run_ssky(tool_name, args)
+    credentials = get_client_credentials()
+    if credentials is not None and is_viewer_specific(tool_name, params):
+        # Public reads are shared by all clients; the timeline and "myself" are not
+        params = {**params, "client": client_key(credentials)}
+    return await response_cache.get_or_fetch(tool_name, params, lambda: run_ssky(tool_name, args))
+
+def is_viewer_specific(tool_name: str, params: dict) -> bool:
+    """Check whether a read depends on who is logged in"""
+    if tool_name == 'ssky_get':
+        return str(params.get('param') or '').strip() in ('', 'myself')
+    if tool_name == 'ssky_profile':
+        return str(params.get('handle') or '').strip() == 'myself'
+    if tool_name == 'ssky_search':
+        return str(params.get('author') or '').strip() == 'myself'
+    return False
+
+async def run_ssky_paged(tool_name: str, args: list, params: dict, cursor: str = "", fields: str = "", max_bytes: int = 0) -> str:
+    """Run a paged read tool through the response cache and cut out the requested page.
+
+    Args:
+        tool_name: MCP tool name
+        args: ssky arguments (without the leading "ssky")
+        params: Tool arguments that affect the response, used as the cache key
+        cursor: Cursor token returned with the previous page
+        fields: Comma-separated item fields to return
+        max_bytes: Maximum response size in bytes (0 for no limit)
+    """
+    upstream_cursor, skip = None, 0
+    if cursor:
+        try:
+            upstream_cursor, skip = decode_cursor(tool_name, cursor)
+        except ValueError as e:
+            return create_error_response(message=str(e), http_code=400)
+    if upstream_cursor:
+        # Joined to the option so that cursors starting with "-" are not taken for options
+        args = args + [f"--cursor={upstream_cursor}"]
+
+    response = await run_ssky_cached(tool_name, args, {**params, "cursor": upstream_cursor})
+    return page_response(tool_name, response, cursor=upstream_cursor, skip=skip, fields=parse_fields(fields), max_bytes=max_bytes)
+
+def run_bulk_in_process(tool_name: str, fetch, targets: list):
+    """Run a bulk fetch function, returning its {target: response} dict or an error response"""
+    from ssky.result import ErrorResult, SskyError
+    from ssky.ssky_session import SskySession
+
+    try:
+        with metrics.time(tool_name, 'xrpc'):
+            return fetch(targets)
+    except SskyError as e:
+        logger.error(f"{tool_name} bulk fetch failed: {e.message}")
+        return ErrorResult(e.message, e.http_code, getattr(e, 'data', None)).to_json()
+    except Exception as e:
+        logger.error(f"{tool_name} bulk fetch unexpected error: {str(e)}")
+        return create_error_response(message=str(e), http_code=500)
+    finally:
+        if SskySession.status() == SskySession.Status.LOGIN_FAILED:
+            SskySession.clear()
+
+async def run_bulk(tool_name: str, fetch, targets: list):
+    """Run a bulk fetch in a worker thread under the same concurrency limit and timeout as run_ssky"""
+    from ssky.deadline import deadline_scope
+
+    timeout = get_tool_timeout(tool_name)
+    with metrics.time(tool_name, 'total'):
+        async with _concurrency_limit:
+            try:
+                with client_session(get_client_credentials()), deadline_scope(get_tool_deadline(timeout)):
+                    response = await asyncio.wait_for(
+                        asyncio.to_thread(run_bulk_in_process, tool_name, fetch, targets),
+                        timeout=timeout
+                    )
+            except asyncio.TimeoutError:
+                logger.error(f"{tool_name} bulk fetch timed out after {timeout} seconds")
+                response = create_error_response(message="Command timed out", http_code=408)
+    metrics.record_call(tool_name, response)
+    return response
+
 @mcp.tool()
-def ssky_get(
+async def ssky_get(
     param: str = "", 
     limit: int = 25, 
     delimiter: str = "",
-    output_dir: str = ""
+    output_dir: str = "",
+    cursor: str = "",
+    fields: str = "",
+    max_bytes: int = 0
 ) -> str:
     """Get posts from Bluesky timeline or specific user
     
@@ -75,6 +378,9 @@ def ssky_get(
         limit: Number of posts to retrieve (default: 25, same as ssky command)
         delimiter: Custom delimiter string
         output_dir: Output to files in specified directory
+        cursor: Cursor returned with the previous page, to continue from there
+        fields: Comma-separated item fields to return (e.g. "uri,text,author"; default: all)
+        max_bytes: Maximum response size in bytes; items that don't fit are left for the next page (default: no limit)
     
     Returns:
         JSON string with structured post data:
@@ -91,7 +397,8 @@ def ssky_get(
                     "repost_count": "number",
                     "like_count": "number"
                 }
-            ]
+            ],
+            "cursor": "string or null (pass to the next call to get the next page)"
         }
         Error:
         {
@@ -100,7 +407,7 @@ def ssky_get(
             "http_code": "number"
         }
     """
-    args = ["ssky", "get"]
+    args = ["get"]
     
     # Add limit option
     args.extend(["-N", str(limit)])
@@ -120,38 +427,10 @@ def ssky_get(
     if param:
         args.append(param)
     
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return format_success_response(result.stdout.strip())
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_get failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_get command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_get unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+    return await run_ssky_paged("ssky_get", args, {"param": param, "limit": limit, "output_dir": output_dir}, cursor=cursor, fields=fields, max_bytes=max_bytes)
 
 @mcp.tool()  
-def ssky_post(
+async def ssky_post(
     message: str = "",
     dry_run: bool = False,
     images: str = "",
@@ -204,7 +483,7 @@ def ssky_post(
             "http_code": "number"
         }
     """
-    args = ["ssky", "post"]
+    args = ["post"]
     
     # Add dry run option
     if dry_run:
@@ -268,45 +547,20 @@ def ssky_post(
     if message:
         args.append(message)
     
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return format_success_response(result.stdout.strip())
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_post failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_post command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_post unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+    return await run_ssky("ssky_post", args)
 
 @mcp.tool()
-def ssky_search(
+async def ssky_search(
     query: str, 
     limit: int = 25, 
     author: str = "", 
     since: str = "", 
     until: str = "", 
     delimiter: str = "", 
-    output_dir: str = ""
+    output_dir: str = "",
+    cursor: str = "",
+    fields: str = "",
+    max_bytes: int = 0
 ) -> str:
     """Search posts on Bluesky
     
@@ -318,6 +572,9 @@ def ssky_search(
         until: Until timestamp (ex. 2099-12-31T23:59:59Z, "today", "yesterday")
         delimiter: Custom delimiter string
         output_dir: Output to files in specified directory
+        cursor: Cursor returned with the previous page, to continue from there
+        fields: Comma-separated item fields to return (e.g. "uri,text,author"; default: all)
+        max_bytes: Maximum response size in bytes; items that don't fit are left for the next page (default: no limit)
     
     Returns:
         JSON string with search results:
@@ -334,7 +591,8 @@ def ssky_search(
                     "repost_count": "number",
                     "like_count": "number"
                 }
-            ]
+            ],
+            "cursor": "string or null (pass to the next call to get the next page)"
         }
         Error:
         {
@@ -343,7 +601,7 @@ def ssky_search(
             "http_code": "number"
         }
     """
-    args = ["ssky", "search", query, "--limit", str(limit)]
+    args = ["search", query, "--limit", str(limit)]
     
     # Always use simple-json for MCP
     args.append("--simple-json")
@@ -368,38 +626,10 @@ def ssky_search(
     if output_dir:
         args.extend(["--output", output_dir])
     
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return format_success_response(result.stdout.strip())
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_search failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_search command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_search unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+    return await run_ssky_paged("ssky_search", args, {"query": query, "limit": limit, "author": author, "since": since, "until": until, "output_dir": output_dir}, cursor=cursor, fields=fields, max_bytes=max_bytes)
 
 @mcp.tool()
-def ssky_profile(handle: str, delimiter: str = "", output_dir: str = "") -> str:
+async def ssky_profile(handle: str, delimiter: str = "", output_dir: str = "") -> str:
     """Show user profile information
     
     Args:
@@ -430,7 +660,7 @@ def ssky_profile(handle: str, delimiter: str = "", output_dir: str = "") -> str:
             "http_code": "number"
         }
     """
-    args = ["ssky", "profile", handle]
+    args = ["profile", handle]
     
     # Always use simple-json for MCP
     args.append("--simple-json")
@@ -443,38 +673,10 @@ def ssky_profile(handle: str, delimiter: str = "", output_dir: str = "") -> str:
     if output_dir:
         args.extend(["--output", output_dir])
     
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return format_success_response(result.stdout.strip())
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_profile failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_profile command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_profile unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+    return await run_ssky_cached("ssky_profile", args, {"handle": handle, "output_dir": output_dir})
 
 @mcp.tool()
-def ssky_user(query: str, limit: int = 25, delimiter: str = "", output_dir: str = "") -> str:
+async def ssky_user(query: str, limit: int = 25, delimiter: str = "", output_dir: str = "", cursor: str = "", fields: str = "", max_bytes: int = 0) -> str:
     """Search users on Bluesky
     
     Args:
@@ -482,6 +684,9 @@ def ssky_user(query: str, limit: int = 25, delimiter: str = "", output_dir: str
         limit: Number of results to return (default: 25, same as ssky command)
         delimiter: Custom delimiter string
         output_dir: Output to files in specified directory
+        cursor: Cursor returned with the previous page, to continue from there
+        fields: Comma-separated item fields to return (e.g. "did,handle,display_name"; default: all)
+        max_bytes: Maximum response size in bytes; items that don't fit are left for the next page (default: no limit)
     
     Returns:
         JSON string with user search results:
@@ -497,7 +702,8 @@ def ssky_user(query: str, limit: int = 25, delimiter: str = "", output_dir: str
                     "following_count": "number",
                     "avatar": "string"
                 }
-            ]
+            ],
+            "cursor": "string or null (pass to the next call to get the next page)"
         }
         Error:
         {
@@ -506,7 +712,7 @@ def ssky_user(query: str, limit: int = 25, delimiter: str = "", output_dir: str
             "http_code": "number"
         }
     """
-    args = ["ssky", "user", query, "--limit", str(limit)]
+    args = ["user", query, "--limit", str(limit)]
     
     # Always use simple-json for MCP
     args.append("--simple-json")
@@ -519,38 +725,10 @@ def ssky_user(query: str, limit: int = 25, delimiter: str = "", output_dir: str
     if output_dir:
         args.extend(["--output", output_dir])
     
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return format_success_response(result.stdout.strip())
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_user failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_user command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_user unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+    return await run_ssky_paged("ssky_user", args, {"query": query, "limit": limit, "output_dir": output_dir}, cursor=cursor, fields=fields, max_bytes=max_bytes)
 
 @mcp.tool()
-def ssky_follow(handle: str, delimiter: str = "", output_dir: str = "") -> str:
+async def ssky_follow(handle: str, delimiter: str = "", output_dir: str = "") -> str:
     """Follow a user on Bluesky
     
     Args:
@@ -577,7 +755,7 @@ def ssky_follow(handle: str, delimiter: str = "", output_dir: str = "") -> str:
             "http_code": "number"
         }
     """
-    args = ["ssky", "follow", handle]
+    args = ["follow", handle]
     
     # Always use simple-json for MCP
     args.append("--simple-json")
@@ -590,38 +768,10 @@ def ssky_follow(handle: str, delimiter: str = "", output_dir: str = "") -> str:
     if output_dir:
         args.extend(["--output", output_dir])
     
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return format_success_response(result.stdout.strip())
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_follow failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_follow command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_follow unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+    return await run_ssky("ssky_follow", args)
 
 @mcp.tool()
-def ssky_unfollow(handle: str, delimiter: str = "", output_dir: str = "") -> str:
+async def ssky_unfollow(handle: str, delimiter: str = "", output_dir: str = "") -> str:
     """Unfollow a user on Bluesky
     
     Args:
@@ -647,7 +797,7 @@ def ssky_unfollow(handle: str, delimiter: str = "", output_dir: str = "") -> str
             "http_code": "number"
         }
     """
-    args = ["ssky", "unfollow", handle]
+    args = ["unfollow", handle]
     
     # Always use simple-json for MCP
     args.append("--simple-json")
@@ -660,38 +810,10 @@ def ssky_unfollow(handle: str, delimiter: str = "", output_dir: str = "") -> str
     if output_dir:
         args.extend(["--output", output_dir])
     
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return format_success_response(result.stdout.strip())
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_unfollow failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_unfollow command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_unfollow unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+    return await run_ssky("ssky_unfollow", args)
 
 @mcp.tool()
-def ssky_repost(post_uri: str, delimiter: str = "", output_dir: str = "") -> str:
+async def ssky_repost(post_uri: str, delimiter: str = "", output_dir: str = "") -> str:
     """Repost a post on Bluesky
     
     Args:
@@ -718,7 +840,7 @@ def ssky_repost(post_uri: str, delimiter: str = "", output_dir: str = "") -> str
             "http_code": "number"
         }
     """
-    args = ["ssky", "repost", post_uri]
+    args = ["repost", post_uri]
     
     # Always use simple-json for MCP
     args.append("--simple-json")
@@ -731,38 +853,10 @@ def ssky_repost(post_uri: str, delimiter: str = "", output_dir: str = "") -> str
     if output_dir:
         args.extend(["--output", output_dir])
     
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return format_success_response(result.stdout.strip())
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_repost failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_repost command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_repost unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+    return await run_ssky("ssky_repost", args)
 
 @mcp.tool()
-def ssky_unrepost(post_uri: str, delimiter: str = "", output_dir: str = "") -> str:
+async def ssky_unrepost(post_uri: str, delimiter: str = "", output_dir: str = "") -> str:
     """Unrepost (remove repost) a post on Bluesky
     
     Args:
@@ -788,7 +882,7 @@ def ssky_unrepost(post_uri: str, delimiter: str = "", output_dir: str = "") -> s
             "http_code": "number"
         }
     """
-    args = ["ssky", "unrepost", post_uri]
+    args = ["unrepost", post_uri]
     
     # Always use simple-json for MCP
     args.append("--simple-json")
@@ -801,38 +895,10 @@ def ssky_unrepost(post_uri: str, delimiter: str = "", output_dir: str = "") -> s
     if output_dir:
         args.extend(["--output", output_dir])
     
-    try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return format_success_response(result.stdout.strip())
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_unrepost failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_unrepost command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_unrepost unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+    return await run_ssky("ssky_unrepost", args)
 
 @mcp.tool()
-def ssky_delete(post_uri: str) -> str:
+async def ssky_delete(post_uri: str) -> str:
     """Delete a post on Bluesky
     
     Args:
@@ -856,57 +922,244 @@ def ssky_delete(post_uri: str) -> str:
             "http_code": "number"
         }
     """
-    args = ["ssky", "delete", post_uri]
+    args = ["delete", post_uri]
     
     # Always use simple-json for MCP
     args.append("--simple-json")
     
+    return await run_ssky("ssky_delete", args, default_output="Post deleted successfully")
+
+# Maximum number of operations in one ssky_batch call
+MAX_BATCH_OPERATIONS = 100
+
+batch_scheduler = BatchScheduler.from_environment()
+
+# Tools a batch runs again after a 429; writes are not repeated, and the
+# requests of each call are already retried by ssky where that is safe
+READ_ONLY_TOOLS = ('ssky_get', 'ssky_search', 'ssky_profile', 'ssky_user', 'ssky_stats')
+
+def get_bulk_target(tool_name: str, args: dict):
+    """Return (kind, target) if the operation can be collapsed into a bulk call, otherwise None"""
+    if use_subprocess:
+        return None
+    if tool_name == 'ssky_profile' and set(args) <= {'handle'}:
+        handle = str(args.get('handle', '')).strip()
+        if handle:
+            return ('profile', handle)
+    elif tool_name == 'ssky_get' and set(args) <= {'param', 'limit'}:
+        # limit does not apply to a single post
+        param = str(args.get('param', '')).strip()
+        if param.startswith('at://'):
+            return ('post', param)
+    return None
+
+async def run_batch_operation(tool, args: dict) -> str:
+    """Call a tool function with the arguments of a batch operation"""
     try:
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            output = result.stdout.strip() if result.stdout.strip() else "Post deleted successfully"
-            return format_success_response(output)
-        else:
-            error_msg = result.stderr.strip()
-            logger.error(f"ssky_delete failed with return code {result.returncode}: {error_msg}")
-            # Try to parse error as JSON first
-            try:
-                error_json = json.loads(error_msg)
-                if isinstance(error_json, dict) and 'status' in error_json:
-                    # Already in new format
-                    return error_msg
-            except json.JSONDecodeError:
-                pass
-            return create_error_response(message=error_msg, http_code=result.returncode if result.returncode != 0 else 500)
-            
-    except subprocess.TimeoutExpired:
-        logger.error(f"ssky_delete command timed out: {' '.join(args)}")
-        return create_error_response(message="Command timed out", http_code=408)
-    except Exception as e:
-        logger.error(f"ssky_delete unexpected error: {str(e)}")
-        return create_error_response(message=str(e), http_code=500)
+        return await tool(**args)
+    except TypeError as e:
+        return create_error_response(message=f"Invalid arguments: {e}", http_code=400)
+
+@mcp.tool()
+async def ssky_batch(operations: list[dict]) -> str:
+    """Run many ssky operations in one call
+
+    Operations run concurrently, paced to stay under the Bluesky rate limit.
+    Profile lookups (ssky_profile with only a handle) and single-post lookups
+    (ssky_get with an at:// URI) are combined into bulk requests of 25.
+
+    Args:
+        operations: List of operations, each {"tool": "ssky_profile", "args": {"handle": "..."}}.
+            Any ssky tool except ssky_batch can be used; "tool" may omit the "ssky_" prefix.
+
+    Returns:
+        JSON string with one result per operation, in the order given:
+        {
+            "status": "ok",
+            "message": "string",
+            "data": [
+                {
+                    "tool": "string",
+                    "result": "Response of the tool, same as calling it directly"
+                }
+            ]
+        }
+    """
+    if not operations:
+        return create_error_response(message="No operations given", http_code=400)
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return create_error_response(message=f"Too many operations (maximum: {MAX_BATCH_OPERATIONS})", http_code=400)
+
+    tool_names = [None] * len(operations)
+    responses = [None] * len(operations)
+    jobs = []
+    job_indexes = []  # Operation indexes answered by each job
+    retryable = []  # Whether each job may run again after a 429
+    bulk_indexes = {'profile': {}, 'post': {}}  # {kind: {target: [index]}}
+
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or not isinstance(operation.get('tool'), str):
+            responses[index] = create_error_response(message="Operation must have a tool name", http_code=400)
+            continue
+        tool_name = operation['tool'] if operation['tool'].startswith('ssky_') else f"ssky_{operation['tool']}"
+        tool_names[index] = tool_name
+        args = operation.get('args') or {}
+        if tool_name not in BATCH_TOOLS or not isinstance(args, dict):
+            responses[index] = create_error_response(message=f"Invalid operation: {operation['tool']}", http_code=400)
+            continue
+
+        bulk_target = get_bulk_target(tool_name, args)
+        if bulk_target:
+            kind, target = bulk_target
+            bulk_indexes[kind].setdefault(target, []).append(index)
+            continue
+
+        jobs.append(lambda tool=BATCH_TOOLS[tool_name], args=args: run_batch_operation(tool, args))
+        job_indexes.append([index])
+        retryable.append(tool_name in READ_ONLY_TOOLS)
+
+    bulk_fetches = {'profile': ('ssky_profile', fetch_profiles), 'post': ('ssky_get', fetch_posts)}
+    for kind, targets in bulk_indexes.items():
+        tool_name, fetch = bulk_fetches[kind]
+        for chunk in chunked(list(targets)):
+            jobs.append(lambda tool_name=tool_name, fetch=fetch, chunk=chunk: run_bulk(tool_name, fetch, chunk))
+            job_indexes.append([(target, index) for target in chunk for index in targets[target]])
+            retryable.append(True)
+
+    for indexes, result in zip(job_indexes, await batch_scheduler.run(jobs, retryable)):
+        for entry in indexes:
+            if isinstance(entry, tuple):
+                target, index = entry
+                responses[index] = result[target] if isinstance(result, dict) else result
+            else:
+                responses[entry] = result
+
+    results = [{"tool": tool_name, "result": json.loads(response)} for tool_name, response in zip(tool_names, responses)]
+    failed = sum(1 for result in results if result["result"].get("status") != "ok")
+    return create_success_response(
+        data=results,
+        message=f"Completed {len(results)} operation(s), {failed} failed"
+    )
+
+def get_login_counts() -> dict:
+    """Return SskySession.login_counts, without importing atproto before the first login"""
+    session_module = sys.modules.get('ssky.ssky_session')
+    if session_module is None:
+        return {'restore': 0, 'session': 0, 'refresh': 0, 'password': 0}
+    return dict(session_module.SskySession.login_counts)
+
+@mcp.tool()
+async def ssky_stats() -> str:
+    """Show ssky MCP server statistics
+
+    Returns:
+        JSON string with server statistics:
+        {
+            "status": "ok",
+            "data": {
+                "cache": {
+                    "entries": "number",
+                    "hits": "number",
+                    "misses": "number",
+                    "coalesced": "number",
+                    "hit_ratio": "number",
+                    "evictions": "number",
+                    "invalidations": "number"
+                },
+                "clients": "number (HTTP clients logged in with their own credentials)",
+                "logins": {
+                    "restore": "number (session file used without contacting Bluesky)",
+                    "session": "number (session file checked with Bluesky)",
+                    "refresh": "number (tokens refreshed)",
+                    "password": "number (password logins, which Bluesky rate-limits)"
+                },
+                "tools": {
+                    "<tool name>": {
+                        "calls": "number",
+                        "errors": {"<http_code>": "number"},
+                        "latency": {
+                            "<spawn|login|xrpc|serialize|total>": {
+                                "count": "number",
+                                "sum": "number (seconds)",
+                                "mean": "number (seconds)",
+                                "buckets": {"<upper bound in seconds>": "number"}
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    """
+    return create_success_response(data={
+        "cache": response_cache.stats(),
+        "clients": len(client_contexts),
+        "logins": get_login_counts(),
+        "tools": metrics.snapshot()
+    })
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def openmetrics(request):
+    """Serve metrics in the OpenMetrics text format (HTTP transport only)"""
+    from starlette.responses import Response
+    return Response(
+        metrics.to_openmetrics(cache_stats=response_cache.stats(), login_counts=get_login_counts()),
+        media_type="application/openmetrics-text; version=1.0.0; charset=utf-8"
+    )
+
+# Tools ssky_batch can run, by name
+BATCH_TOOLS = {
+    tool.name: tool.fn for tool in [
+        ssky_get, ssky_post, ssky_search, ssky_profile, ssky_user, ssky_follow,
+        ssky_unfollow, ssky_repost, ssky_unrepost, ssky_delete, ssky_stats
+    ]
+}
 
 def main():
     """Main entry point for the MCP server."""
     import sys
     
+    global use_subprocess, session_keeper
+
     # Handle version request
     if len(sys.argv) > 1 and sys.argv[1] in ['--version', '-v']:
         print(f"ssky MCP server version {get_mcp_server_version()}")
         return
-    
-    logger.info(f"Starting ssky MCP server version {get_mcp_server_version()}")
+
+    if '--subprocess' in sys.argv[1:]:
+        use_subprocess = True
+
+    # stdio by default; SSKY_MCP_TRANSPORT=http (or --http) serves MCP over
+    # streamable HTTP, together with OpenMetrics at /metrics
+    transport = os.environ.get('SSKY_MCP_TRANSPORT', 'stdio')
+    if '--http' in sys.argv[1:]:
+        transport = 'http'
+    
+    mcp._mcp_server.version = get_mcp_server_version()
+    logger.info(f"Starting ssky MCP server version {mcp._mcp_server.version}")
+
+    # In-process tools share one login for the lifetime of the server
+    if not use_subprocess:
+        from ssky_mcp.session_keeper import SessionKeeper
+        session_keeper = SessionKeeper()
+        if os.environ.get('SSKY_MCP_EAGER_LOGIN', '').lower() in ('1', 'true', 'yes'):
+            session_keeper.start()
+
     try:
-        mcp.run(show_banner=False)
+        if transport == 'http':
+            mcp.run(
+                transport='http',
+                host=os.environ.get('SSKY_MCP_HOST', '127.0.0.1'),
+                port=int(os.environ.get('SSKY_MCP_PORT', '8000')),
+                show_banner=False
+            )
+        else:
+            mcp.run(show_banner=False)
     except KeyboardInterrupt:
         logger.info("MCP server stopped by user")
         pass
+    finally:
+        if session_keeper is not None:
+            session_keeper.stop()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
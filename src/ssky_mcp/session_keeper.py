@@ -0,0 +1,81 @@
+"""
+Long-lived login session for the ssky MCP server
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger("ssky_mcp_server")
+
+class SessionKeeper:
+    """Keeps the server's ssky session logged in and its tokens fresh.
+
+    The session itself lives in SskySession, so every in-process tool call
+    reuses the same authenticated atproto client and its keep-alive HTTP
+    connection. The keeper logs in once when the server starts and then
+    refreshes the access token shortly before it expires, writing the new
+    tokens back to the session file.
+    """
+
+    def __init__(self, interval: float = 60, margin: float = None):
+        """
+        Args:
+            interval: Seconds between token expiry checks
+            margin: Refresh when the access token expires within this many
+                seconds (default: SskySession.refresh_margin)
+        """
+        self.interval = interval
+        self.margin = margin
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Log in and start refreshing tokens in a background thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ssky-session-keeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def warm_up(self) -> bool:
+        """Log in ahead of the first tool call. Returns True if logged in."""
+        from ssky.ssky_session import SskySession
+
+        try:
+            SskySession()
+        except Exception as e:
+            logger.warning(f"Could not log in at startup: {e}")
+        if SskySession.status() == SskySession.Status.LOGIN_FAILED:
+            # Let the next tool call retry and report the error to the agent
+            SskySession.clear()
+            return False
+        return SskySession.status() == SskySession.Status.LOGGED_IN
+
+    def check(self) -> bool:
+        """Refresh the access token if it is about to expire. Returns True if refreshed."""
+        from ssky.ssky_session import SskySession
+
+        margin = self.margin if self.margin is not None else SskySession.refresh_margin
+        expires_in = SskySession.access_token_expires_in()
+        if expires_in is None or expires_in > margin:
+            return False
+        try:
+            SskySession.refresh_internal()
+            logger.info("Refreshed access token")
+            return True
+        except Exception as e:
+            # atproto still refreshes lazily on the next request
+            logger.warning(f"Could not refresh access token: {e}")
+            return False
+
+    def _run(self) -> None:
+        self.warm_up()
+        while not self._stop_event.wait(self.interval):
+            self.check()
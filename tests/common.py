@@ -75,11 +75,13 @@ def create_mock_atproto_client():
     # Timeline response
     mock_timeline_response = Mock()
     mock_timeline_response.feed = [mock_feed_post]
+    mock_timeline_response.cursor = None
     mock_client.get_timeline.return_value = mock_timeline_response
     
     # Author feed response
     mock_author_feed_response = Mock()
     mock_author_feed_response.feed = [mock_feed_post]
+    mock_author_feed_response.cursor = None
     mock_client.get_author_feed.return_value = mock_author_feed_response
     
     # Posts response - default post without viewer info
@@ -159,6 +161,7 @@ def create_mock_atproto_client():
     
     mock_search_response = Mock()
     mock_search_response.posts = [mock_search_post]
+    mock_search_response.cursor = None
     mock_client.app.bsky.feed.search_posts.return_value = mock_search_response
     
     return mock_client, mock_profile
@@ -1,5 +1,6 @@
 import os
 import json
+import atproto
 import pytest
 from unittest.mock import patch, Mock
 
@@ -193,4 +194,448 @@ class TestSskySessionSequential(BaseSequentialTest):
         session.persist()  # Should not raise
         
         # Cleanup
-        SskySession.clear() 
\ No newline at end of file
+        SskySession.clear() 
+
+def create_session_string(expires_in, handle="test.bsky.social", did="did:plc:test123"):
+    """Session string with an access token expiring in the given number of seconds"""
+    import base64
+    import time
+
+    def encode(data):
+        return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+    header = encode(json.dumps({"alg": "none"}).encode())
+    payload = encode(json.dumps({"exp": int(time.time() + expires_in), "sub": did}).encode())
+    access_jwt = '.'.join([header, payload, encode(b'signature')])
+    return ':::'.join([handle, did, access_jwt, "refresh-jwt", "https://pds.example.com"])
+
+
+class TestSessionRestore:
+    """Restoring the session file without a network round trip"""
+
+    PROFILE = {"did": "did:plc:test123", "handle": "test.bsky.social", "displayName": "Test User"}
+
+    @pytest.fixture(autouse=True)
+    def session_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "session"
+        monkeypatch.setattr(SskySession, 'config_path', str(path))
+        monkeypatch.delenv('SSKY_USER', raising=False)
+        SskySession.clear()
+        yield path
+        SskySession.clear()
+
+    def test_valid_token_is_restored_offline(self, session_file):
+        """A token with time left is used without contacting the server"""
+        from ssky.ssky_session import SskyClient
+
+        session_file.write_text(json.dumps({"session_string": create_session_string(3600), "profile": self.PROFILE}))
+        with patch.object(SskyClient, 'login') as mock_login, patch.object(SskyClient, '_invoke') as mock_invoke:
+            session = SskySession()
+
+        mock_login.assert_not_called()
+        mock_invoke.assert_not_called()
+        assert SskySession.status() == SskySession.Status.LOGGED_IN
+        assert session.profile().did == "did:plc:test123"
+        assert session.client().me.handle == "test.bsky.social"
+        assert session.client()._base_url == "https://pds.example.com/xrpc"
+
+    def test_expiring_token_logs_in(self, session_file):
+        """A token close to expiry goes through the regular session login"""
+        session_string = create_session_string(60)
+        session_file.write_text(json.dumps({"session_string": session_string, "profile": self.PROFILE}))
+        with patch.object(SskySession, 'at_login_internal', return_value=SskySession.Session(Mock(), Mock())) as mock_login, \
+             patch.object(SskySession, 'persist_internal'):
+            SskySession()
+        mock_login.assert_called_once_with(session_string=session_string)
+
+    def test_session_file_without_profile_logs_in(self, session_file):
+        session_file.write_text(json.dumps({"session_string": create_session_string(3600)}))
+        assert SskySession.restore_internal(json.loads(session_file.read_text())) is None
+
+    def test_profile_is_persisted(self, session_file):
+        from atproto_client import models
+        from atproto_client.models.utils import get_or_create
+
+        client = Mock()
+        client.export_session_string.return_value = "session-string"
+        profile = get_or_create(self.PROFILE, models.AppBskyActorDefs.ProfileViewDetailed)
+        SskySession.session = SskySession.Session(client, profile)
+        SskySession.persist_internal()
+
+        saved = json.loads(session_file.read_text())
+        assert saved["session_string"] == "session-string"
+        assert saved["profile"]["did"] == "did:plc:test123"
+
+    def test_rejected_token_is_refreshed(self, session_file):
+        """A 401 on a restored session refreshes the tokens, saves them and retries the request"""
+        import atproto_client
+
+        session_file.write_text(json.dumps({"session_string": create_session_string(3600), "profile": self.PROFILE}))
+        SskySession()
+        client = SskySession.session.client
+        rejected = atproto_client.exceptions.UnauthorizedError(Mock(content=Mock(error="AuthenticationRequired")))
+
+        def refresh():
+            client._set_session(atproto_client.client.session.SessionEvent.REFRESH, client._session)
+
+        with patch.object(atproto.Client, '_invoke', side_effect=[rejected, "response"]) as mock_invoke, \
+             patch.object(client, '_refresh_and_set_session', side_effect=refresh) as mock_refresh, \
+             patch.object(SskySession, 'persist_client_internal') as mock_persist:
+            assert client._invoke("query", nsid="app.bsky.feed.getTimeline") == "response"
+
+        assert mock_invoke.call_count == 2
+        mock_refresh.assert_called_once()
+        mock_persist.assert_called_once()
+
+    def test_rejected_refresh_logs_in_again(self, session_file, monkeypatch):
+        """If the refresh token is rejected too, the client logs in with SSKY_USER"""
+        import atproto_client
+
+        monkeypatch.setenv('SSKY_USER', 'test.bsky.social:password')
+        session_file.write_text(json.dumps({"session_string": create_session_string(3600), "profile": self.PROFILE}))
+        SskySession()
+        client = SskySession.session.client
+        rejected = atproto_client.exceptions.UnauthorizedError(Mock(content=Mock(error="AuthenticationRequired")))
+
+        with patch.object(atproto.Client, '_invoke', side_effect=[rejected, "response"]), \
+             patch.object(client, '_refresh_and_set_session', side_effect=rejected), \
+             patch.object(client, '_get_and_set_session') as mock_login:
+            assert client._invoke("query", nsid="app.bsky.feed.getTimeline") == "response"
+
+        mock_login.assert_called_once_with('test.bsky.social', 'password')
+
+
+class TestSessionPersistence:
+    """Saving refreshed tokens and counting logins"""
+
+    @pytest.fixture(autouse=True)
+    def session_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "session"
+        monkeypatch.setattr(SskySession, 'config_path', str(path))
+        monkeypatch.setattr(SskySession, 'login_counts', {'restore': 0, 'session': 0, 'refresh': 0, 'password': 0})
+        monkeypatch.setattr(SskySession, '_unsaved_counts', {})
+        monkeypatch.delenv('SSKY_USER', raising=False)
+        SskySession.clear()
+        yield path
+        SskySession.clear()
+
+    def restore(self, session_file):
+        session_file.write_text(json.dumps({"session_string": create_session_string(3600), "profile": TestSessionRestore.PROFILE}))
+        SskySession()
+        return SskySession.session.client
+
+    def test_refresh_is_saved(self, session_file):
+        """Tokens refreshed by atproto are written to the session file, together with the login totals"""
+        from atproto_client.client.session import SessionEvent
+
+        client = self.restore(session_file)
+        client._session.access_jwt = create_session_string(7200).split(':::')[2]
+        client._set_session(SessionEvent.REFRESH, client._session)
+
+        saved = json.loads(session_file.read_text())
+        assert saved["session_string"] == client.export_session_string()
+        assert saved["profile"]["did"] == "did:plc:test123"
+        assert saved["logins"] == {"refresh": 1}
+        assert SskySession.login_counts["restore"] == 1
+        assert SskySession.login_counts["refresh"] == 1
+        assert oct(os.stat(session_file).st_mode & 0o777) == oct(0o600)
+        assert sorted(os.listdir(session_file.parent)) == ["session", "session.lock"]
+
+    def test_totals_add_up_across_processes(self, session_file):
+        from atproto_client.client.session import SessionEvent
+
+        client = self.restore(session_file)
+        saved = json.loads(session_file.read_text())
+        session_file.write_text(json.dumps({**saved, "logins": {"refresh": 5, "password": 2}}))
+        client._set_session(SessionEvent.REFRESH, client._session)
+
+        assert json.loads(session_file.read_text())["logins"] == {"refresh": 6, "password": 2}
+
+    def test_password_login_is_counted(self, session_file):
+        from atproto_client.client.session import SessionEvent
+
+        client = self.restore(session_file)
+        client.session_changed(SessionEvent.CREATE, client._session)
+        assert SskySession.login_counts["password"] == 1
+
+    def test_tokens_rotated_by_another_process(self, session_file, monkeypatch):
+        """When the saved tokens were rotated by another process meanwhile, its new tokens are used instead of the password"""
+        import atproto_client
+
+        monkeypatch.setenv('SSKY_USER', 'test.bsky.social:password')
+        stale, fresh = create_session_string(60), create_session_string(120)
+        session_file.write_text(json.dumps({"session_string": stale}))
+
+        def login(handle=None, password=None, session_string=None):
+            if session_string == stale:
+                session_file.write_text(json.dumps({"session_string": fresh}))
+                raise atproto_client.exceptions.BadRequestError(Mock())
+            return SskySession.Session(Mock(), Mock())
+
+        with patch.object(SskySession, 'at_login_internal', side_effect=login) as mock_login, \
+             patch.object(SskySession, 'persist_internal'):
+            SskySession()
+
+        assert SskySession.status() == SskySession.Status.LOGGED_IN
+        assert [call.kwargs for call in mock_login.call_args_list] == [{"session_string": stale}, {"session_string": fresh}]
+        assert SskySession.login_counts["session"] == 1
+
+
+class TestSessionFileLock:
+    """Coordinating parallel ssky processes through the session file"""
+
+    @pytest.fixture(autouse=True)
+    def session_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "session"
+        monkeypatch.setattr(SskySession, 'config_path', str(path))
+        monkeypatch.delenv('SSKY_USER', raising=False)
+        SskySession.clear()
+        yield path
+        SskySession.clear()
+
+    def test_lock_excludes_other_processes(self, session_file):
+        import fcntl
+
+        with SskySession.config_lock():
+            with SskySession.config_lock():  # Reentrant within the process
+                fd = os.open(str(session_file) + ".lock", os.O_RDWR)
+                try:
+                    with pytest.raises(BlockingIOError):
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                finally:
+                    os.close(fd)
+
+        fd = os.open(str(session_file) + ".lock", os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        finally:
+            os.close(fd)
+
+    def test_lock_timeout(self, session_file):
+        """A process that can't get the lock carries on without it"""
+        import fcntl
+        from ssky.ssky_session import SessionFileLock
+
+        session_file.with_suffix(".lock").touch()
+        fd = os.open(str(session_file) + ".lock", os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            with SessionFileLock(timeout=0.1).hold(str(session_file) + ".lock"):
+                pass
+        finally:
+            os.close(fd)
+
+    def restore(self, session_file, expires_in):
+        session_file.write_text(json.dumps({"session_string": create_session_string(expires_in), "profile": TestSessionRestore.PROFILE}))
+        with patch.object(SskySession, 'restore_margin', 0):
+            SskySession()
+        return SskySession.session.client
+
+    def test_refresh_uses_tokens_of_other_process(self, session_file):
+        """A process waiting for the refresh leader picks up the tokens it saved instead of refreshing again"""
+        client = self.restore(session_file, 60)
+        refreshed = create_session_string(7200)
+        session_file.write_text(json.dumps({"session_string": refreshed, "profile": TestSessionRestore.PROFILE}))
+
+        with patch.object(atproto.Client, '_refresh_and_set_session') as mock_refresh:
+            client._refresh_and_set_session()
+
+        mock_refresh.assert_not_called()
+        assert client.export_session_string() == refreshed
+
+    def test_leader_refreshes_and_saves_under_lock(self, session_file):
+        """Without newer tokens in the file, the process refreshes and saves before releasing the lock"""
+        import fcntl
+        from atproto_client.client.session import SessionEvent
+
+        client = self.restore(session_file, 60)
+        refreshed = create_session_string(7200)
+
+        def refresh():
+            fd = os.open(str(session_file) + ".lock", os.O_RDWR)
+            try:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            finally:
+                os.close(fd)
+            client._import_session_string(refreshed)
+            client._set_session(SessionEvent.REFRESH, client._session)
+
+        with patch.object(atproto.Client, '_refresh_and_set_session', side_effect=refresh) as mock_refresh:
+            client._refresh_and_set_session()
+
+        mock_refresh.assert_called_once()
+        saved = json.loads(session_file.read_text())
+        assert saved["session_string"] == refreshed
+        assert saved["profile"]["did"] == "did:plc:test123"
+
+
+class TestAccounts:
+    """Several accounts saved in one session file"""
+
+    BRAND = {"did": "did:plc:brand1", "handle": "brand1.bsky.social"}
+
+    @pytest.fixture(autouse=True)
+    def session_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "session"
+        monkeypatch.setattr(SskySession, 'config_path', str(path))
+        monkeypatch.setattr(SskySession, '_account_contexts', {})
+        monkeypatch.delenv('SSKY_USER', raising=False)
+        SskySession.clear()
+        path.write_text(json.dumps({
+            "session_string": create_session_string(3600),
+            "profile": TestSessionRestore.PROFILE,
+            "accounts": {
+                "did:plc:brand1": {
+                    "session_string": create_session_string(3600, handle="brand1.bsky.social", did="did:plc:brand1"),
+                    "profile": self.BRAND
+                }
+            }
+        }))
+        yield path
+        SskySession.clear()
+
+    def test_find_account(self, session_file):
+        saved = json.loads(session_file.read_text())
+
+        assert SskySession.find_account_internal(saved, None) is saved
+        assert SskySession.find_account_internal(saved, "test.bsky.social") is saved
+        assert SskySession.find_account_internal(saved, "brand1.bsky.social")["profile"] == self.BRAND
+        assert SskySession.find_account_internal(saved, "did:plc:brand1")["profile"] == self.BRAND
+        assert SskySession.find_account_internal(saved, "unknown.bsky.social") is None
+        assert SskySession.saved_accounts() == {"did:plc:test123": "test.bsky.social", "did:plc:brand1": "brand1.bsky.social"}
+
+    def test_clients_of_several_accounts(self, session_file):
+        """Library code can hold logged-in clients of several accounts at once"""
+        from ssky.ssky_session import PooledRequest, ssky_client
+
+        brand = ssky_client(account="brand1.bsky.social")
+        default = ssky_client()
+
+        assert brand.me.did == "did:plc:brand1"
+        assert default.me.did == "did:plc:test123"
+        assert ssky_client(account="did:plc:brand1") is not brand  # Contexts are kept by the name given
+        assert ssky_client(account="brand1.bsky.social") is brand
+        assert isinstance(brand.request, PooledRequest)
+        assert SskySession.account_context("brand1.bsky.social").session.client is brand
+
+    def test_account_refresh_is_saved_to_its_entry(self, session_file):
+        from atproto_client.client.session import SessionEvent
+        from ssky.ssky_session import ssky_client
+
+        brand = ssky_client(account="brand1.bsky.social")
+        refreshed = create_session_string(7200, handle="brand1.bsky.social", did="did:plc:brand1")
+        brand._import_session_string(refreshed)
+        brand._set_session(SessionEvent.REFRESH, brand._session)
+
+        saved = json.loads(session_file.read_text())
+        assert saved["accounts"]["did:plc:brand1"]["session_string"] == refreshed
+        assert saved["accounts"]["did:plc:brand1"]["profile"]["handle"] == "brand1.bsky.social"
+        assert saved["profile"]["did"] == "did:plc:test123"
+
+    def test_account_login_is_added(self, session_file):
+        """A password login of a new account is saved next to the others"""
+        from atproto_client import models
+        from atproto_client.models.utils import get_or_create
+
+        client = Mock()
+        client.export_session_string.return_value = create_session_string(3600, handle="brand2.bsky.social", did="did:plc:brand2")
+        client._session.did = "did:plc:brand2"
+        profile = get_or_create({"did": "did:plc:brand2", "handle": "brand2.bsky.social"}, models.AppBskyActorDefs.ProfileViewDetailed)
+        with patch.object(SskySession, 'at_login_internal', return_value=SskySession.Session(client, profile)):
+            with SskySession.using(SskySession.account_context("brand2.bsky.social")):
+                SskySession(handle="brand2.bsky.social", password="password")
+
+        saved = json.loads(session_file.read_text())
+        assert sorted(saved["accounts"]) == ["did:plc:brand1", "did:plc:brand2"]
+        assert saved["accounts"]["did:plc:brand2"]["profile"]["handle"] == "brand2.bsky.social"
+        assert saved["profile"]["did"] == "did:plc:test123"
+
+    def test_unknown_account(self, session_file, monkeypatch):
+        """SSKY_USER of another account is not used for an account without a saved session"""
+        import atproto_client
+
+        monkeypatch.setenv('SSKY_USER', 'test.bsky.social:password')
+        with patch.object(SskySession, 'at_login_internal') as mock_login:
+            with SskySession.using(SskySession.account_context("unknown.bsky.social")):
+                with pytest.raises(atproto_client.exceptions.LoginRequiredError, match="ssky --account unknown.bsky.social login"):
+                    SskySession()
+        mock_login.assert_not_called()
+
+    def test_account_option(self, session_file):
+        """--account runs the subcommand as the account"""
+        from ssky.main import invoke, parse
+
+        def profile(actor=None, **kwargs):
+            assert "account" not in kwargs
+            return SskySession().profile().did
+
+        subcommand, args = parse(["--account", "brand1.bsky.social", "profile", "myself"])
+        with patch('ssky.profile.profile', side_effect=profile):
+            assert invoke(subcommand, args) == "did:plc:brand1"
+        assert SskySession.status() == SskySession.Status.NOT_LOGGED_IN
+
+
+class TestExportedSession:
+    """Starting from a session exported to SSKY_SESSION"""
+
+    @pytest.fixture(autouse=True)
+    def session_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "session"
+        monkeypatch.setattr(SskySession, 'config_path', str(path))
+        monkeypatch.delenv('SSKY_USER', raising=False)
+        monkeypatch.delenv('SSKY_SESSION', raising=False)
+        SskySession.clear()
+        yield path
+        SskySession.clear()
+
+    def export(self, session_file):
+        session_file.write_text(json.dumps({"session_string": create_session_string(3600), "profile": TestSessionRestore.PROFILE}))
+        SskySession()
+        exported = SskySession.export_internal()
+        SskySession.clear()
+        session_file.unlink()
+        return exported
+
+    def test_exported_session_is_restored_offline(self, session_file, monkeypatch):
+        from ssky.ssky_session import SskyClient
+
+        monkeypatch.setenv('SSKY_SESSION', self.export(session_file))
+        with patch.object(SskyClient, 'login') as mock_login, patch.object(SskyClient, '_invoke') as mock_invoke:
+            session = SskySession()
+
+        mock_login.assert_not_called()
+        mock_invoke.assert_not_called()
+        assert session.profile().did == "did:plc:test123"
+
+    def test_bare_session_string(self, session_file, monkeypatch):
+        session_string = create_session_string(3600)
+        monkeypatch.setenv('SSKY_SESSION', session_string)
+        with patch.object(SskySession, 'at_login_internal', return_value=SskySession.Session(Mock(), Mock())) as mock_login, \
+             patch.object(SskySession, 'persist_internal'):
+            SskySession()
+        mock_login.assert_called_once_with(session_string=session_string)
+
+    def test_session_file_comes_first(self, session_file, monkeypatch):
+        """Tokens refreshed into a mounted session file win over the exported ones"""
+        monkeypatch.setenv('SSKY_SESSION', self.export(session_file))
+        newer = create_session_string(7200)
+        session_file.write_text(json.dumps({"session_string": newer, "profile": TestSessionRestore.PROFILE}))
+
+        SskySession()
+        assert SskySession.session.client.export_session_string() == newer
+
+    def test_invalid_value_is_ignored(self, session_file, monkeypatch):
+        import atproto_client
+
+        monkeypatch.setenv('SSKY_SESSION', 'not-a-session')
+        assert SskySession.exported_session_internal() is None
+        with pytest.raises(atproto_client.exceptions.LoginRequiredError):
+            SskySession()
+
+    def test_session_export_command(self, session_file):
+        from ssky.main import invoke, parse
+
+        session_file.write_text(json.dumps({"session_string": create_session_string(3600), "profile": TestSessionRestore.PROFILE}))
+        subcommand, args = parse(["session", "export"])
+        result = invoke(subcommand, args)
+        assert str(result) == result.data["session"] == SskySession.export_internal()
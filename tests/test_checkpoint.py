@@ -0,0 +1,155 @@
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ssky.checkpoint import CheckpointStore, feed_mark, read_since
+from ssky.get import get
+from ssky.main import parse
+from ssky.result import InvalidOptionCombinationError
+from ssky.ssky_session import SessionFileLock, SskySession
+from ssky.util import write_json_atomically
+
+
+def feed_item(n, reason=None):
+    post = SimpleNamespace(uri=f"at://did:plc:author/app.bsky.feed.post/{n}", cid=f"cid{n}", indexed_at=(datetime(2026, 1, 1) + timedelta(minutes=n)).strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+    return SimpleNamespace(post=post, reason=reason, reply=None)
+
+
+class FakeFeed:
+    """Feed of the posts 1..count, newest first, served in pages"""
+
+    def __init__(self, count, pinned=None):
+        self.items = [feed_item(n) for n in range(count, 0, -1)]
+        if pinned is not None:
+            self.items.insert(0, feed_item(pinned, SimpleNamespace(py_type="app.bsky.feed.defs#reasonPin")))
+        self.requests = []
+
+    def __call__(self, limit, cursor):
+        self.requests.append(limit)
+        start = int(cursor or 0)
+        end = start + limit
+        return SimpleNamespace(feed=self.items[start:end], cursor=str(end) if end < len(self.items) else None)
+
+
+def numbers(items):
+    return [int(item.post.uri.rsplit("/", 1)[1]) for item in items]
+
+
+class TestReadSince:
+
+    def test_first_read(self):
+        fetch = FakeFeed(30)
+        items, newest, gap = read_since(fetch, None, 10)
+        assert numbers(items) == list(range(30, 20, -1))
+        assert newest == feed_mark(fetch.items[0])
+        assert not gap
+
+    def test_steady_state_reads_one_small_page(self):
+        fetch = FakeFeed(30)
+        items, newest, gap = read_since(fetch, feed_mark(fetch.items[3]), 100)
+        assert numbers(items) == [30, 29, 28]
+        assert newest == feed_mark(fetch.items[0])
+        assert fetch.requests == [20]
+        assert not gap
+
+    def test_nothing_new_keeps_mark(self):
+        fetch = FakeFeed(30)
+        mark = feed_mark(fetch.items[0])
+        assert read_since(fetch, mark, 100) == ([], mark, False)
+
+    def test_follows_pages_back_to_mark(self):
+        fetch = FakeFeed(200)
+        items, _, gap = read_since(fetch, feed_mark(fetch.items[150]), 1000)
+        assert len(items) == 150
+        assert fetch.requests == [20, 100, 100]
+        assert not gap
+
+    def test_gap(self):
+        fetch = FakeFeed(200)
+        items, newest, gap = read_since(fetch, feed_mark(fetch.items[150]), 50)
+        assert numbers(items) == list(range(200, 150, -1))
+        assert newest == feed_mark(fetch.items[0])
+        assert gap
+
+    def test_deleted_mark_stops_at_older_post(self):
+        fetch = FakeFeed(30)
+        mark = {"indexed_at": "2026-01-01T00:25:30.000Z", "uri": "at://did:plc:author/app.bsky.feed.post/deleted"}
+        items, _, _ = read_since(fetch, mark, 100)
+        assert numbers(items) == [30, 29, 28, 27, 26]
+
+    def test_repost_is_marked_by_repost(self):
+        repost = SimpleNamespace(uri="at://did:plc:reposter/app.bsky.feed.repost/1", indexed_at="2026-01-02T00:00:00.000Z", cid="rcid", by=None)
+        assert feed_mark(feed_item(1, repost)) == {"indexed_at": "2026-01-02T00:00:00.000Z", "uri": "at://did:plc:reposter/app.bsky.feed.repost/1"}
+
+    def test_pinned_post_does_not_move_mark(self):
+        fetch = FakeFeed(30, pinned=5)
+        items, newest, _ = read_since(fetch, feed_mark(fetch.items[2]), 100)
+        assert numbers(items) == [30]
+        assert newest == feed_mark(fetch.items[1])
+
+
+class TestCheckpointStore:
+
+    def test_round_trip(self, tmp_path):
+        store = CheckpointStore(str(tmp_path / "checkpoints"), SessionFileLock())
+        key = CheckpointStore.key("default", "timeline:did:plc:me")
+        assert store.get(key) is None
+        store.put(key, {"indexed_at": "2026-01-01T00:00:00.000Z", "uri": "at://x"})
+        assert store.get(key) == {"indexed_at": "2026-01-01T00:00:00.000Z", "uri": "at://x", "updated_at": store.read()[key]["updated_at"]}
+        assert store.get(CheckpointStore.key("other", "timeline:did:plc:me")) is None
+
+    def test_broken_file_is_empty(self, tmp_path):
+        path = tmp_path / "checkpoints"
+        path.write_text("not json")
+        assert CheckpointStore(str(path), SessionFileLock()).get("default:timeline:did:plc:me") is None
+
+    def test_write_is_private_and_cleans_up(self, tmp_path):
+        path = tmp_path / "checkpoints"
+        write_json_atomically(str(path), {"a": 1})
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        with pytest.raises(TypeError):
+            write_json_atomically(str(path), {"a": object()})
+        assert path.read_text() == '{"a": 1}'
+        assert os.listdir(tmp_path) == ["checkpoints"]
+
+
+class TestGetSinceLast:
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        client = MagicMock()
+        client.me.did = "did:plc:me"
+        feed = FakeFeed(30)
+        client.get_timeline.side_effect = lambda limit, cursor: feed(limit, cursor)
+        with patch("ssky.get.ssky_client", return_value=client), \
+                patch.object(SskySession, "config_path", str(tmp_path / "ssky")):
+            yield client, feed
+
+    def test_second_run_gets_new_posts_only(self, client):
+        client, feed = client
+        assert len(get(since_last="default", limit=10)) == 10
+        feed.items[0:0] = [feed_item(32), feed_item(31)]
+        assert [item.post.uri for item in get(since_last="default").items] == [feed.items[0].post.uri, feed.items[1].post.uri]
+        assert len(get(since_last="default")) == 0
+        assert len(get(since_last="other", limit=5)) == 5
+
+    def test_gap_is_warned(self, client):
+        client, feed = client
+        get(since_last="default", limit=1)
+        feed.items[0:0] = [feed_item(n) for n in range(40, 31, -1)]
+        result = get(since_last="default", limit=5)
+        assert len(result) == 5
+        assert result.warnings == ["More than 5 new posts since the last read; older new posts were skipped"]
+
+    def test_cursor_is_refused(self, client):
+        with pytest.raises(InvalidOptionCombinationError):
+            get(since_last="default", cursor="10")
+
+    def test_option(self):
+        assert parse(["get", "--since-last"])[1].since_last == "default"
+        assert parse(["get", "--since-last=alerts"])[1].since_last == "alerts"
+        assert parse(["get", "alice.bsky.social", "--since-last", "alerts"])[1].since_last == "alerts"
+        assert parse(["get"])[1].since_last is None
@@ -0,0 +1,132 @@
+import argparse
+import io
+import os
+import socket
+import threading
+import pytest
+from unittest.mock import patch
+
+from ssky import daemon
+from ssky.result import SuccessResult
+
+
+class TestDaemon:
+
+    @pytest.fixture
+    def socket_path(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "ssky.sock")
+        monkeypatch.setenv("SSKY_DAEMON_SOCKET", path)
+        monkeypatch.delenv("SSKY_NO_DAEMON", raising=False)
+        return path
+
+    @pytest.fixture
+    def running(self, socket_path):
+        server = daemon.listen(socket_path)
+        thread = threading.Thread(target=daemon.serve, args=(server,), daemon=True)
+        thread.start()
+        yield socket_path
+        server.shutdown(socket.SHUT_RDWR)
+        server.close()
+        thread.join(5)
+
+    def forward(self, argv):
+        from ssky.main import parse
+        subcommand, args = parse(argv)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with patch("sys.stdout", stdout), patch("sys.stderr", stderr):
+            status = daemon.forward(argv, subcommand, args)
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_no_daemon(self, socket_path):
+        assert self.forward(["profile", "myself"])[0] is None
+
+    def test_command_runs_in_daemon(self, running):
+        calls = []
+
+        def profile(actor=None, **kwargs):
+            calls.append((actor, os.getpid()))
+            return SuccessResult(message=f"profile of {actor}")
+
+        with patch("ssky.profile.profile", side_effect=profile):
+            status, stdout, stderr = self.forward(["profile", "myself"])
+
+        assert (status, stdout, stderr) == (0, "profile of myself\n", "")
+        assert calls == [("myself", os.getpid())]
+
+    def test_errors_and_exit_status(self, running):
+        from ssky.result import SessionError
+
+        with patch("ssky.profile.profile", side_effect=SessionError()):
+            status, stdout, stderr = self.forward(["profile", "myself"])
+        assert status == 1
+        assert stdout == ""
+        assert "No valid session available" in stderr
+
+    def test_stdin_of_post_is_forwarded(self, running):
+        received = []
+
+        def post(message=None, **kwargs):
+            received.append(message)
+            return SuccessResult(message="posted")
+
+        with patch("ssky.post.post", side_effect=post), \
+             patch("sys.stdin", io.StringIO("from stdin")):
+            status, stdout, _ = self.forward(["post"])
+
+        assert status == 0
+        assert received == ["from stdin"]
+
+    def test_deadline_is_forwarded(self, running):
+        from ssky import deadline
+        remaining = []
+
+        def profile(actor=None, **kwargs):
+            remaining.append(deadline.remaining())
+            return SuccessResult(message="profile")
+
+        with patch("ssky.profile.profile", side_effect=profile):
+            status, _, _ = self.forward(["--deadline", "5", "profile", "myself"])
+
+        assert status == 0
+        assert 0 < remaining[0] <= 5
+
+    def test_busy_daemon_is_bounded_by_deadline(self, socket_path):
+        """A client waiting behind another command gives up at its deadline"""
+        busy = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        busy.bind(socket_path)
+        busy.listen()
+        try:
+            with patch("ssky.daemon.DEADLINE_GRACE", 0):
+                status, _, stderr = self.forward(["--deadline", "0.2", "profile", "myself"])
+        finally:
+            busy.close()
+        assert status == 1
+        assert "Deadline of 0.2s exceeded while waiting for ssky daemon" in stderr
+
+    def test_client_environment(self, monkeypatch):
+        monkeypatch.setenv("SSKY_RETRY_ATTEMPTS", "5")
+        monkeypatch.setenv("SSKY_DEADLINE", "30")
+        with daemon.client_environment({"SSKY_RETRY_ATTEMPTS": "1"}):
+            assert os.environ["SSKY_RETRY_ATTEMPTS"] == "1"
+            assert "SSKY_DEADLINE" not in os.environ
+        assert os.environ["SSKY_RETRY_ATTEMPTS"] == "5"
+        assert os.environ["SSKY_DEADLINE"] == "30"
+        with daemon.client_environment(None):
+            assert os.environ["SSKY_RETRY_ATTEMPTS"] == "5"
+
+    def test_local_subcommands(self, running):
+        assert daemon.forward(["login"], "login", argparse.Namespace()) is None
+        assert daemon.forward(["daemon"], "daemon", argparse.Namespace()) is None
+
+    def test_stale_socket_is_replaced(self, socket_path):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+
+        server = daemon.listen(socket_path)
+        try:
+            assert oct(os.stat(socket_path).st_mode & 0o777) == oct(0o600)
+            with pytest.raises(OSError, match="already running"):
+                daemon.listen(socket_path)
+        finally:
+            server.close()
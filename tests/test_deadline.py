@@ -0,0 +1,109 @@
+import json
+import os
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from atproto_client.client.base import InvokeType
+
+from ssky import deadline
+from ssky.deadline import deadline_scope
+from ssky.main import parse
+from ssky.post import post
+from ssky.result import DeadlineExceededError, ErrorResult
+from ssky.ssky_session import SskyClient
+from ssky_mcp.server import get_tool_deadline
+
+
+class TestDeadline:
+
+    def test_no_deadline(self):
+        assert deadline.remaining() is None
+        assert deadline.timeout(10) == 10
+        deadline.check("doing nothing")
+
+    def test_scope(self):
+        with deadline_scope(5):
+            assert 4 < deadline.remaining() <= 5
+            assert deadline.timeout(10) <= 5
+            assert deadline.timeout(2) == 2
+        assert deadline.remaining() is None
+
+    def test_earlier_deadline_wins(self):
+        with deadline_scope(1):
+            with deadline_scope(30):
+                assert deadline.remaining() <= 1
+            with deadline_scope(0.5):
+                assert deadline.remaining() <= 0.5
+
+    def test_expired(self):
+        with deadline_scope(0.01):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceededError) as excinfo:
+                deadline.check("fetching the timeline")
+        assert excinfo.value.http_code == 408
+        assert excinfo.value.message == "Deadline of 0.01s exceeded while fetching the timeline"
+
+    def test_sleep_past_deadline_fails_right_away(self):
+        with deadline_scope(1), patch("ssky.deadline.time.sleep") as sleep:
+            with pytest.raises(DeadlineExceededError):
+                deadline.sleep(2, "waiting")
+            deadline.sleep(0.5, "waiting")
+        sleep.assert_called_once_with(0.5)
+
+    def test_partial_result(self):
+        error = DeadlineExceededError(10, "waiting").with_partial_result("posted 1 post(s)", {"posted": ["at://x::cid"]})
+        assert error.message == "Deadline of 10s exceeded while waiting; partial result: posted 1 post(s)"
+        assert json.loads(ErrorResult(error.message, error.http_code, error.data).to_json())["data"] == {"posted": ["at://x::cid"]}
+
+
+class TestDeadlineOption:
+
+    def test_option(self):
+        _, args = parse(["--deadline", "2.5", "get"])
+        assert args.deadline == 2.5
+
+    def test_environment(self):
+        with patch.dict(os.environ, {"SSKY_DEADLINE": "7"}):
+            _, args = parse(["get"])
+        assert args.deadline == 7
+
+    def test_mcp_tool_deadline(self):
+        assert get_tool_deadline(30) == 29
+        assert get_tool_deadline(1) == 0.5
+
+
+class TestDeadlineRequests:
+
+    def test_xrpc_timeout_is_cut_short(self):
+        client = SskyClient()
+        with patch("atproto_client.Client._invoke", return_value="response") as invoke, \
+                patch.dict(os.environ, {"SSKY_RATE_LIMIT_MAX_WAIT": "0"}):
+            client.paced_invoke(InvokeType.QUERY, url="https://bsky.social/xrpc/app.bsky.feed.getTimeline")
+            assert "timeout" not in invoke.call_args.kwargs
+            with deadline_scope(2):
+                client.paced_invoke(InvokeType.QUERY, url="https://bsky.social/xrpc/app.bsky.feed.getTimeline")
+        assert invoke.call_args.kwargs["timeout"] <= 2
+
+    def test_post_reports_partial_result(self):
+        """A post that doesn't become available before the deadline is reported as posted"""
+        client = Mock()
+        client.send_post.return_value = Mock(uri="at://did:plc:test/app.bsky.feed.post/3abc", cid="bafycid")
+        client.get_posts.return_value = Mock(posts=[])
+        with patch("ssky.post.ssky_client", return_value=client), deadline_scope(0.5):
+            with pytest.raises(DeadlineExceededError) as excinfo:
+                post(message="Hello")
+        assert "partial result: posted 1 post(s)" in excinfo.value.message
+        assert excinfo.value.data == {"posted": ["at://did:plc:test/app.bsky.feed.post/3abc::bafycid"]}
+
+    def test_post_wait_is_capped_without_deadline(self):
+        """A post that never becomes available doesn't hang a command without a deadline"""
+        client = Mock()
+        client.send_post.return_value = Mock(uri="at://did:plc:test/app.bsky.feed.post/3abc", cid="bafycid")
+        client.get_posts.return_value = Mock(posts=[])
+        with patch("ssky.post.ssky_client", return_value=client), patch("ssky.post.POST_WAIT_TIMEOUT", 0.5):
+            with pytest.raises(DeadlineExceededError) as excinfo:
+                post(message="Hello")
+        assert "give --deadline to wait longer" in excinfo.value.message
+        assert excinfo.value.data == {"posted": ["at://did:plc:test/app.bsky.feed.post/3abc::bafycid"]}
@@ -1,11 +1,17 @@
+import io
+import json
 import os
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
+import atproto_client
+
 from ssky.get import get
 from ssky.post_data_list import PostDataList
+from ssky.post_data_stream import PostDataStream
 from ssky.ssky_session import SskySession
-from ssky.result import ErrorResult
+from ssky.result import ErrorResult, SskyError
 from tests.common import create_mock_ssky_session, has_credentials
 
 @pytest.fixture
@@ -177,4 +183,213 @@ class TestGetSequential:
             mock_ssky_client.return_value = mock_client
 
             result = get(param=None, format='json')
-            assert isinstance(result, PostDataList), "Get with JSON format should return PostDataList"
\ No newline at end of file
+            assert isinstance(result, PostDataList), "Get with JSON format should return PostDataList"
+
+def feed_post(i):
+    """Post view with the fields the printers read"""
+    return SimpleNamespace(
+        uri=f"at://did:plc:test/app.bsky.feed.post/{i:08d}",
+        cid=f"cid{i}",
+        author=SimpleNamespace(did="did:plc:test", handle="test.bsky.social", display_name="Test", avatar=None),
+        record=SimpleNamespace(text=f"Post {i}", created_at="2026-01-01T00:00:00Z", facets=None, reply=None),
+        reply_count=0, repost_count=0, like_count=0, indexed_at=None
+    )
+
+
+def paged_client(total, fail_at=None):
+    """Client whose timeline holds `total` posts, answering with cursors like the AppView"""
+    client = Mock()
+
+    def get_timeline(limit=None, cursor=None):
+        offset = int(cursor or 0)
+        if fail_at is not None and offset >= fail_at:
+            raise atproto_client.exceptions.NetworkError()
+        end = min(offset + min(limit or 50, 100), total)
+        return SimpleNamespace(
+            feed=[SimpleNamespace(post=feed_post(i), reply=None) for i in range(offset, end)],
+            cursor=str(end) if end < total else None
+        )
+
+    client.get_timeline.side_effect = get_timeline
+    return client
+
+
+class TestGetPaging:
+    """Feeds longer than one page are read page by page"""
+
+    def test_one_page_is_one_request(self):
+        client = paged_client(1000)
+        with patch('ssky.get.ssky_client', return_value=client):
+            result = get(limit=100)
+        assert isinstance(result, PostDataList)
+        assert len(result) == 100
+        assert client.get_timeline.call_count == 1
+
+    def test_follows_cursor_up_to_limit(self, capsys):
+        client = paged_client(1000)
+        with patch('ssky.get.ssky_client', return_value=client):
+            result = get(limit=250)
+            assert isinstance(result, PostDataStream)
+            result.print(format='id')
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 250
+        assert lines[-1] == "at://did:plc:test/app.bsky.feed.post/00000249::cid249"
+        assert [c.kwargs['limit'] for c in client.get_timeline.call_args_list] == [100, 100, 50]
+        assert [c.kwargs['cursor'] for c in client.get_timeline.call_args_list] == [None, '100', '200']
+        assert result.cursor == '250'
+
+    def test_stops_at_end_of_feed(self):
+        client = paged_client(150)
+        with patch('ssky.get.ssky_client', return_value=client):
+            result = get(limit=1000)
+            assert len(result.to_post_data_list()) == 150
+        assert result.cursor is None
+        assert client.get_timeline.call_count == 2
+
+    def test_simple_json_is_streamed(self, capsys):
+        client = paged_client(1000)
+        with patch('ssky.get.ssky_client', return_value=client):
+            get(limit=150, cursor='10').print(format='simple_json')
+        response = json.loads(capsys.readouterr().out)
+        assert response['status'] == 'ok'
+        assert len(response['data']) == 150
+        assert response['data'][0]['uri'].endswith('/00000010')
+        assert response['cursor'] == '160'
+
+    def test_failing_page_ends_response_with_error(self, capsys):
+        client = paged_client(1000, fail_at=200)
+        with patch('ssky.get.ssky_client', return_value=client):
+            result = get(limit=300)
+            with pytest.raises(SskyError) as excinfo:
+                result.print(format='simple_json')
+        assert excinfo.value.printed
+        response = json.loads(capsys.readouterr().out)
+        assert response['status'] == 'error'
+        assert len(response['data']) == 200
+        assert response['cursor'] == '200'
+
+    def test_duplicates_across_pages_are_skipped(self, capsys):
+        """A post repeated on a later page (e.g. reposted again) is printed once"""
+        client = paged_client(1000)
+        timeline = client.get_timeline.side_effect
+
+        def get_timeline(limit=None, cursor=None):
+            response = timeline(limit=limit, cursor=cursor)
+            if cursor == '100':
+                response.feed[0] = SimpleNamespace(post=feed_post(5), reply=None)
+            return response
+
+        client.get_timeline.side_effect = get_timeline
+        with patch('ssky.get.ssky_client', return_value=client):
+            get(limit=200).print(format='id')
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 200
+        assert len(set(lines)) == 200
+
+    def test_overlapping_pages_still_fill_the_limit(self, capsys):
+        """Posts repeated from the previous page don't count toward --limit"""
+        client = paged_client(1000)
+        timeline = client.get_timeline.side_effect
+
+        def get_timeline(limit=None, cursor=None):
+            # The second page starts with the last 10 posts of the first, as after new posts shift the feed
+            return timeline(limit=limit, cursor='90' if cursor == '100' else cursor)
+
+        client.get_timeline.side_effect = get_timeline
+        with patch('ssky.get.ssky_client', return_value=client):
+            get(limit=250).print(format='id')
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 250
+        assert len(set(lines)) == 250
+        assert lines[-1] == "at://did:plc:test/app.bsky.feed.post/00000249::cid249"
+        assert [c.kwargs['limit'] for c in client.get_timeline.call_args_list] == [100, 100, 60]
+
+    def test_page_of_duplicates_ends_the_stream(self):
+        client = paged_client(1000)
+        timeline = client.get_timeline.side_effect
+        client.get_timeline.side_effect = lambda limit=None, cursor=None: timeline(limit=limit, cursor='0' if cursor else None)
+        with patch('ssky.get.ssky_client', return_value=client):
+            assert len(get(limit=250).to_post_data_list()) == 100
+        assert client.get_timeline.call_count == 2
+
+    def test_retries_of_later_pages_are_reported(self, capsys):
+        from ssky.retry import note_retry
+        client = paged_client(1000)
+        timeline = client.get_timeline.side_effect
+
+        def get_timeline(limit=None, cursor=None):
+            if cursor:
+                note_retry("app.bsky.feed.getTimeline", atproto_client.exceptions.NetworkError(), 0, 3, 0.1)
+            return timeline(limit=limit, cursor=cursor)
+
+        client.get_timeline.side_effect = get_timeline
+        with patch('ssky.get.ssky_client', return_value=client):
+            get(limit=200).print(format='simple_json')
+        response = json.loads(capsys.readouterr().out)
+        assert "Retried 1 request(s)" in response['message']
+
+    def test_materialized_for_mcp(self):
+        client = paged_client(1000)
+        with patch('ssky.get.ssky_client', return_value=client):
+            response = json.loads(get(limit=120).to_json())
+        assert len(response['data']) == 120
+        assert response['cursor'] == '120'
+
+
+def posts_client(existing):
+    """Client whose getPosts returns the posts of the existing numbers, recording the requests"""
+    client = Mock()
+    client.get_posts.side_effect = lambda uris: SimpleNamespace(posts=[feed_post(int(uri.rsplit('/', 1)[1])) for uri in uris if int(uri.rsplit('/', 1)[1]) in existing])
+    return client
+
+
+def post_uri(i):
+    return f"at://did:plc:test/app.bsky.feed.post/{i:08d}"
+
+
+class TestGetStdin:
+
+    def test_posts_come_in_input_order(self):
+        client = posts_client(set(range(100)))
+        lines = [post_uri(i) for i in range(60, 0, -1)]
+        with patch('ssky.get.ssky_client', return_value=client):
+            result = get(target='-', uris=lines)
+        assert [item.post.uri for item in result.items] == lines
+        assert result.warnings == []
+        assert sorted(len(call.args[0]) for call in client.get_posts.call_args_list) == [10, 25, 25]
+
+    def test_not_found_is_reported(self):
+        client = posts_client({1, 3})
+        lines = [post_uri(1), "", post_uri(2), f"{post_uri(3)}::othercid", "not a uri", post_uri(1)]
+        with patch('ssky.get.ssky_client', return_value=client):
+            result = get(target='-', uris=lines)
+        assert [item.post.uri for item in result.items] == [post_uri(1)]
+        assert result.warnings == [
+            f"2 post(s) not found: {post_uri(2)}, {post_uri(3)}::othercid",
+            "Skipped 1 line(s) that are not post URIs"
+        ]
+        client.get_posts.assert_called_once_with([post_uri(1), post_uri(2), post_uri(3)])
+
+    def test_failed_batch_is_a_warning(self):
+        client = posts_client(set(range(100)))
+        good = client.get_posts.side_effect
+
+        def get_posts(uris):
+            if post_uri(30) in uris:
+                raise atproto_client.exceptions.NetworkError()
+            return good(uris)
+
+        client.get_posts.side_effect = get_posts
+        with patch('ssky.get.ssky_client', return_value=client):
+            result = get(target='-', uris=[post_uri(i) for i in range(50)])
+        assert len(result) == 25
+        assert len(result.warnings) == 1
+        assert result.warnings[0].startswith(f"Could not get 25 post(s) from {post_uri(25)}")
+
+    def test_uris_are_read_from_stdin(self):
+        from ssky.main import execute, parse
+        subcommand, args = parse(["get", "-"])
+        with patch('sys.stdin', new=io.StringIO(f"{post_uri(1)}\n{post_uri(2)}\n")), \
+                patch('ssky.main.invoke', return_value=None) as invoke:
+            execute(subcommand, args)
+        assert invoke.call_args.args[1].uris == [post_uri(1), post_uri(2)]
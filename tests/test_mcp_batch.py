@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from ssky.ssky_session import SskySession
+from ssky_mcp.batch import BatchScheduler, chunked
+import ssky_mcp.server as server
+from tests.test_mcp_server import create_mock_post
+
+
+OK_RESPONSE = '{"status":"ok","http_code":200,"message":"Success","timestamp":"t","data":[]}'
+RATE_LIMITED_RESPONSE = '{"status":"error","http_code":429,"message":"Rate Limit Exceeded","timestamp":"t","data":null}'
+
+
+def create_mock_profile(handle):
+    profile = Mock()
+    profile.did = f"did:plc:{handle.split('.')[0]}"
+    profile.handle = handle
+    profile.display_name = handle
+    profile.description = ""
+    profile.avatar = None
+    profile.banner = None
+    profile.followers_count = 0
+    profile.follows_count = 0
+    profile.posts_count = 0
+    profile.created_at = "2024-01-01T00:00:00.000Z"
+    profile.indexed_at = "2024-01-01T00:00:01.000Z"
+    return profile
+
+
+def run_batch(operations):
+    return json.loads(asyncio.run(server.ssky_batch.fn(operations=operations)))
+
+
+@pytest.fixture(autouse=True)
+def in_process_mode():
+    original_subprocess = server.use_subprocess
+    original_scheduler = server.batch_scheduler
+    server.use_subprocess = False
+    server.batch_scheduler = BatchScheduler(concurrency=5, rate=0)
+    yield
+    server.use_subprocess = original_subprocess
+    server.batch_scheduler = original_scheduler
+    server.response_cache.clear()
+    SskySession.clear()
+
+
+@pytest.fixture
+def mock_client():
+    """Mock atproto client resolving every requested actor except *.missing handles"""
+    client = Mock()
+
+    def get_profiles(actors):
+        response = Mock()
+        response.profiles = [create_mock_profile(actor) for actor in actors if not actor.endswith('.missing')]
+        return response
+
+    client.get_profiles.side_effect = get_profiles
+    with patch('ssky.ssky_session.ssky_client', return_value=client), \
+         patch('ssky.ssky_session.expand_actor', side_effect=lambda name: name):
+        yield client
+
+
+class TestChunked:
+
+    def test_chunks_of_25(self):
+        chunks = chunked(list(range(60)))
+        assert [len(chunk) for chunk in chunks] == [25, 25, 10]
+
+
+class TestBatchTool:
+
+    def test_profiles_are_collapsed(self, mock_client):
+        """Profile lookups become one getProfiles call per 25 handles, with results in order"""
+        handles = [f"user{i}.bsky.social" for i in range(30)]
+        response = run_batch([{"tool": "ssky_profile", "args": {"handle": handle}} for handle in handles])
+
+        assert response["status"] == "ok"
+        assert mock_client.get_profiles.call_count == 2
+        assert [item["result"]["data"][0]["handle"] for item in response["data"]] == handles
+
+    def test_missing_profile(self, mock_client):
+        """A profile missing from the bulk response is reported as 404 for that operation only"""
+        response = run_batch([
+            {"tool": "profile", "args": {"handle": "alice.bsky.social"}},
+            {"tool": "profile", "args": {"handle": "bob.missing"}}
+        ])
+
+        assert response["data"][0]["result"]["status"] == "ok"
+        assert response["data"][1]["result"]["http_code"] == 404
+        assert response["message"] == "Completed 2 operation(s), 1 failed"
+
+    def test_posts_are_collapsed(self, mock_client):
+        """Single-post lookups become one getPosts call"""
+        uris = [f"at://did:plc:test123/app.bsky.feed.post/post{i}" for i in range(3)]
+        posts_response = Mock()
+        posts_response.posts = [create_mock_post(uri=uri) for uri in uris]
+        mock_client.get_posts.return_value = posts_response
+
+        response = run_batch([{"tool": "ssky_get", "args": {"param": uri}} for uri in reversed(uris)])
+
+        mock_client.get_posts.assert_called_once()
+        assert [item["result"]["data"][0]["uri"] for item in response["data"]] == list(reversed(uris))
+
+    def test_mixed_operations(self, mock_client):
+        """Operations that can't be collapsed run as individual tool calls"""
+        with patch('ssky_mcp.server.run_in_process', return_value=OK_RESPONSE) as mock_run:
+            response = run_batch([
+                {"tool": "ssky_user", "args": {"query": "alice"}},
+                {"tool": "ssky_profile", "args": {"handle": "alice.bsky.social"}},
+                {"tool": "ssky_repost", "args": {"post_uri": "at://did:plc:test123/app.bsky.feed.post/test123"}}
+            ])
+
+        assert [item["tool"] for item in response["data"]] == ["ssky_user", "ssky_profile", "ssky_repost"]
+        assert all(item["result"]["status"] == "ok" for item in response["data"])
+        assert mock_run.call_count == 2
+        mock_client.get_profiles.assert_called_once()
+
+    def test_invalid_operations(self):
+        """Unknown tools and bad arguments fail only their own operation"""
+        response = run_batch([
+            {"tool": "ssky_batch", "args": {}},
+            {"tool": "ssky_user", "args": {"no_such_argument": 1}},
+            "not an operation"
+        ])
+
+        assert [item["result"]["http_code"] for item in response["data"]] == [400, 400, 400]
+
+    def test_too_many_operations(self):
+        response = run_batch([{"tool": "ssky_stats"}] * (server.MAX_BATCH_OPERATIONS + 1))
+
+        assert response["status"] == "error"
+        assert response["http_code"] == 400
+
+
+class TestBatchScheduler:
+
+    def test_results_in_order(self):
+        async def job(i):
+            await asyncio.sleep(0.01 * (5 - i))
+            return str(i)
+
+        results = asyncio.run(BatchScheduler(rate=0).run([lambda i=i: job(i) for i in range(5)]))
+        assert results == ['0', '1', '2', '3', '4']
+
+    def test_rate_limited_job_is_retried(self):
+        """A 429 pauses the batch and the job is retried"""
+        responses = [RATE_LIMITED_RESPONSE, OK_RESPONSE]
+
+        async def job():
+            return responses.pop(0)
+
+        started = time.monotonic()
+        results = asyncio.run(BatchScheduler(rate=0, backoff=0.1).run([job]))
+
+        assert results == [OK_RESPONSE]
+        assert time.monotonic() - started >= 0.1
+
+    def test_gives_up_after_max_retries(self):
+        calls = []
+
+        async def job():
+            calls.append(1)
+            return RATE_LIMITED_RESPONSE
+
+        results = asyncio.run(BatchScheduler(rate=0, max_retries=2, backoff=0.01).run([job]))
+
+        assert results == [RATE_LIMITED_RESPONSE]
+        assert len(calls) == 3
+
+    def test_job_not_retryable_returns_429(self):
+        """A job that may not run again returns its 429 after one attempt"""
+        calls = []
+
+        async def job():
+            calls.append(1)
+            return RATE_LIMITED_RESPONSE
+
+        results = asyncio.run(BatchScheduler(rate=0, backoff=0.01).run([job], retryable=[False]))
+
+        assert results == [RATE_LIMITED_RESPONSE]
+        assert len(calls) == 1
+
+    def test_writes_are_not_repeated_in_batch(self):
+        """A rate-limited write in ssky_batch runs once, a rate-limited read again"""
+        calls = []
+
+        async def post(**kwargs):
+            calls.append('post')
+            return RATE_LIMITED_RESPONSE
+
+        async def search(**kwargs):
+            calls.append('search')
+            return RATE_LIMITED_RESPONSE if calls.count('search') == 1 else OK_RESPONSE
+
+        server.batch_scheduler = BatchScheduler(rate=0, backoff=0.01)
+        with patch.dict(server.BATCH_TOOLS, {'ssky_post': post, 'ssky_search': search}):
+            response = run_batch([{"tool": "post", "args": {"message": "Hello"}}, {"tool": "search", "args": {"q": "x"}}])
+
+        assert [item["result"] for item in response["data"]] == [json.loads(RATE_LIMITED_RESPONSE), json.loads(OK_RESPONSE)]
+        assert calls.count('post') == 1
+        assert calls.count('search') == 2
+
+    def test_pacing(self):
+        """Job starts are spaced by the configured rate"""
+        async def job():
+            return OK_RESPONSE
+
+        started = time.monotonic()
+        asyncio.run(BatchScheduler(rate=20).run([job] * 5))
+
+        assert time.monotonic() - started >= 0.15
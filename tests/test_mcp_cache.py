@@ -0,0 +1,175 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from ssky_mcp.cache import ResponseCache
+
+
+OK_RESPONSE = '{"status":"ok","http_code":200,"message":"Success","timestamp":"t","data":[]}'
+ERROR_RESPONSE = '{"status":"error","http_code":500,"message":"Failure","timestamp":"t","data":null}'
+
+
+class CountingFetch:
+    """Fetch function counting upstream calls"""
+
+    def __init__(self, response=OK_RESPONSE, delay=0):
+        self.response = response
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.response
+
+
+def get(cache, tool_name, params, fetch):
+    return asyncio.run(cache.get_or_fetch(tool_name, params, fetch))
+
+
+class TestResponseCache:
+
+    def test_hit_after_miss(self):
+        """A second identical call is served from the cache"""
+        cache = ResponseCache()
+        fetch = CountingFetch()
+
+        assert get(cache, 'ssky_profile', {'handle': 'alice'}, fetch) == OK_RESPONSE
+        assert get(cache, 'ssky_profile', {'handle': 'alice'}, fetch) == OK_RESPONSE
+
+        assert fetch.calls == 1
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_key_normalization(self):
+        """Empty arguments and surrounding whitespace do not split cache entries"""
+        cache = ResponseCache()
+        fetch = CountingFetch()
+
+        get(cache, 'ssky_profile', {'handle': 'alice', 'output_dir': ''}, fetch)
+        get(cache, 'ssky_profile', {'handle': ' alice ', 'output_dir': None}, fetch)
+
+        assert fetch.calls == 1
+
+    def test_concurrent_calls_coalesce(self):
+        """Concurrent identical calls share one upstream fetch"""
+        cache = ResponseCache()
+        fetch = CountingFetch(delay=0.1)
+
+        async def call_in_parallel():
+            return await asyncio.gather(*[cache.get_or_fetch('ssky_get', {'param': 'alice'}, fetch) for _ in range(5)])
+
+        results = asyncio.run(call_in_parallel())
+
+        assert results == [OK_RESPONSE] * 5
+        assert fetch.calls == 1
+        assert cache.stats()['coalesced'] == 4
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        """Calls coalesced onto a cancelled call fetch for themselves"""
+        cache = ResponseCache()
+        fetch = CountingFetch(delay=0.1)
+
+        async def cancel_leader():
+            leader = asyncio.create_task(cache.get_or_fetch('ssky_get', {'param': 'alice'}, fetch))
+            await asyncio.sleep(0.01)
+            follower = asyncio.create_task(cache.get_or_fetch('ssky_get', {'param': 'alice'}, fetch))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower, leader.cancelled()
+
+        assert asyncio.run(cancel_leader()) == (OK_RESPONSE, True)
+        assert fetch.calls == 2
+
+    def test_errors_are_not_cached(self):
+        """Error responses are fetched again on the next call"""
+        cache = ResponseCache()
+        fetch = CountingFetch(response=ERROR_RESPONSE)
+
+        get(cache, 'ssky_profile', {'handle': 'alice'}, fetch)
+        get(cache, 'ssky_profile', {'handle': 'alice'}, fetch)
+
+        assert fetch.calls == 2
+
+    def test_ttl_expiry(self):
+        """Responses older than the tool's TTL are fetched again"""
+        cache = ResponseCache(ttls={'ssky_get': 30})
+        fetch = CountingFetch()
+
+        with patch('ssky_mcp.cache.time.monotonic', return_value=1000):
+            get(cache, 'ssky_get', {'param': 'alice'}, fetch)
+        with patch('ssky_mcp.cache.time.monotonic', return_value=1029):
+            get(cache, 'ssky_get', {'param': 'alice'}, fetch)
+        assert fetch.calls == 1
+
+        with patch('ssky_mcp.cache.time.monotonic', return_value=1031):
+            get(cache, 'ssky_get', {'param': 'alice'}, fetch)
+        assert fetch.calls == 2
+
+    def test_uncached_tool(self):
+        """Tools without a TTL always reach upstream"""
+        cache = ResponseCache()
+        fetch = CountingFetch()
+
+        get(cache, 'ssky_post', {'message': 'hello'}, fetch)
+        get(cache, 'ssky_post', {'message': 'hello'}, fetch)
+
+        assert fetch.calls == 2
+
+    def test_invalidation_after_write(self):
+        """Writes drop the cached reads they may have changed"""
+        cache = ResponseCache()
+        fetch = CountingFetch()
+
+        get(cache, 'ssky_get', {'param': 'alice'}, fetch)
+        get(cache, 'ssky_profile', {'handle': 'alice'}, fetch)
+        cache.invalidate_after('ssky_post')
+        get(cache, 'ssky_get', {'param': 'alice'}, fetch)
+        get(cache, 'ssky_profile', {'handle': 'alice'}, fetch)
+
+        assert fetch.calls == 3
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted when the cache is full"""
+        cache = ResponseCache(max_entries=2)
+        fetch = CountingFetch()
+
+        get(cache, 'ssky_profile', {'handle': 'alice'}, fetch)
+        get(cache, 'ssky_profile', {'handle': 'bob'}, fetch)
+        get(cache, 'ssky_profile', {'handle': 'alice'}, fetch)
+        get(cache, 'ssky_profile', {'handle': 'carol'}, fetch)
+        assert cache.stats()['evictions'] == 1
+
+        get(cache, 'ssky_profile', {'handle': 'alice'}, fetch)
+        assert fetch.calls == 3
+        get(cache, 'ssky_profile', {'handle': 'bob'}, fetch)
+        assert fetch.calls == 4
+
+    def test_disabled(self):
+        """A cache size of 0 disables caching"""
+        with patch.dict('os.environ', {'SSKY_MCP_CACHE_SIZE': '0'}):
+            cache = ResponseCache.from_environment()
+        fetch = CountingFetch()
+
+        get(cache, 'ssky_profile', {'handle': 'alice'}, fetch)
+        get(cache, 'ssky_profile', {'handle': 'alice'}, fetch)
+
+        assert fetch.calls == 2
+
+
+class TestServerCache:
+
+    def test_read_tool_uses_cache(self):
+        """Repeated read tool calls reach ssky once"""
+        import ssky_mcp.server as server
+
+        server.response_cache.clear()
+        with patch('ssky_mcp.server.run_in_process', return_value=OK_RESPONSE) as mock_run:
+            asyncio.run(server.ssky_profile.fn(handle='alice'))
+            asyncio.run(server.ssky_profile.fn(handle='alice'))
+            stats = json.loads(asyncio.run(server.ssky_stats.fn()))
+        server.response_cache.clear()
+
+        assert mock_run.call_count == 1
+        assert stats['data']['cache']['hits'] == 1
@@ -0,0 +1,180 @@
+import asyncio
+import base64
+import json
+import pytest
+from unittest.mock import Mock, patch
+
+from ssky.ssky_session import PooledRequest, SskySession
+from ssky_mcp.clients import ClientContexts, client_key, parse_credentials
+import ssky_mcp.server as server
+from tests.test_mcp_server import create_mock_post
+
+
+def login_as(handle=None, password=None, session_string=None):
+    """at_login_internal replacement whose client returns a timeline of the logged-in user"""
+    mock_client = Mock()
+    feed_post = Mock()
+    feed_post.post = create_mock_post(uri=f"at://did:plc:test123/app.bsky.feed.post/{handle}")
+    mock_client.get_timeline.return_value = Mock(feed=[feed_post], cursor=None)
+    profile = Mock()
+    profile.did = f"did:plc:{handle}"
+    return SskySession.Session(mock_client, profile)
+
+
+class TestParseCredentials:
+
+    def test_ssky_user_header(self):
+        assert parse_credentials({"x-ssky-user": "alice.test:app-password"}) == "alice.test:app-password"
+
+    def test_basic_authorization(self):
+        value = base64.b64encode(b"alice.test:app-password").decode()
+        assert parse_credentials({"authorization": f"Basic {value}"}) == "alice.test:app-password"
+
+    def test_missing_or_invalid(self):
+        assert parse_credentials({}) is None
+        assert parse_credentials({"x-ssky-user": "no-password"}) is None
+        assert parse_credentials({"authorization": "Bearer token"}) is None
+        assert parse_credentials({"authorization": "Basic not-base64!"}) is None
+
+
+class TestClientContexts:
+
+    def test_one_context_per_credentials(self):
+        contexts = ClientContexts()
+        alice = contexts.get("alice.test:one")
+
+        assert contexts.get("alice.test:one") is alice
+        assert contexts.get("alice.test:two") is not alice
+        assert (alice.handle, alice.password) == ("alice.test", "one")
+
+    def test_least_recently_used_is_dropped(self):
+        contexts = ClientContexts(max_clients=2)
+        alice = contexts.get("alice.test:pw")
+        contexts.get("bob.test:pw")
+        contexts.get("alice.test:pw")
+        contexts.get("carol.test:pw")
+
+        assert len(contexts) == 2
+        assert contexts.get("alice.test:pw") is alice
+
+    def test_subprocess_environment(self, monkeypatch):
+        monkeypatch.setenv("SSKY_SESSION", "server-session")
+        contexts = ClientContexts()
+        env = contexts.subprocess_environment("alice.test:pw")
+
+        assert env["SSKY_USER"] == "alice.test:pw"
+        assert "SSKY_SESSION" not in env
+        assert env["SSKY_CONFIG_PATH"].endswith(client_key("alice.test:pw"))
+        assert contexts.subprocess_environment("bob.test:pw")["SSKY_CONFIG_PATH"] != env["SSKY_CONFIG_PATH"]
+
+
+class TestClientSession:
+
+    @pytest.fixture(autouse=True)
+    def clear_session(self):
+        SskySession.clear()
+        yield
+        SskySession.clear()
+
+    def test_client_login_is_isolated(self):
+        """A client context logs in with its own credentials and leaves the process session alone"""
+        context = SskySession.Context(handle="alice.test", password="pw")
+        with patch.object(SskySession, 'at_login_internal', side_effect=login_as) as mock_login, \
+             patch.object(SskySession, 'config_path', '/nonexistent/ssky-session'):
+            with SskySession.using(context):
+                assert SskySession().profile().did == "did:plc:alice.test"
+                assert SskySession.current_context() is context
+
+        mock_login.assert_called_once_with(handle="alice.test", password="pw")
+        assert context.session is not None
+        assert SskySession.status() == SskySession.Status.NOT_LOGGED_IN
+
+    def test_client_session_is_not_persisted(self):
+        context = SskySession.Context(handle="alice.test", password="pw")
+        context.session = login_as("alice.test")
+        with SskySession.using(context), patch('builtins.open') as mock_open:
+            SskySession.persist_internal()
+        mock_open.assert_not_called()
+
+    def test_failed_client_login(self):
+        import atproto_client
+
+        context = SskySession.Context(handle="alice.test", password="wrong")
+        error = atproto_client.exceptions.UnauthorizedError(Mock())
+        with patch.object(SskySession, 'at_login_internal', side_effect=error):
+            with SskySession.using(context):
+                SskySession()
+                assert SskySession.status() == SskySession.Status.LOGIN_FAILED
+                assert SskySession.login_error is error
+
+    def test_pooled_requests_share_connections(self):
+        first, second = PooledRequest(), PooledRequest()
+        first.add_additional_header('Authorization', 'Bearer first')
+
+        assert first._client is second._client
+        assert 'Authorization' not in second.get_headers()
+
+
+class TestServerClients:
+
+    @pytest.fixture(autouse=True)
+    def in_process_mode(self):
+        original = server.use_subprocess
+        server.use_subprocess = False
+        yield
+        server.use_subprocess = original
+        server.response_cache.clear()
+        SskySession.clear()
+
+    def get_timeline_as(self, credentials):
+        with patch.object(server, 'get_client_credentials', return_value=credentials):
+            return json.loads(asyncio.run(server.ssky_get.fn(limit=1)))
+
+    def test_timelines_are_per_client(self):
+        """Each client reads its own timeline, and the cache doesn't mix them up"""
+        with patch.object(SskySession, 'at_login_internal', side_effect=login_as):
+            alice = self.get_timeline_as("alice.test:pw")
+            bob = self.get_timeline_as("bob.test:pw")
+            alice_again = self.get_timeline_as("alice.test:pw")
+
+        assert alice["data"][0]["uri"].endswith("/alice.test")
+        assert bob["data"][0]["uri"].endswith("/bob.test")
+        assert alice_again == alice
+        assert SskySession.status() == SskySession.Status.NOT_LOGGED_IN
+
+    def test_public_reads_are_shared(self):
+        """Identical public reads of different clients share one cache entry"""
+        calls = []
+
+        async def fetch(tool_name, args, default_output=None):
+            calls.append(tool_name)
+            return '{"status":"ok","data":[]}'
+
+        async def read_as(credentials, author=""):
+            with patch.object(server, 'get_client_credentials', return_value=credentials), \
+                 patch.object(server, 'run_ssky', new=fetch):
+                return await server.ssky_search.fn(query="bluesky", author=author)
+
+        async def scenario():
+            await read_as("alice.test:pw")
+            await read_as("bob.test:pw")
+
+        asyncio.run(scenario())
+        assert len(calls) == 1
+
+        async def own_posts():
+            await read_as("alice.test:pw", author="myself")
+            await read_as("bob.test:pw", author="myself")
+            await read_as("alice.test:pw", author="myself")
+
+        # Searches of the client's own posts are cached per client
+        asyncio.run(own_posts())
+        assert len(calls) == 3
+
+    def test_viewer_specific_reads(self):
+        assert server.is_viewer_specific('ssky_get', {"param": ""})
+        assert server.is_viewer_specific('ssky_profile', {"handle": "myself"})
+        assert not server.is_viewer_specific('ssky_get', {"param": "alice.test"})
+        assert server.is_viewer_specific('ssky_search', {"query": "bluesky", "author": " myself "})
+        assert not server.is_viewer_specific('ssky_search', {"query": "myself"})
+        assert not server.is_viewer_specific('ssky_search', {"query": "bluesky", "author": "alice.test"})
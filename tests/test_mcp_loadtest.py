@@ -0,0 +1,64 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+
+from ssky.ssky_session import SskySession
+from ssky_mcp.loadtest.__main__ import Recorder, percentile
+from ssky_mcp.loadtest.fake_xrpc import HANDLE, PASSWORD, FakeXrpcServer
+import ssky_mcp.server as server
+
+
+@pytest.fixture
+def fake_xrpc(tmp_path):
+    """Log in to a local fake XRPC server instead of bsky.social"""
+    with FakeXrpcServer() as fake, \
+         patch.object(SskySession, 'pds_url', fake.url), \
+         patch.object(SskySession, 'config_path', str(tmp_path / 'session')), \
+         patch.dict('os.environ', {'SSKY_USER': f"{HANDLE}:{PASSWORD}"}):
+        original = server.use_subprocess
+        server.use_subprocess = False
+        SskySession.clear()
+        yield fake
+        SskySession.clear()
+        server.use_subprocess = original
+        server.response_cache.clear()
+
+
+class TestFakeXrpc:
+
+    def test_tools_against_fake_server(self, fake_xrpc):
+        """In-process tools log in to and read from the fake server"""
+        timeline = json.loads(asyncio.run(server.ssky_get.fn(limit=3)))
+        search = json.loads(asyncio.run(server.ssky_search.fn(query="hello", limit=2)))
+        profile = json.loads(asyncio.run(server.ssky_profile.fn(handle="alice.test")))
+
+        assert timeline["status"] == "ok" and len(timeline["data"]) == 3
+        assert search["status"] == "ok" and search["cursor"] is not None
+        assert profile["data"][0]["handle"] == "alice.test"
+        assert fake_xrpc.requests["com.atproto.server.createSession"] == 1
+
+    def test_injected_errors(self, fake_xrpc):
+        fake_xrpc.error_rate = 1.0
+        response = json.loads(asyncio.run(server.ssky_search.fn(query="hello")))
+        assert response["status"] == "error"
+
+
+class TestRecorder:
+
+    def test_percentile(self):
+        values = [i / 100 for i in range(1, 101)]
+        assert percentile(values, 0.50) == 0.50
+        assert percentile(values, 0.95) == 0.95
+        assert percentile(values, 0.99) == 0.99
+        assert percentile([], 0.5) == 0.0
+
+    def test_summary(self):
+        recorder = Recorder()
+        recorder.record("ssky_get", 0.1, True)
+        recorder.record("ssky_get", 0.3, False)
+        summary = recorder.summary(elapsed=2.0)
+
+        assert summary["tools"]["ssky_get"]["calls"] == 2
+        assert summary["tools"]["ssky_get"]["error_rate"] == 0.5
+        assert summary["total"]["throughput"] == 1.0
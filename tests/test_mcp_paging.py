@@ -0,0 +1,105 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock, patch
+
+from ssky.ssky_session import SskySession
+from ssky.util import create_success_response
+from ssky_mcp.paging import decode_cursor, encode_cursor, page_response
+import ssky_mcp.server as server
+from tests.test_mcp_server import create_mock_post
+
+
+def create_page(count, cursor=None):
+    data = [{"uri": f"at://did:plc:test123/app.bsky.feed.post/post{i}", "text": "x" * 100, "like_count": i} for i in range(count)]
+    return create_success_response(data=data, message=f"Posted {count} item(s)", cursor=cursor)
+
+
+class TestCursorToken:
+
+    def test_round_trip(self):
+        token = encode_cursor("ssky_search", "upstream-cursor", 5)
+        assert decode_cursor("ssky_search", token) == ("upstream-cursor", 5)
+
+    def test_other_tool_is_rejected(self):
+        token = encode_cursor("ssky_search", "upstream-cursor")
+        with pytest.raises(ValueError):
+            decode_cursor("ssky_user", token)
+
+    def test_garbage_is_rejected(self):
+        with pytest.raises(ValueError):
+            decode_cursor("ssky_search", "not a cursor")
+
+
+class TestPageResponse:
+
+    def test_next_cursor(self):
+        """The upstream cursor is returned as an opaque token"""
+        response = json.loads(page_response("ssky_search", create_page(3, cursor="next")))
+
+        assert len(response["data"]) == 3
+        assert decode_cursor("ssky_search", response["cursor"]) == ("next", 0)
+
+    def test_last_page(self):
+        response = json.loads(page_response("ssky_search", create_page(3)))
+        assert response["cursor"] is None
+
+    def test_fields(self):
+        response = json.loads(page_response("ssky_search", create_page(2), fields=["uri", "like_count"]))
+        assert response["data"][1] == {"uri": "at://did:plc:test123/app.bsky.feed.post/post1", "like_count": 1}
+
+    def test_max_bytes(self):
+        """Items that don't fit are left for the next page, which resumes on the same upstream page"""
+        response_text = page_response("ssky_search", create_page(10, cursor="next"), cursor="current", max_bytes=800)
+        response = json.loads(response_text)
+
+        assert len(response_text.encode('utf-8')) <= 800
+        kept = len(response["data"])
+        assert 0 < kept < 10
+        assert decode_cursor("ssky_search", response["cursor"]) == ("current", kept)
+
+        rest = json.loads(page_response("ssky_search", create_page(10, cursor="next"), cursor="current", skip=kept))
+        assert rest["data"][0]["like_count"] == kept
+        assert decode_cursor("ssky_search", rest["cursor"]) == ("next", 0)
+
+    def test_max_bytes_keeps_one_item(self):
+        response = json.loads(page_response("ssky_search", create_page(3), max_bytes=10))
+        assert len(response["data"]) == 1
+
+    def test_errors_pass_through(self):
+        error = '{"status":"error","http_code":401,"message":"No valid session available","timestamp":"t","data":null}'
+        assert page_response("ssky_search", error) == error
+
+
+class TestPagedTools:
+
+    @pytest.fixture(autouse=True)
+    def in_process_mode(self):
+        original = server.use_subprocess
+        server.use_subprocess = False
+        yield
+        server.use_subprocess = original
+        server.response_cache.clear()
+        SskySession.clear()
+
+    def test_get_pages_through_timeline(self):
+        """The cursor returned by ssky_get fetches the next timeline page"""
+        mock_client = Mock()
+        pages = {}
+        for cursor, next_cursor in [(None, "page2"), ("page2", None)]:
+            feed_post = Mock()
+            feed_post.post = create_mock_post(uri=f"at://did:plc:test123/app.bsky.feed.post/{cursor}")
+            pages[cursor] = Mock(feed=[feed_post], cursor=next_cursor)
+        mock_client.get_timeline.side_effect = lambda limit, cursor: pages[cursor]
+
+        with patch('ssky.get.ssky_client', return_value=mock_client):
+            first = json.loads(asyncio.run(server.ssky_get.fn(limit=1)))
+            second = json.loads(asyncio.run(server.ssky_get.fn(limit=1, cursor=first["cursor"])))
+
+        assert first["data"][0]["uri"].endswith("/None")
+        assert second["data"][0]["uri"].endswith("/page2")
+        assert second["cursor"] is None
+
+    def test_invalid_cursor(self):
+        response = json.loads(asyncio.run(server.ssky_search.fn(query="test", cursor="bogus")))
+        assert response["http_code"] == 400
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import subprocess
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from ssky.ssky_session import SskySession
+import ssky_mcp.server as server
+
+
+def create_mock_post(uri="at://did:plc:test123/app.bsky.feed.post/test123", text="Test post content"):
+    """Create a mock PostView usable by PostDataList.get_simple_data()"""
+    mock_post = Mock()
+    mock_post.uri = uri
+    mock_post.cid = "testcid123"
+    mock_post.author = Mock()
+    mock_post.author.did = "did:plc:test123"
+    mock_post.author.handle = "test.bsky.social"
+    mock_post.author.display_name = "Test User"
+    mock_post.author.avatar = None
+    mock_post.record = Mock()
+    mock_post.record.text = text
+    mock_post.record.created_at = "2024-01-01T00:00:00.000Z"
+    mock_post.record.facets = None
+    mock_post.reply_count = 1
+    mock_post.repost_count = 2
+    mock_post.like_count = 3
+    mock_post.indexed_at = "2024-01-01T00:00:01.000Z"
+    return mock_post
+
+
+def run_tool(tool_name, args, default_output=None):
+    """Run an MCP tool call to completion"""
+    return asyncio.run(server.run_ssky(tool_name, args, default_output=default_output))
+
+
+@pytest.fixture
+def mock_timeline_client():
+    """Mock atproto client returning a one-post timeline"""
+    mock_client = Mock()
+    mock_feed_post = Mock()
+    mock_feed_post.post = create_mock_post()
+    mock_timeline_response = Mock()
+    mock_timeline_response.feed = [mock_feed_post]
+    mock_timeline_response.cursor = None
+    mock_client.get_timeline.return_value = mock_timeline_response
+    return mock_client
+
+
+@pytest.fixture(autouse=True)
+def in_process_mode():
+    """Run every test with the default in-process execution path"""
+    original = server.use_subprocess
+    server.use_subprocess = False
+    yield
+    server.use_subprocess = original
+    server.response_cache.clear()
+    SskySession.clear()
+
+
+class TestMcpServerInProcess:
+
+    def test_get_returns_simple_json_shape(self, mock_timeline_client):
+        """In-process ssky_get returns the same response shape as `ssky get --simple-json`"""
+        with patch('ssky.get.ssky_client', return_value=mock_timeline_client):
+            response = json.loads(run_tool("ssky_get", ["get", "-N", "1", "--simple-json"]))
+
+        assert response["status"] == "ok"
+        assert response["http_code"] == 200
+        assert len(response["data"]) == 1
+        assert response["data"][0]["uri"] == "at://did:plc:test123/app.bsky.feed.post/test123"
+        assert response["data"][0]["text"] == "Test post content"
+        mock_timeline_client.get_timeline.assert_called_once()
+
+    def test_ssky_error_becomes_error_response(self):
+        """SskyError raised by a subcommand is returned as an error response with its HTTP code"""
+        with patch('ssky.get.ssky_client', return_value=None):
+            response = json.loads(run_tool("ssky_get", ["get", "--simple-json"]))
+
+        assert response["status"] == "error"
+        assert response["http_code"] == 401
+
+    def test_invalid_arguments(self):
+        """Arguments argparse rejects produce a 400 instead of exiting the server"""
+        response = json.loads(run_tool("ssky_get", ["get", "-N", "not-a-number", "--simple-json"]))
+
+        assert response["status"] == "error"
+        assert response["http_code"] == 400
+
+    def test_failed_login_is_cleared(self):
+        """A failed login does not stick to the long-running server process"""
+        def fail_login(**kwargs):
+            SskySession.session = SskySession.login_failed
+            return None
+
+        with patch('ssky.get.ssky_client', side_effect=fail_login):
+            run_tool("ssky_get", ["get", "--simple-json"])
+
+        assert SskySession.status() == SskySession.Status.NOT_LOGGED_IN
+
+
+class TestMcpServerSubprocess:
+
+    def create_mock_process(self, returncode, stdout):
+        mock_process = Mock()
+        mock_process.returncode = returncode
+
+        async def communicate():
+            return stdout.encode(), b''
+
+        mock_process.communicate = communicate
+        return mock_process
+
+    def test_subprocess_flag_spawns_cli(self):
+        """With the subprocess flag set, tools spawn the ssky CLI without inheriting stdin"""
+        server.use_subprocess = True
+        mock_process = self.create_mock_process(0, '{"status":"ok","http_code":200,"message":"Success","timestamp":"t","data":[]}')
+
+        with patch('ssky_mcp.server.asyncio.create_subprocess_exec', return_value=mock_process) as mock_exec:
+            response = json.loads(run_tool("ssky_get", ["get", "--simple-json"]))
+
+        assert response["status"] == "ok"
+        command = mock_exec.call_args[0]
+        assert command[:2] == ("ssky", "get")
+        assert mock_exec.call_args[1]["stdin"] == subprocess.DEVNULL
+
+    def test_subprocess_json_error_on_stdout(self):
+        """JSON errors printed to stdout by the CLI are passed through unchanged"""
+        server.use_subprocess = True
+        error_json = '{"status":"error","http_code":404,"message":"Post not found","timestamp":"t","data":null}'
+        mock_process = self.create_mock_process(1, error_json)
+
+        with patch('ssky_mcp.server.asyncio.create_subprocess_exec', return_value=mock_process):
+            response = json.loads(run_tool("ssky_repost", ["repost", "at://x", "--simple-json"]))
+
+        assert response["http_code"] == 404
+
+
+class TestMcpServerConcurrency:
+
+    def test_parallel_calls_overlap(self):
+        """Parallel tool calls run concurrently instead of one after another"""
+        def slow_call(tool_name, args, default_output=None):
+            time.sleep(0.2)
+            return '{"status":"ok"}'
+
+        async def call_in_parallel():
+            return await asyncio.gather(*[server.run_ssky("ssky_profile", ["profile", f"user{i}"]) for i in range(10)])
+
+        with patch('ssky_mcp.server.run_in_process', side_effect=slow_call):
+            started = time.monotonic()
+            results = asyncio.run(call_in_parallel())
+            elapsed = time.monotonic() - started
+
+        assert len(results) == 10
+        assert elapsed < 1.0, f"10 parallel calls took {elapsed:.2f}s"
+
+    def test_timeout(self):
+        """Calls exceeding the tool timeout return a 408 error"""
+        def slow_call(tool_name, args, default_output=None):
+            time.sleep(0.5)
+            return '{"status":"ok"}'
+
+        with patch('ssky_mcp.server.run_in_process', side_effect=slow_call), \
+             patch.dict('os.environ', {'SSKY_MCP_TIMEOUT_SSKY_PROFILE': '0.1'}):
+            response = json.loads(run_tool("ssky_profile", ["profile", "user"]))
+
+        assert response["status"] == "error"
+        assert response["http_code"] == 408
+
+
+def create_jwt(exp):
+    """Create an unsigned JWT whose payload carries the given expiry"""
+    import base64
+
+    def encode(data):
+        return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+    header = encode(json.dumps({"alg": "none"}).encode())
+    payload = encode(json.dumps({"exp": int(exp), "sub": "did:plc:test123"}).encode())
+    return '.'.join([header, payload, encode(b'signature')])
+
+
+class TestSessionKeeper:
+
+    def login_with_token_expiring_in(self, seconds):
+        import time
+        from atproto_client.client.session import Session
+
+        mock_client = Mock()
+        mock_client._session = Session("test.bsky.social", "did:plc:test123", create_jwt(time.time() + seconds), "refresh")
+        mock_client._refresh_lock = threading.Lock()
+        SskySession.session = SskySession.Session(mock_client, Mock())
+        return mock_client
+
+    def test_refreshes_token_close_to_expiry(self):
+        """The keeper refreshes and persists tokens that are about to expire"""
+        from ssky_mcp.session_keeper import SessionKeeper
+
+        mock_client = self.login_with_token_expiring_in(60)
+        with patch.object(SskySession, 'persist_internal') as mock_persist:
+            assert SessionKeeper(margin=300).check() is True
+
+        mock_client._refresh_and_set_session.assert_called_once()
+        mock_persist.assert_called_once()
+
+    def test_keeps_fresh_token(self):
+        """Tokens with plenty of time left are not refreshed"""
+        from ssky_mcp.session_keeper import SessionKeeper
+
+        mock_client = self.login_with_token_expiring_in(3600)
+        assert SessionKeeper(margin=300).check() is False
+        mock_client._refresh_and_set_session.assert_not_called()
+
+    def test_no_session(self):
+        """Nothing happens before anyone has logged in"""
+        from ssky_mcp.session_keeper import SessionKeeper
+
+        SskySession.clear()
+        assert SessionKeeper().check() is False
+
+
+class TestMetrics:
+
+    def test_tool_calls_are_measured(self, mock_timeline_client):
+        """Calls, errors by HTTP code and phase latencies show up in ssky_stats"""
+        from ssky_mcp.metrics import Metrics
+
+        with patch.object(server, 'metrics', Metrics()):
+            with patch('ssky.get.ssky_client', return_value=mock_timeline_client), \
+                 patch.object(SskySession, 'status', return_value=SskySession.Status.LOGGED_IN):
+                run_tool("ssky_get", ["get", "-N", "1", "--simple-json"])
+            run_tool("ssky_get", ["get", "-N", "not-a-number", "--simple-json"])
+            stats = json.loads(asyncio.run(server.ssky_stats.fn()))["data"]["tools"]
+
+        assert stats["ssky_get"]["calls"] == 2
+        assert stats["ssky_get"]["errors"] == {"400": 1}
+        assert stats["ssky_get"]["latency"]["total"]["count"] == 2
+        assert stats["ssky_get"]["latency"]["xrpc"]["count"] == 1
+        assert stats["ssky_get"]["latency"]["serialize"]["count"] == 1
+
+    def test_openmetrics_format(self):
+        from ssky_mcp.cache import ResponseCache
+        from ssky_mcp.metrics import Metrics
+
+        metrics = Metrics()
+        metrics.observe("ssky_get", "xrpc", 0.2)
+        metrics.record_call("ssky_get", '{"status":"error","http_code":401}')
+        text = metrics.to_openmetrics(cache_stats=ResponseCache().stats(), login_counts={"restore": 3, "password": 0})
+
+        assert 'ssky_mcp_tool_calls_total{tool="ssky_get"} 1' in text
+        assert 'ssky_mcp_tool_errors_total{tool="ssky_get",http_code="401"} 1' in text
+        assert 'ssky_mcp_phase_duration_seconds_bucket{tool="ssky_get",phase="xrpc",le="0.1"} 0' in text
+        assert 'ssky_mcp_phase_duration_seconds_bucket{tool="ssky_get",phase="xrpc",le="0.25"} 1' in text
+        assert 'ssky_mcp_cache_hits_total 0' in text
+        assert 'ssky_mcp_logins_total{kind="restore"} 3' in text
+        assert text.endswith('# EOF\n')
+
+    def test_metrics_endpoint(self):
+        """The /metrics route serves OpenMetrics text"""
+        from starlette.testclient import TestClient
+
+        with TestClient(server.mcp.http_app()) as client:
+            response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/openmetrics-text")
+        assert response.text.endswith('# EOF\n')
+
+
+class TestStartup:
+
+    def test_heavy_packages_are_deferred(self):
+        """Importing the server and listing its tools does not import atproto or bs4"""
+        from ssky_mcp.import_report import collect
+
+        result = collect()
+
+        assert result["tools"] == len(asyncio.run(server.mcp.get_tools()))
+        for package in ("atproto", "atproto_client", "bs4", "ssky.ssky_session"):
+            assert package not in result["modules"]
+
+    def test_deferred_packages_imported_by_dependencies(self):
+        """Deferred packages count only when ssky imported them"""
+        from ssky_mcp.import_report import loaded_deferred_packages
+
+        result = {
+            "modules": ["requests", "bs4", "fastmcp", "ssky_mcp.server", "ssky.post"],
+            "imports": [
+                ("requests", 10, "fastmcp", "ssky_mcp.server"),
+                ("fastmcp", 30, "fastmcp", "ssky_mcp.server"),
+                ("bs4", 10, "ssky.post", "ssky_mcp.server"),
+                ("ssky.post", 20, "ssky.post", "ssky_mcp.server"),
+                ("ssky_mcp.server", 75, "ssky_mcp.server", "ssky_mcp.server")
+            ]
+        }
+
+        assert loaded_deferred_packages(result) == ["bs4"]
+
+    def test_parse_importtime(self):
+        from ssky_mcp.import_report import parse_importtime
+
+        stderr = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:        10 |         10 |     requests",
+            "import time:        20 |         30 |   fastmcp",
+            "import time:         5 |          5 |   ssky.util",
+            "import time:        40 |         75 | ssky_mcp.server"
+        ])
+
+        assert parse_importtime(stderr) == [
+            ("requests", 10, "fastmcp", "ssky_mcp.server"),
+            ("fastmcp", 30, "fastmcp", "ssky_mcp.server"),
+            ("ssky.util", 5, "ssky.util", "ssky_mcp.server"),
+            ("ssky_mcp.server", 75, "ssky_mcp.server", "ssky_mcp.server")
+        ]
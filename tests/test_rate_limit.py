@@ -0,0 +1,127 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from atproto_client.request import Response
+
+from ssky.rate_limit import RateLimitGovernor, parse_rate_limit
+from ssky.result import AtProtocolSskyError
+from ssky.ssky_session import SessionFileLock, SskyClient, SskySession
+
+
+def rate_limit_headers(limit, remaining, reset, window=300):
+    return {
+        "ratelimit-limit": str(limit),
+        "ratelimit-remaining": str(remaining),
+        "ratelimit-reset": str(reset),
+        "ratelimit-policy": f"{limit};w={window}"
+    }
+
+
+class Clock:
+    """Stand-in for time.time and time.sleep"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with patch("ssky.rate_limit.time.time", clock.time), patch("ssky.rate_limit.time.sleep", clock.sleep):
+        yield clock
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "session.ratelimit")
+
+
+class TestParseRateLimit:
+
+    def test_headers(self):
+        limit = parse_rate_limit(rate_limit_headers(3000, 2999, 1300), now=1000)
+        assert limit == {"policy": "3000;w=300", "limit": 3000, "window": 300, "remaining": 2999, "reset": 1300.0}
+
+    def test_window_from_reset_without_policy(self):
+        headers = rate_limit_headers(10, 5, 1060)
+        del headers["ratelimit-policy"]
+        assert parse_rate_limit(headers, now=1000)["window"] == 60
+
+    def test_no_headers(self):
+        assert parse_rate_limit({"content-type": "application/json"}) is None
+        assert parse_rate_limit({"ratelimit-limit": "x", "ratelimit-remaining": "1", "ratelimit-reset": "1"}) is None
+
+
+class TestRateLimitGovernor:
+
+    def test_unknown_endpoint_is_not_paced(self, clock, state_path):
+        governor = RateLimitGovernor(state_path, SessionFileLock())
+        assert governor.acquire("app.bsky.feed.getTimeline") == 0.0
+        assert not os.path.exists(state_path)
+
+    def test_paces_at_refill_rate_when_bucket_is_low(self, clock, state_path):
+        """With one request left of 10 per 10 seconds, the next ones come one per second"""
+        governor = RateLimitGovernor(state_path, SessionFileLock())
+        governor.record("app.bsky.feed.getTimeline", 200, rate_limit_headers(10, 1, clock.now + 10, window=10))
+        assert governor.acquire("app.bsky.feed.getTimeline") == 0.0
+        assert governor.acquire("app.bsky.feed.getTimeline") == pytest.approx(1.0)
+        assert governor.acquire("app.bsky.feed.getTimeline") == pytest.approx(1.0)
+        assert clock.slept == [pytest.approx(1.0), pytest.approx(1.0)]
+
+    def test_exhausted_limit_waits_until_reset(self, clock, state_path):
+        governor = RateLimitGovernor(state_path, SessionFileLock())
+        governor.record("app.bsky.feed.getTimeline", 429, rate_limit_headers(3000, 0, clock.now + 30))
+        assert governor.acquire("app.bsky.feed.getTimeline") == pytest.approx(30.1)
+
+    def test_long_wait_raises_rate_limit_error(self, clock, state_path):
+        governor = RateLimitGovernor(state_path, SessionFileLock(), max_wait=5)
+        governor.record("app.bsky.feed.getTimeline", 200, rate_limit_headers(3000, 0, clock.now + 120))
+        with pytest.raises(Exception) as excinfo:
+            governor.acquire("app.bsky.feed.getTimeline")
+        assert clock.slept == []
+        assert AtProtocolSskyError(excinfo.value).http_code == 429
+
+    def test_endpoints_are_paced_by_their_own_policy(self, clock, state_path):
+        governor = RateLimitGovernor(state_path, SessionFileLock(), max_wait=5)
+        governor.record("com.atproto.server.createSession", 429, rate_limit_headers(30, 0, clock.now + 300))
+        governor.record("app.bsky.feed.getTimeline", 200, rate_limit_headers(3000, 2999, clock.now + 300))
+        assert governor.acquire("app.bsky.feed.getTimeline") == 0.0
+        with pytest.raises(Exception):
+            governor.acquire("com.atproto.server.createSession")
+
+    def test_state_is_shared_through_the_file(self, clock, state_path):
+        """A governor of another process sees the budget this one recorded"""
+        RateLimitGovernor(state_path, SessionFileLock()).record(
+            "app.bsky.feed.getTimeline", 200, rate_limit_headers(10, 0, clock.now + 10, window=10))
+        assert RateLimitGovernor(state_path, SessionFileLock()).acquire("app.bsky.feed.getTimeline") == pytest.approx(11.0)
+
+
+class TestPacedInvoke:
+
+    def test_records_response_headers(self, clock, state_path):
+        governor = RateLimitGovernor(state_path, SessionFileLock(), max_wait=120)
+        response = Response(success=True, status_code=200, content={}, headers=rate_limit_headers(3000, 0, clock.now + 60))
+        client = SskyClient()
+        with patch.object(SskySession, "rate_limit_governor", return_value=governor), \
+                patch("atproto_client.Client._invoke", return_value=response) as invoke:
+            assert client.paced_invoke(MagicMock(), url="https://bsky.social/xrpc/app.bsky.feed.getTimeline") is response
+        invoke.assert_called_once()
+        assert governor.acquire("app.bsky.feed.getTimeline") == pytest.approx(60.1)
+
+    def test_pacing_off(self):
+        with patch.dict(os.environ, {"SSKY_RATE_LIMIT_MAX_WAIT": "0"}):
+            assert SskySession.rate_limit_governor() is None
+        with patch.dict(os.environ, {"SSKY_RATE_LIMIT_MAX_WAIT": "15"}):
+            governor = SskySession.rate_limit_governor()
+        assert governor.max_wait == 15
+        assert governor.path == SskySession.config_path + ".ratelimit"
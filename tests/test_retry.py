@@ -0,0 +1,158 @@
+import logging
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import atproto_client
+from atproto_client import models
+from atproto_client.client.base import InvokeType
+from atproto_client.request import Response
+
+from ssky.main import invoke, parse
+from ssky.rate_limit import rate_limited_error
+from ssky.retry import RetryPolicy, recording_retries, retry_after, retry_warning, tid
+from ssky.result import SuccessResult
+from ssky.ssky_session import SskyClient
+
+XRPC = "https://bsky.social/xrpc/"
+
+
+def error_response(status_code, headers=None):
+    return Response(success=False, status_code=status_code, content=None, headers=headers or {})
+
+
+def server_error(status_code=502, headers=None):
+    return atproto_client.exceptions.NetworkError(error_response(status_code, headers))
+
+
+def create_record_data(rkey=None):
+    return models.ComAtprotoRepoCreateRecord.Data(
+        repo="did:plc:test",
+        collection="app.bsky.feed.post",
+        record={"$type": "app.bsky.feed.post", "text": "Hello", "createdAt": "2026-01-01T00:00:00Z"},
+        rkey=rkey
+    )
+
+
+class TestRetryPolicy:
+
+    def test_transient_errors_back_off(self):
+        policy = RetryPolicy(attempts=4, max_delay=30)
+        for retry in range(3):
+            assert 0 <= policy.delay(retry, server_error(503)) <= 0.5 * 2 ** retry
+
+    def test_gives_up(self):
+        policy = RetryPolicy(attempts=3)
+        assert policy.delay(2, server_error(502)) is None
+        assert policy.delay(0, atproto_client.exceptions.BadRequestError(error_response(400))) is None
+        assert policy.delay(0, atproto_client.exceptions.NetworkError()) is not None
+        assert RetryPolicy(attempts=1).delay(0, server_error(502)) is None
+
+    def test_honors_retry_after(self):
+        policy = RetryPolicy(max_delay=30)
+        assert 5 <= policy.delay(0, server_error(503, {"retry-after": "5"})) <= 5.5
+        assert policy.delay(0, server_error(503, {"retry-after": "120"})) is None
+
+    def test_retry_after_of_rate_limit(self):
+        headers = {"ratelimit-reset": "1010"}
+        assert retry_after(error_response(429, headers), now=1000) == 10
+        assert retry_after(error_response(503, headers), now=1000) is None
+        assert retry_after(error_response(503, {"retry-after": "Thu, 01 Jan 1970 00:16:50 GMT"}), now=1000) == 10
+
+    def test_governor_wait_is_not_retried(self):
+        """A request the rate limit governor refused to delay is not retried right away"""
+        assert RetryPolicy(max_delay=30).delay(0, rate_limited_error("exhausted", 90)) is None
+
+
+class TestTid:
+
+    def test_format(self):
+        key = tid(now=1700000000.0)
+        assert len(key) == 13
+        assert set(key) <= set("234567abcdefghijklmnopqrstuvwxyz")
+
+    def test_sorts_by_time(self):
+        assert tid(now=1700000000.0) < tid(now=1700000001.0)
+
+
+class TestRetriedInvoke:
+
+    @pytest.fixture(autouse=True)
+    def no_sleep(self):
+        with patch("ssky.ssky_session.time.sleep") as sleep:
+            yield sleep
+
+    def test_query_is_retried(self):
+        client = SskyClient()
+        with patch.object(SskyClient, "paced_invoke", side_effect=[server_error(502), atproto_client.exceptions.InvokeTimeoutError(), "response"]) as paced:
+            assert client.retried_invoke(InvokeType.QUERY, url=XRPC + "app.bsky.feed.getTimeline") == "response"
+        assert paced.call_count == 3
+
+    def test_query_fails_after_last_attempt(self):
+        client = SskyClient()
+        with patch.dict("os.environ", {"SSKY_RETRY_ATTEMPTS": "2"}), \
+                patch.object(SskyClient, "paced_invoke", side_effect=server_error(503)) as paced:
+            with pytest.raises(atproto_client.exceptions.NetworkError):
+                client.retried_invoke(InvokeType.QUERY, url=XRPC + "app.bsky.feed.getTimeline")
+        assert paced.call_count == 2
+
+    def test_created_record_is_written_again_under_its_key(self):
+        client = SskyClient()
+        with patch.object(SskyClient, "paced_invoke", side_effect=[server_error(502), "response"]) as paced:
+            assert client.retried_invoke(InvokeType.PROCEDURE, url=XRPC + "com.atproto.repo.createRecord", data=create_record_data()) == "response"
+        first, second = paced.call_args_list
+        assert first.kwargs["url"] == XRPC + "com.atproto.repo.createRecord"
+        assert second.kwargs["url"] == XRPC + "com.atproto.repo.putRecord"
+        assert isinstance(second.kwargs["data"], models.ComAtprotoRepoPutRecord.Data)
+        assert first.kwargs["data"].rkey is not None
+        assert second.kwargs["data"].rkey == first.kwargs["data"].rkey
+        assert second.kwargs["data"].record == first.kwargs["data"].record
+
+    def test_given_record_key_is_kept(self):
+        client = SskyClient()
+        with patch.object(SskyClient, "paced_invoke", return_value="response") as paced:
+            client.retried_invoke(InvokeType.PROCEDURE, url=XRPC + "com.atproto.repo.createRecord", data=create_record_data("3abc"))
+        assert paced.call_args.kwargs["data"].rkey == "3abc"
+
+    def test_other_procedures_are_not_retried(self):
+        client = SskyClient()
+        with patch.object(SskyClient, "paced_invoke", side_effect=server_error(502)) as paced:
+            with pytest.raises(atproto_client.exceptions.NetworkError):
+                client.retried_invoke(InvokeType.PROCEDURE, url=XRPC + "com.atproto.server.createSession", data=MagicMock())
+        assert paced.call_count == 1
+
+    def test_retries_are_logged_and_recorded(self, caplog):
+        client = SskyClient()
+        with caplog.at_level(logging.WARNING, logger="ssky.retry"), recording_retries() as retries, \
+                patch.object(SskyClient, "paced_invoke", side_effect=[server_error(502), "response"]):
+            client.retried_invoke(InvokeType.QUERY, url=XRPC + "app.bsky.feed.getTimeline")
+        assert retries == ["app.bsky.feed.getTimeline"]
+        assert "Retrying app.bsky.feed.getTimeline after HTTP 502" in caplog.text
+
+
+class TestRetryWarning:
+
+    def test_summary(self):
+        warning = retry_warning(["app.bsky.feed.getTimeline", "app.bsky.feed.getTimeline", "app.bsky.actor.getProfile"])
+        assert warning.startswith("Retried 3 request(s)")
+        assert "app.bsky.feed.getTimeline x2" in warning
+
+    def test_result_of_command_gets_warning(self):
+        def get(**kwargs):
+            from ssky.retry import note_retry
+            note_retry("app.bsky.feed.getTimeline", server_error(502), 0, 3, 0.1)
+            return SuccessResult()
+
+        subcommand, args = parse(["get"])
+        with patch("ssky.main.import_module", return_value=MagicMock(get=get)):
+            result = invoke(subcommand, args)
+        assert result.warnings == [retry_warning(["app.bsky.feed.getTimeline"])]
+
+    def test_retries_of_worker_threads_are_recorded(self):
+        import contextvars
+        from concurrent.futures import ThreadPoolExecutor
+        from ssky.retry import note_retry
+
+        with recording_retries() as retries, ThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(contextvars.copy_context().run, note_retry, "app.bsky.feed.getPostThread", server_error(502), 0, 3, 0.1).result()
+        assert retries == ["app.bsky.feed.getPostThread"]
@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+
+from ssky.main import startup_report_requested
+from ssky.startup_report import format_report
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def modules_after(code):
+    """Modules loaded by a fresh interpreter after running code"""
+    completed = subprocess.run(
+        [sys.executable, "-c", code + "\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))"],
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONPATH=SRC_DIR),
+        check=True
+    )
+    return set(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+
+class TestStartup:
+
+    def test_cli_entry_point_is_light(self):
+        """Parsing the command line loads neither atproto nor importlib.metadata"""
+        modules = modules_after("from ssky.main import parse\nparse(['get', '-I'])")
+        for package in ("atproto", "atproto_client", "bs4", "requests", "importlib.metadata"):
+            assert package not in modules
+
+    def test_read_commands_skip_post_dependencies(self):
+        """Read commands load the atproto client but not bs4, requests or the rest of the atproto package"""
+        modules = modules_after("import ssky.get, ssky.search, ssky.profile, ssky.user")
+        assert "atproto_client" in modules
+        for package in ("atproto", "atproto_firehose", "bs4", "requests", "ssky.post"):
+            assert package not in modules
+
+    def test_startup_report_option(self):
+        assert startup_report_requested(["--startup-report", "--version"])
+        assert startup_report_requested(["--account", "brand.test", "--startup-report", "get"])
+        assert not startup_report_requested(["get", "--startup-report"])
+        assert not startup_report_requested(["post", "--", "--startup-report"])
+
+    def test_format_report(self):
+        result = {
+            "returncode": 0,
+            "wall_ms": 120.0,
+            "imports": [
+                ("pydantic", 20000, "atproto_client.models", "atproto_client"),
+                ("atproto_client", 90000, "atproto_client", "atproto_client"),
+                ("ssky.main", 10000, "ssky.main", "ssky.main")
+            ]
+        }
+        report = format_report(result)
+
+        assert "wall clock                  120.0 ms (exit status 0)" in report
+        assert "imports                     100.0 ms" in report
+        assert report.index("atproto_client ") < report.index("ssky.main ")
+        assert "pydantic                            20.0 ms (imported by atproto_client > atproto_client.models)" in report
+        assert "bs4                              not loaded" in report
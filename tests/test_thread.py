@@ -1,12 +1,20 @@
 import os
+import threading
+import time
+from types import SimpleNamespace
 import pytest
 from unittest.mock import Mock, patch
+import atproto_client
 from atproto import models
 
+from ssky.conversation import build_threads
 from ssky.get import get
+from ssky.post_data_list import PostDataList
+from ssky.result import DeadlineExceededError
 from ssky.thread_data import ThreadData
-from ssky.thread_data_list import ThreadDataList
+from ssky.thread_data_list import ThreadDataList, expand_threads
 from ssky.ssky_session import SskySession
+from ssky.util import concurrent_calls
 from tests.common import create_mock_ssky_session, has_credentials
 
 
@@ -28,6 +36,7 @@ def mock_thread_environment():
     mock_post.author.handle = "test.bsky.social"
     mock_post.record = Mock()
     mock_post.record.text = "Root post content"
+    mock_post.record.reply = None
 
     # Mock reply post
     mock_reply = Mock()
@@ -42,6 +51,7 @@ def mock_thread_environment():
     # Mock feed post for feed responses
     mock_feed_post = Mock()
     mock_feed_post.post = mock_post
+    mock_feed_post.reply = None
 
     # Set up timeline response with single post
     mock_timeline_response = Mock()
@@ -159,6 +169,7 @@ class TestGetWithThreadSequential:
         # Set up author feed response
         mock_feed_post = Mock()
         mock_feed_post.post = mock_post
+        mock_feed_post.reply = None
         mock_author_feed_response = Mock()
         mock_author_feed_response.feed = [mock_feed_post]
         mock_client.get_author_feed.return_value = mock_author_feed_response
@@ -206,3 +217,218 @@ class TestGetWithThreadSequential:
             call_args = mock_client.get_post_thread.call_args
             assert call_args[1]['depth'] == 5, "thread_depth should be passed to get_post_thread"
             assert call_args[1]['parent_height'] == 2, "thread_parent_height should be passed to get_post_thread"
+
+
+def thread_post(n, root=None):
+    post = Mock()
+    post.uri = f"at://did:plc:test/app.bsky.feed.post/{n}"
+    post.cid = f"cid{n}"
+    post.record = Mock()
+    post.record.reply = Mock(root=Mock(uri=f"at://did:plc:test/app.bsky.feed.post/{root}")) if root is not None else None
+    return post
+
+
+def thread_response(uri):
+    node = Mock(spec=models.AppBskyFeedDefs.ThreadViewPost)
+    node.post = Mock(uri=uri)
+    node.replies = None
+    response = Mock(spec=models.AppBskyFeedGetPostThread.Response)
+    response.thread = node
+    return response
+
+
+class TestExpandThreads:
+    """Concurrent thread expansion for --thread"""
+
+    def posts(self, *posts):
+        post_data_list = PostDataList()
+        for post in posts:
+            post_data_list.append(post)
+        return post_data_list
+
+    def test_threads_keep_post_order(self):
+        """Threads come in the order of their first post, however long each fetch takes"""
+        client = Mock()
+
+        def get_post_thread(uri, depth, parent_height):
+            time.sleep(0.01 * (5 - int(uri.rsplit('/', 1)[1])))
+            return thread_response(uri)
+
+        client.get_post_thread.side_effect = get_post_thread
+        posts = self.posts(thread_post(5), thread_post(4, root=1), thread_post(3), thread_post(2, root=1), thread_post(1))
+        result = expand_threads(client, posts, depth=3, parent_height=1)
+        assert [thread.posts[0][0].uri.rsplit('/', 1)[1] for thread in result.threads] == ['5', '1', '3']
+        assert client.get_post_thread.call_count == 3
+        client.get_post_thread.assert_any_call("at://did:plc:test/app.bsky.feed.post/3", depth=3, parent_height=1)
+
+    def test_fetches_run_concurrently_up_to_limit(self):
+        client = Mock()
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def get_post_thread(uri, depth, parent_height):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return thread_response(uri)
+
+        client.get_post_thread.side_effect = get_post_thread
+        posts = self.posts(*[thread_post(n) for n in range(20)])
+        with patch.dict(os.environ, {"SSKY_THREAD_CONCURRENCY": "4"}):
+            result = expand_threads(client, posts)
+        assert len(result.threads) == 20
+        assert 1 < peak[0] <= 4
+
+    def test_failed_thread_is_a_warning(self):
+        client = Mock()
+
+        def get_post_thread(uri, depth, parent_height):
+            if uri.endswith('/2'):
+                raise atproto_client.exceptions.NetworkError()
+            return thread_response(uri)
+
+        client.get_post_thread.side_effect = get_post_thread
+        result = expand_threads(client, self.posts(thread_post(3), thread_post(2), thread_post(1)))
+        assert len(result.threads) == 2
+        assert len(result.warnings) == 1
+        assert result.warnings[0].startswith("Could not get thread at://did:plc:test/app.bsky.feed.post/2")
+
+    def test_deadline_fails_the_command(self):
+        client = Mock()
+        client.get_post_thread.side_effect = DeadlineExceededError(1, "fetching a thread")
+        with pytest.raises(DeadlineExceededError):
+            expand_threads(client, self.posts(thread_post(2), thread_post(1)))
+
+    def test_no_posts(self):
+        client = Mock()
+        assert expand_threads(client, self.posts()).threads == []
+        assert not client.get_post_thread.called
+
+    def test_failure_cancels_the_calls_not_started(self):
+        started = []
+
+        def call(n):
+            started.append(n)
+            time.sleep(0.1)
+
+        with pytest.raises(DeadlineExceededError):
+            with concurrent_calls(call, [1, 2, 3], 1) as futures:
+                raise DeadlineExceededError(1, "fetching threads")
+        assert started in ([], [1])
+        assert futures[1].cancelled() and futures[2].cancelled()
+
+
+def conversation_post(n, parent=None, root=None):
+    reply = SimpleNamespace(parent=SimpleNamespace(uri=f"at://did:plc:test/app.bsky.feed.post/{parent}"), root=SimpleNamespace(uri=f"at://did:plc:test/app.bsky.feed.post/{root}")) if parent is not None else None
+    return SimpleNamespace(uri=f"at://did:plc:test/app.bsky.feed.post/{n}", cid=f"cid{n}", indexed_at=f"2026-01-01T00:00:{n:02d}.000Z", record=SimpleNamespace(reply=reply))
+
+
+def chain_response(*posts, end=None):
+    """getPostThread response of the first post with the others as its parents"""
+    parent = end
+    for post in reversed(posts):
+        node = Mock(spec=models.AppBskyFeedDefs.ThreadViewPost)
+        node.post = post
+        node.parent = parent
+        parent = node
+    return Mock(thread=parent)
+
+
+class TestBuildThreads:
+    """Threads of feed posts built from the posts at hand"""
+
+    def posts_client(self, *posts, chains=None):
+        by_uri = {post.uri: post for post in posts}
+        client = Mock()
+        client.get_posts.side_effect = lambda uris: SimpleNamespace(posts=[by_uri[uri] for uri in uris if uri in by_uri])
+        client.get_post_thread.side_effect = lambda uri, depth, parent_height: chains[uri]
+        return client
+
+    def numbers(self, thread):
+        return [(int(post.uri.rsplit('/', 1)[1]), depth) for post, depth in thread.posts]
+
+    def test_conversations(self):
+        r, a, b, c, d = conversation_post(1), conversation_post(2, 1, 1), conversation_post(3, 2, 1), conversation_post(4, 3, 1), conversation_post(5, 2, 1)
+        h, g, f, e = conversation_post(7), conversation_post(8, 7, 7), conversation_post(9, 8, 7), conversation_post(10, 9, 7)
+        p = conversation_post(20)
+        z, x = conversation_post(29), conversation_post(31, 30, 29)
+        w, y = conversation_post(40), conversation_post(41, 40, 40)
+
+        post_data_list = PostDataList()
+        for post, reply in ((e, SimpleNamespace(parent=f, root=h)), (c, SimpleNamespace(parent=b, root=r)), (p, None),
+                            (x, SimpleNamespace(parent=SimpleNamespace(uri=x.record.reply.parent.uri, not_found=True), root=z)),
+                            (d, SimpleNamespace(parent=a, root=r)), (y, None)):
+            post_data_list.append(post)
+            post_data_list.add_related(reply)
+        deleted = Mock(spec=models.AppBskyFeedDefs.NotFoundPost, uri="at://did:plc:test/app.bsky.feed.post/30")
+        client = self.posts_client(w, chains={g.uri: chain_response(g, h), deleted.uri: Mock(thread=deleted)})
+
+        result = build_threads(client, post_data_list)
+
+        assert [self.numbers(thread) for thread in result.threads] == [
+            [(7, 0), (8, 1), (9, 2), (10, 3)],
+            [(1, 0), (2, 1), (3, 2), (4, 3), (5, 2)],
+            [(20, 0)],
+            [(29, 0), (31, 1)],
+            [(40, 0), (41, 1)],
+        ]
+        # A missing root is fetched with getPosts; the ancestors above other missing parents with one getPostThread each
+        client.get_posts.assert_called_once_with([w.uri])
+        assert sorted(call.args[0] for call in client.get_post_thread.call_args_list) == [deleted.uri, g.uri]
+        client.get_post_thread.assert_any_call(g.uri, depth=0, parent_height=8)
+
+    def test_parent_height_stops_the_climb(self):
+        chain = [conversation_post(0)] + [conversation_post(n, n - 1, 0) for n in range(1, 8)]
+        post_data_list = PostDataList()
+        post_data_list.append(chain[7])
+        post_data_list.add_related(SimpleNamespace(parent=chain[6], root=chain[0]))
+
+        client = self.posts_client()
+        assert [self.numbers(thread) for thread in build_threads(client, post_data_list, parent_height=1).threads] == [[(6, 0), (7, 1)]]
+        assert not client.get_posts.called and not client.get_post_thread.called
+
+        client = self.posts_client(chain[5])
+        assert [self.numbers(thread) for thread in build_threads(client, post_data_list, parent_height=2).threads] == [[(5, 0), (6, 1), (7, 2)]]
+        client.get_posts.assert_called_once_with([chain[5].uri])
+        assert not client.get_post_thread.called
+
+        client = self.posts_client(chains={chain[5].uri: chain_response(chain[5], chain[4], chain[3])})
+        assert [self.numbers(thread) for thread in build_threads(client, post_data_list, parent_height=4).threads] == [[(3, 0), (4, 1), (5, 2), (6, 3), (7, 4)]]
+        client.get_post_thread.assert_called_once_with(chain[5].uri, depth=0, parent_height=2)
+        assert not client.get_posts.called
+
+    def test_parents_are_fetched_25_at_a_time(self):
+        roots = [conversation_post(n) for n in range(30)]
+        replies = [conversation_post(n + 30, n, n) for n in range(30)]
+        post_data_list = PostDataList()
+        for reply in replies:
+            post_data_list.append(reply)
+        client = self.posts_client(*roots)
+
+        result = build_threads(client, post_data_list)
+
+        assert [len(call.args[0]) for call in client.get_posts.call_args_list] == [25, 5]
+        assert [self.numbers(thread) for thread in result.threads][:2] == [[(0, 0), (30, 1)], [(1, 0), (31, 1)]]
+
+    def test_failed_fetch_is_a_warning(self):
+        post_data_list = PostDataList()
+        post_data_list.append(conversation_post(2, 1, 1))
+        client = Mock()
+        client.get_posts.side_effect = atproto_client.exceptions.NetworkError()
+
+        result = build_threads(client, post_data_list)
+
+        assert [self.numbers(thread) for thread in result.threads] == [[(2, 0)]]
+        assert result.warnings[0].startswith("Could not get 1 parent post(s)")
+
+    def test_get_builds_threads_at_depth_0_only(self):
+        client = Mock()
+        client.get_timeline.return_value = SimpleNamespace(feed=[SimpleNamespace(post=conversation_post(1), reply=None)], cursor=None)
+        client.get_post_thread.side_effect = lambda uri, depth, parent_height: thread_response(uri)
+        with patch('ssky.get.ssky_client', return_value=client):
+            assert len(get(thread=True, thread_depth=0).threads) == 1
+            assert not client.get_post_thread.called
+            assert len(get(thread=True).threads) == 1
+            assert client.get_post_thread.called